@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import timeit
+from typing import Callable
+
+from tests._common import SAMPLE_FILE_IDS  # re-exported for the benchmarks
+
+__author__ = 'luckydonald'
+
+
+def measure(func: Callable[[], object], number: int = 20000, repeat: int = 5) -> float:
+    """
+    Runs `func` `number` times, `repeat` times over, and returns the best time per call in microseconds.
+    """
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e6
+# end def
+
+
+def report(label: str, microseconds: float):
+    print(f'{label:<40} {microseconds:8.2f} µs/op {1e6 / microseconds:12.0f} ops/s')
+# end def
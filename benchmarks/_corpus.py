@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+The fixed corpus of `bench_suite`: file_ids for every type family, supported version and photosize source.
+
+It's checked in as `corpus.json`, so every commit is measured against the very same ids.
+Only rebuild it when the coverage needs to change, results of different corpora can't be compared:
+
+    python -m benchmarks._corpus
+"""
+import json
+import os
+from typing import Dict, List
+
+from tg_file_id.file_id import FileId, DocumentFileId, PhotoFileId
+from tg_file_id.generate import FileIdGenerator
+from benchmarks._common import SAMPLE_FILE_IDS
+
+__author__ = 'luckydonald'
+
+
+CORPUS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus.json')
+PER_GROUP = 16
+SEED = 16
+
+FILE_REFERENCE_LENGTHS = {1: 1, 29: 1, 45: 1}
+
+
+def group_name(family: str, version, photosize_source=None) -> str:
+    """ e.g. `'photo 4.30 source 2'` """
+    name = f'{family} {version[0]}.{version[1]}'
+    return name if photosize_source is None else f'{name} source {photosize_source}'
+# end def
+
+
+def build(per_group: int = PER_GROUP, seed: int = SEED) -> Dict[str, List[str]]:
+    """
+    :return: The file_ids, by `group_name`.
+             Each group starts with its real world sample of `SAMPLE_FILE_IDS` if there is one,
+             the others are made up by `FileIdGenerator`, of mixed types, with file_references from version 4.27 on.
+    """
+    corpus = {}
+    for version in FileId.SUPPORTED_VERSIONS:
+        sources = [None] + ([PhotoFileId.PHOTOSIZE_SOURCE_LEGACY] if version[0] < 4 else sorted(PhotoFileId.PHOTOSIZE_SOURCES))
+        for source in sources:
+            family = 'document' if source is None else 'photo'
+            name = group_name(family, version, source)
+            file_ids = []
+            sample = SAMPLE_FILE_IDS.get((family, version))
+            if sample and (source is None or FileId.from_file_id(sample).photosize.type_id == source):
+                file_ids.append(sample)
+            # end if
+            generator = FileIdGenerator(
+                f'{seed} {name}',
+                types={type_id: 1 for type_id in (DocumentFileId.TYPES if source is None else PhotoFileId.TYPES)},
+                versions={version: 1},
+                file_reference_lengths=FILE_REFERENCE_LENGTHS if version >= (4, 27) else {0: 1},
+                photosize_sources=None if source is None else {source: 1},
+            )
+            file_ids.extend(generator.strings(per_group - len(file_ids)))
+            corpus[name] = file_ids
+        # end for
+    # end for
+    return corpus
+# end def
+
+
+def load() -> Dict[str, List[str]]:
+    with open(CORPUS_FILE) as f:
+        return json.load(f)
+    # end with
+# end def
+
+
+if __name__ == '__main__':
+    with open(CORPUS_FILE, 'w') as f:
+        json.dump(build(), f, indent=2)
+        f.write('\n')
+    # end with
+    print(f'wrote {CORPUS_FILE}')
+# end if
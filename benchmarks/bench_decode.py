@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Decode speed of `FileId.from_file_id`, per type family and version.
+
+    python -m benchmarks.bench_decode
+"""
+from tg_file_id.cache import DecodeCache
+from tg_file_id.file_id import FileId
+from benchmarks._common import SAMPLE_FILE_IDS, measure, report
+
+__author__ = 'luckydonald'
+
+
+def main():
+    from_file_id = FileId.from_file_id
+    for (family, version), file_id in SAMPLE_FILE_IDS.items():
+        report(f'from_file_id {family} {version}', measure(lambda: from_file_id(file_id)))
+        report('  lazy, type_detailed only', measure(lambda: from_file_id(file_id, lazy=True).type_detailed))
+        report('  lazy, then access_hash', measure(lambda: from_file_id(file_id, lazy=True).access_hash))
+        report('  peek', measure(lambda: FileId.peek(file_id)))
+    # end for
+
+    batch = list(SAMPLE_FILE_IDS.values()) * 125
+    per_id = len(batch)
+    report('from_file_id loop (per id)', measure(lambda: [from_file_id(file_id) for file_id in batch], number=20) / per_id)
+    report('decode_many (per id)', measure(lambda: FileId.decode_many(batch), number=20) / per_id)
+
+    cache = DecodeCache(maxsize=len(SAMPLE_FILE_IDS))
+    report('DecodeCache.from_file_id, hits (per id)', measure(lambda: [cache.from_file_id(file_id) for file_id in batch], number=20) / per_id)
+# end def
+
+
+if __name__ == '__main__':
+    main()
+# end if
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Encode speed of `FileId.calculate_file_id`, per type family and version.
+
+    python -m benchmarks.bench_encode
+"""
+from tg_file_id.file_id import FileId
+from benchmarks._common import SAMPLE_FILE_IDS, measure, report
+
+__author__ = 'luckydonald'
+
+
+def main():
+    decoded = {key: FileId.from_file_id(file_id) for key, file_id in SAMPLE_FILE_IDS.items()}
+    for (family, version), file_id in decoded.items():
+        report(f'calculate_file_id {family} {version}', measure(lambda: file_id.calculate_file_id()))
+    # end for
+
+    batch = list(decoded.values()) * 125
+    per_id = len(batch)
+    report('calculate_file_id loop (per id)', measure(lambda: [file_id.calculate_file_id() for file_id in batch], number=20) / per_id)
+    report('encode_many (per id)', measure(lambda: FileId.encode_many(batch), number=20) / per_id)
+# end def
+
+
+if __name__ == '__main__':
+    main()
+# end if
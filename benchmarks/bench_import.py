@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cold start: how long importing the codec takes in a fresh interpreter, per `python -X importtime`.
+
+    python -m benchmarks.bench_import
+"""
+import os
+import subprocess
+import sys
+
+__author__ = 'luckydonald'
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+STATEMENTS = (
+    'import tg_file_id.file_id',
+    'import tg_file_id.file_id, tg_file_id.file_unique_id',
+    'import tg_file_id.batch',
+)
+
+
+def import_times(statement: str):
+    """ :return: (module, self µs) of every module imported by the statement, in a fresh interpreter. """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=ROOT, env=dict(os.environ, PYTHONPATH=ROOT), capture_output=True, text=True, check=True,
+    )
+    return [
+        (name.strip(), int(self_time))
+        for self_time, _, name in (
+            line[len('import time:'):].split('|') for line in result.stderr.splitlines()
+            if line.startswith('import time:') and 'self [us]' not in line
+        )
+    ]
+# end def
+
+
+def main(repeat: int = 10):
+    for statement in STATEMENTS:
+        best_total = best_own = None
+        for _ in range(repeat):
+            times = import_times(statement)
+            total = sum(self_time for _, self_time in times)
+            own = sum(self_time for name, self_time in times if name.startswith('tg_file_id'))
+            best_total = total if best_total is None else min(best_total, total)
+            best_own = own if best_own is None else min(best_own, own)
+        # end for
+        print(f'{statement:<55} {best_total / 1000:8.2f} ms total, {best_own / 1000:8.2f} ms in tg_file_id itself')
+    # end for
+# end def
+
+
+if __name__ == '__main__':
+    main()
+# end if
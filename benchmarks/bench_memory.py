@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Memory held per decoded object, measured with `tracemalloc`.
+
+    python -m benchmarks.bench_memory
+"""
+import gc
+import tracemalloc
+
+from tg_file_id.file_id import FileId
+from tg_file_id.file_unique_id import FileUniqueId
+from benchmarks._common import SAMPLE_FILE_IDS
+
+__author__ = 'luckydonald'
+
+
+def bytes_per_object(decode, strings, count: int = 10000) -> float:
+    """
+    Decodes `count` objects and keeps them alive, returning the traced memory per object.
+    The input strings are created before tracing starts, so they are not counted.
+    """
+    strings = [strings[i % len(strings)] for i in range(count)]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [decode(string) for string in strings]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / count
+# end def
+
+
+def main():
+    for (family, version), file_id in SAMPLE_FILE_IDS.items():
+        print(f'FileId {family} {version}: {bytes_per_object(FileId.from_file_id, [file_id]):8.1f} bytes/id')
+    # end for
+    unique_ids = [FileUniqueId.from_file_id(file_id).to_unique_id() for file_id in SAMPLE_FILE_IDS.values()]
+    print(f'FileUniqueId: {bytes_per_object(FileUniqueId.from_unique_id, unique_ids):8.1f} bytes/id')
+# end def
+
+
+if __name__ == '__main__':
+    main()
+# end if
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Throughput and memory of `tg_file_id.migrate.migrate`, against re-encoding one object at a time.
+
+    python -m benchmarks.bench_migrate
+"""
+import itertools
+import tracemalloc
+import warnings
+from collections import deque
+
+from tg_file_id.file_id import FileId
+from tg_file_id.migrate import migrate
+from benchmarks._common import SAMPLE_FILE_IDS, measure, report
+
+__author__ = 'luckydonald'
+
+
+def main():
+    warnings.simplefilter('ignore')
+    batch = list(SAMPLE_FILE_IDS.values()) * 125
+    per_id = len(batch)
+    version, sub_version = FileId.MAX_VERSION
+    report('to_file_id(version=...) loop (per id)', measure(
+        lambda: [FileId.from_file_id(file_id).to_file_id(version=version, sub_version=sub_version) for file_id in batch], number=20,
+    ) / per_id)
+    report('migrate (per id)', measure(lambda: deque(migrate(batch), maxlen=0), number=20) / per_id)
+
+    for count in (10000, 100000):
+        tracemalloc.start()
+        deque(migrate(itertools.islice(itertools.cycle(batch), count)), maxlen=0)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f'migrate {count:>7} file_ids, peak memory {peak / 1024:8.1f} KiB')
+    # end for
+# end def
+
+
+if __name__ == '__main__':
+    main()
+# end if
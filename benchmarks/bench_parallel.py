@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Throughput of `parallel_decode` with 1 to all cores, in file_ids per second.
+
+    python -m benchmarks.bench_parallel [count]
+"""
+import os
+import sys
+import time
+
+from tg_file_id.generate import FileIdGenerator
+from tg_file_id.parallel import parallel_decode
+
+__author__ = 'luckydonald'
+
+
+def throughput(file_ids, **kwargs) -> float:
+    """ file_ids decoded per second, best of three runs """
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in parallel_decode(file_ids, **kwargs):
+            pass
+        # end for
+        best = min(best, time.perf_counter() - start)
+    # end for
+    return len(file_ids) / best
+# end def
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    file_ids = list(FileIdGenerator(21).strings(count))
+    cores = os.cpu_count() or 1
+    workers = sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)) | {cores})
+    try:
+        import numpy  # noqa: F401
+        outputs = ('records', 'batch')
+    except ImportError:
+        outputs = ('records',)
+    # end try
+    for output in outputs:
+        single = None
+        for worker_count in workers:
+            per_second = throughput(file_ids, workers=worker_count, output=output)
+            single = single or per_second
+            print(f'{output:<8} workers={worker_count:<3} {per_second:12.0f} ids/s {per_second / single:6.2f}x')
+        # end for
+    # end for
+    if cores == 1:
+        print('only one core, the pool can only add overhead here:')
+        print(f'records  pool, workers=2 {throughput(file_ids, workers=2):12.0f} ids/s')
+    # end if
+# end def
+
+
+if __name__ == '__main__':
+    main()
+# end if
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cost of the decode checks (unsupported versions, leftover data, debug logging) per `DecodePolicy` mode.
+
+    python -m benchmarks.bench_policy
+"""
+import logging
+import warnings
+
+from tg_file_id.file_id import FileId
+from tg_file_id.file_unique_id import FileUniqueId
+from tg_file_id.policy import DecodePolicy
+from benchmarks._common import SAMPLE_FILE_IDS, measure, report
+
+__author__ = 'luckydonald'
+
+
+def main():
+    supported = list(SAMPLE_FILE_IDS.values())
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        unsupported = [FileId.from_file_id(file_id).to_file_id(version=4, sub_version=99) for file_id in supported]
+    # end with
+    per_id = len(supported)
+
+    report('supported versions, default (per id)', measure(lambda: [FileId.from_file_id(file_id) for file_id in supported], number=2000) / per_id)
+    for mode in DecodePolicy.MODES[1:]:  # strict would raise
+        policy = DecodePolicy(mode)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            report(f'unsupported versions, {mode} (per id)', measure(
+                lambda: [FileId.from_file_id(file_id, policy=policy) for file_id in unsupported], number=2000,
+            ) / per_id)
+        # end with
+    # end for
+
+    # what every decode of those did before: a `warnings.warn` call per id, even if the filter then dropped it.
+    silent = DecodePolicy('silent')
+
+    def decode_and_warn():
+        for file_id in unsupported:
+            FileId.from_file_id(file_id, policy=silent)
+            warnings.warn('Potentially unsupported file_id (sub_)version: (4, 99)')
+        # end for
+    # end def
+    with warnings.catch_warnings():
+        warnings.simplefilter('default')
+        report('unsupported versions, warn() per id', measure(decode_and_warn, number=2000) / per_id)
+    # end with
+
+    unique_id = 'AgADBAsAAgKLowAB'
+    logger = logging.getLogger('tg_file_id.file_unique_id')
+    logger.setLevel(logging.INFO)
+    report('from_unique_id, debug off', measure(lambda: FileUniqueId.from_unique_id(unique_id)))
+    report('unguarded logger.debug(f-string)', measure(lambda: logger.debug(f'parsing unique_id {unique_id!r}')))
+    report('guarded logger.debug(f-string)', measure(
+        lambda: logger.isEnabledFor(logging.DEBUG) and logger.debug(f'parsing unique_id {unique_id!r}')
+    ))
+# end def
+
+
+if __name__ == '__main__':
+    main()
+# end if
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Binary records (`to_record` / `from_record`) against the file_id strings: size, and speed one by one and as files.
+
+    python -m benchmarks.bench_records
+"""
+import io
+
+from tg_file_id.file_id import FileId
+from tg_file_id.file_unique_id import FileUniqueId
+from tg_file_id.generate import FileIdGenerator
+from tg_file_id.records import read_records, write_records
+from benchmarks._common import SAMPLE_FILE_IDS, measure, report
+
+__author__ = 'luckydonald'
+
+
+def main():
+    for (family, version), file_id in SAMPLE_FILE_IDS.items():
+        obj = FileId.from_file_id(file_id)
+        record = obj.to_record()
+        print(f'{family} {version}: {len(file_id)} characters, {len(record)} bytes as record')
+        report('  from_file_id', measure(lambda: FileId.from_file_id(file_id)))
+        report('  from_record', measure(lambda: FileId.from_record(record)))
+        report('  calculate_file_id', measure(obj.calculate_file_id))
+        report('  to_record', measure(obj.to_record))
+    # end for
+    unique_id = FileUniqueId.from_file_id(SAMPLE_FILE_IDS[('document', (4, 30))])
+    unique_record = unique_id.to_record()
+    unique_string = unique_id.to_unique_id()
+    report('FileUniqueId.from_unique_id', measure(lambda: FileUniqueId.from_unique_id(unique_string)))
+    report('FileUniqueId.from_record', measure(lambda: FileUniqueId.from_record(unique_record)))
+
+    objects = list(FileIdGenerator(18).file_ids(20000))
+    lines = ''.join(f'{obj.to_file_id()}\n' for obj in objects).encode()
+    records = io.BytesIO()
+    write_records(records, objects)
+    records = records.getvalue()
+    print(f'{len(objects)} generated file_ids: {len(lines)} bytes as lines of text, {len(records)} bytes as records')
+    per_id = len(objects)
+    report('read lines + decode_many (per id)', measure(
+        lambda: FileId.decode_many(line.decode() for line in io.BytesIO(lines).read().splitlines()), number=3,
+    ) / per_id)
+    report('read_records (per id)', measure(lambda: list(read_records(io.BytesIO(records))), number=3) / per_id)
+    report('encode_many + write lines (per id)', measure(lambda: io.BytesIO().write('\n'.join(FileId.encode_many(objects)).encode()), number=3) / per_id)
+    report('write_records (per id)', measure(lambda: write_records(io.BytesIO(), objects), number=3) / per_id)
+# end def
+
+
+if __name__ == '__main__':
+    main()
+# end if
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Speed of `rle_decode` and `rle_encode` on the payload of each supported file_id version.
+
+    python -m benchmarks.bench_rle
+"""
+from tg_file_id.utils import base64url_decode, rle_decode, rle_encode
+from benchmarks._common import SAMPLE_FILE_IDS, measure, report
+
+__author__ = 'luckydonald'
+
+
+def main():
+    for (family, version), file_id in SAMPLE_FILE_IDS.items():
+        encoded = base64url_decode(file_id)
+        decoded = rle_decode(encoded)
+        report(f'rle_decode {family} {version}', measure(lambda: rle_decode(encoded)))
+        report(f'rle_encode {family} {version}', measure(lambda: rle_encode(decoded)))
+    # end for
+# end def
+
+
+if __name__ == '__main__':
+    main()
+# end if
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+`FileIdStore` against a plain dict of file_unique_id to `FileId`: speed, and how much of the python heap it takes.
+
+    python -m benchmarks.bench_store
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+
+from tg_file_id.file_id import FileId
+from tg_file_id.file_unique_id import FileUniqueId
+from tg_file_id.generate import FileIdGenerator
+from tg_file_id.store import FileIdStore
+from benchmarks._common import report
+
+__author__ = 'luckydonald'
+
+
+def fill_dict(file_ids, unique_ids) -> dict:
+    cache = {}
+    for unique_id, file_id in zip(unique_ids, file_ids):
+        cache[unique_id] = FileId.from_file_id(file_id)
+    # end for
+    return cache
+# end def
+
+
+def fill_store(path, file_ids) -> FileIdStore:
+    store = FileIdStore(path)
+    for file_id in file_ids:
+        store.put(file_id)
+    # end for
+    return store
+# end def
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+# end def
+
+
+def main(count: int = 100000):
+    file_ids = list(FileIdGenerator(19).strings(count))
+    unique_ids = [FileUniqueId.from_file_id(file_id).to_unique_id() for file_id in file_ids]
+    keys = [FileUniqueId.from_unique_id(unique_id) for unique_id in unique_ids]
+
+    cache, seconds = timed(fill_dict, file_ids, unique_ids)
+    report('dict, decode + insert (per id)', seconds / count * 1e6)
+    report('dict, get (per id)', timed(lambda: [cache.get(unique_id) for unique_id in unique_ids])[1] / count * 1e6)
+    del cache
+    tracemalloc.start()
+    cache = fill_dict(file_ids, unique_ids)
+    print(f'dict heap: {tracemalloc.get_traced_memory()[0] / count:8.1f} bytes/id')
+    tracemalloc.stop()
+    del cache
+
+    with tempfile.TemporaryDirectory() as directory:
+        store, seconds = timed(fill_store, os.path.join(directory, 'timed'), file_ids)
+        report('FileIdStore.put(str) (per id)', seconds / count * 1e6)
+        report('FileIdStore.get(str) (per id)', timed(lambda: [store.get(unique_id) for unique_id in unique_ids])[1] / count * 1e6)
+        report('FileIdStore.get(FileUniqueId) (per id)', timed(lambda: [store.get(key) for key in keys])[1] / count * 1e6)
+        report('FileIdStore.compact (per id)', timed(store.compact)[1] / count * 1e6)
+        store.close()
+
+        path = os.path.join(directory, 'traced')
+        tracemalloc.start()
+        store = fill_store(path, file_ids)
+        print(f'store heap: {tracemalloc.get_traced_memory()[0] / count:8.1f} bytes/id')
+        tracemalloc.stop()
+        print(f'store files: {(store._data_end + os.path.getsize(path + ".index")) / count:8.1f} bytes/id used on disk')
+        store.close()
+    # end with
+# end def
+
+
+if __name__ == '__main__':
+    main()
+# end if
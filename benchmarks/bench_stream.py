@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Decoding a gzip compressed file of file_ids with `iter_decode` and `iter_unique_ids`,
+against reading it line by line in text mode and decoding every line on its own.
+
+    python -m benchmarks.bench_stream [count]
+"""
+import gzip
+import os
+import sys
+import tempfile
+import timeit
+
+from tg_file_id.file_id import FileId
+from tg_file_id.file_unique_id import file_id_to_unique_id
+from tg_file_id.generate import FileIdGenerator
+from tg_file_id.stream import iter_decode, iter_unique_ids
+
+__author__ = 'luckydonald'
+
+
+def line_by_line(path: str, convert) -> int:
+    count = 0
+    with gzip.open(path, 'rt') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                convert(line)
+                count += 1
+            # end if
+        # end for
+    # end with
+    return count
+# end def
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'file_ids.txt.gz')
+        with gzip.open(path, 'wt') as f:
+            FileIdGenerator(23).write(f, count)
+        # end with
+        for label, run in (
+            ('line by line, FileId.from_file_id', lambda: line_by_line(path, FileId.from_file_id)),
+            ('iter_decode', lambda: sum(1 for _ in iter_decode(path))),
+            ('line by line, file_id_to_unique_id', lambda: line_by_line(path, file_id_to_unique_id)),
+            ('iter_unique_ids', lambda: sum(1 for _ in iter_unique_ids(path))),
+        ):
+            seconds = min(timeit.repeat(run, number=1, repeat=3))
+            print(f'{label:<40} {seconds / count * 1e6:8.2f} µs/id {count / seconds:12.0f} ids/s')
+        # end for
+    # end with
+# end def
+
+
+if __name__ == '__main__':
+    main()
+# end if
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+The whole codec, per type family, supported version and photosize source, on the fixed corpus of `corpus.json`.
+Reports ops/s, latency percentiles and allocated bytes per operation, and can save those as JSON,
+to compare the results of two commits:
+
+    python -m benchmarks.bench_suite --save before.json
+    git checkout other-commit
+    python -m benchmarks.bench_suite --save after.json --compare before.json
+
+Differences smaller than this host's noise (often ±20%) don't mean much, run both sides a few times.
+"""
+import argparse
+import gc
+import hashlib
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from tg_file_id.file_id import FileId
+from tg_file_id.file_unique_id import FileUniqueId, file_id_to_unique_id
+from benchmarks._corpus import CORPUS_FILE, load
+
+__author__ = 'luckydonald'
+
+
+def operations(file_ids: List[str]) -> Dict[str, Tuple[Callable, list]]:
+    """
+    :return: The benchmarked operations, by name, as (function, its inputs).
+             The inputs are prepared up front, so only the operation itself is measured.
+    """
+    objects = [FileId.from_file_id(file_id) for file_id in file_ids]
+    unique_objects = [FileUniqueId.from_file_id(file_id) for file_id in objects]
+    unique_ids = [unique_id.to_unique_id() for unique_id in unique_objects]
+    records = [file_id.to_record() for file_id in objects]
+    return {
+        'decode': (FileId.from_file_id, file_ids),
+        'encode': (FileId.calculate_file_id, objects),
+        'from_record': (FileId.from_record, records),
+        'to_record': (FileId.to_record, objects),
+        'file_id_to_unique_id': (file_id_to_unique_id, file_ids),
+        'from_unique_id': (FileUniqueId.from_unique_id, unique_ids),
+        'to_unique_id': (FileUniqueId.to_unique_id, unique_objects),
+    }
+# end def
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * percent / 100))]
+# end def
+
+
+def measure(func: Callable, inputs: list, min_time: float = 0.2) -> Dict[str, float]:
+    """
+    Runs `func` on every input, over and over for at least `min_time` seconds.
+
+    :return: ops/s of the whole loop, the latency percentiles of single calls in microseconds,
+             and the bytes allocated per call, as the peak traced by `tracemalloc` while running it once on every input.
+    """
+    perf_counter_ns = time.perf_counter_ns
+    # loop throughput, without timing each call.
+    rounds, elapsed = 0, 0.0
+    while elapsed < min_time:
+        start = time.perf_counter()
+        for value in inputs:
+            func(value)
+        # end for
+        elapsed += time.perf_counter() - start
+        rounds += 1
+    # end while
+    ops_per_sec = rounds * len(inputs) / elapsed
+
+    # single call latencies, the timer's own overhead (some 50 ns) included.
+    latencies = []
+    append = latencies.append
+    for _ in range(rounds):
+        for value in inputs:
+            start = perf_counter_ns()
+            func(value)
+            append(perf_counter_ns() - start)
+        # end for
+    # end for
+    latencies.sort()
+
+    gc.collect()
+    tracemalloc.start()
+    allocated = 0
+    for value in inputs:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        func(value)
+        allocated += tracemalloc.get_traced_memory()[1] - before
+    # end for
+    tracemalloc.stop()
+
+    return {
+        'ops_per_sec': ops_per_sec,
+        'p50_us': _percentile(latencies, 50) / 1000,
+        'p90_us': _percentile(latencies, 90) / 1000,
+        'p99_us': _percentile(latencies, 99) / 1000,
+        'alloc_bytes_per_op': allocated / len(inputs),
+    }
+# end def
+
+
+def run(corpus: Dict[str, List[str]], only: str = '', min_time: float = 0.2) -> Dict[str, Dict[str, float]]:
+    """
+    :param only: Only run the benchmarks with that in their name.
+    :return: The `measure` results, by `'{operation} | {group}'`.
+    """
+    groups = dict(corpus)
+    groups['all'] = [file_id for file_ids in corpus.values() for file_id in file_ids]
+    results = {}
+    for group, file_ids in groups.items():
+        for operation, (func, inputs) in operations(file_ids).items():
+            name = f'{operation} | {group}'
+            if only in name:
+                results[name] = measure(func, inputs, min_time=min_time)
+                print_result(name, results[name])
+            # end if
+        # end for
+    # end for
+    return results
+# end def
+
+
+def environment() -> Dict[str, str]:
+    """ What the results were measured on, to know what's comparable. """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    # end try
+    with open(CORPUS_FILE, 'rb') as f:
+        corpus_hash = hashlib.sha256(f.read()).hexdigest()[:16]
+    # end with
+    return {
+        'commit': commit,
+        'python': sys.version.split()[0],
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'corpus_sha256': corpus_hash,
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+# end def
+
+
+def print_result(name: str, result: Dict[str, float]):
+    print(
+        f"{name:<42} {result['ops_per_sec']:11.0f} ops/s  "
+        f"p50 {result['p50_us']:7.2f}  p90 {result['p90_us']:7.2f}  p99 {result['p99_us']:7.2f} µs  "
+        f"{result['alloc_bytes_per_op']:7.0f} B/op"
+    )
+# end def
+
+
+def compare(before: dict, after: dict, threshold: float = 10.0) -> List[str]:
+    """
+    Prints the change of ops/s and allocations per benchmark present in both.
+
+    :param threshold: Changes of ops/s of more than that many percent are flagged.
+    :return: The names of the benchmarks which got slower by more than the threshold.
+    """
+    if before['environment']['corpus_sha256'] != after['environment']['corpus_sha256']:
+        print('WARNING: measured on different corpora, the numbers are not comparable.')
+    # end if
+    slower = []
+    for name, new in after['results'].items():
+        old = before['results'].get(name)
+        if old is None:
+            continue
+        # end if
+        change = (new['ops_per_sec'] / old['ops_per_sec'] - 1) * 100
+        flag = ''
+        if change < -threshold:
+            flag = '  SLOWER'
+            slower.append(name)
+        elif change > threshold:
+            flag = '  faster'
+        # end if
+        print(
+            f"{name:<42} {old['ops_per_sec']:11.0f} -> {new['ops_per_sec']:11.0f} ops/s {change:+6.1f}%  "
+            f"{old['alloc_bytes_per_op']:6.0f} -> {new['alloc_bytes_per_op']:6.0f} B/op{flag}"
+        )
+    # end for
+    return slower
+# end def
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--only', default='', help='only run the benchmarks with that in their name, e.g. "decode | photo 4.30"')
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds to run each benchmark for, at least')
+    parser.add_argument('--save', metavar='FILE', help='write the results as JSON to that file')
+    parser.add_argument('--compare', metavar='FILE', help='compare to the results saved in that file')
+    parser.add_argument('--threshold', type=float, default=10.0, help='percent of ops/s change to flag when comparing')
+    args = parser.parse_args(argv)
+
+    results = {'environment': environment(), 'results': run(load(), only=args.only, min_time=args.min_time)}
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        # end with
+    # end if
+    if args.compare:
+        with open(args.compare) as f:
+            before = json.load(f)
+        # end with
+        print()
+        slower = compare(before, results, threshold=args.threshold)
+        print(f'\n{len(slower)} of {len(results["results"])} benchmarks slower by more than {args.threshold}%')
+    # end if
+# end def
+
+
+if __name__ == '__main__':
+    main()
+# end if
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Speed of calculating file_unique_ids from file_ids, one by one, and from the columns of a `FileIdBatch`.
+
+    python -m benchmarks.bench_unique
+"""
+from tg_file_id.file_unique_id import FileUniqueId, file_id_to_unique_id
+from benchmarks._common import SAMPLE_FILE_IDS, measure, report
+
+__author__ = 'luckydonald'
+
+
+def main():
+    batch = list(SAMPLE_FILE_IDS.values()) * 1250
+    per_id = len(batch)
+    report('from_file_id().to_unique_id() (per id)', measure(lambda: [FileUniqueId.from_file_id(file_id).to_unique_id() for file_id in batch], number=3) / per_id)
+    report('file_id_to_unique_id (per id)', measure(lambda: [file_id_to_unique_id(file_id) for file_id in batch], number=3) / per_id)
+    try:
+        from tg_file_id.batch import FileIdBatch
+    except ImportError:
+        print('numpy not installed, skipping FileIdBatch')
+        return
+    # end try
+    columns = FileIdBatch.from_file_ids(batch)
+    report('FileIdBatch.to_unique_ids (per id)', measure(columns.to_unique_ids, number=3) / per_id)
+    report('from_file_ids().to_unique_ids() (per id)', measure(lambda: FileIdBatch.from_file_ids(batch).to_unique_ids(), number=3) / per_id)
+# end def
+
+
+if __name__ == '__main__':
+    main()
+# end if
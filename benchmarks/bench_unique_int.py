@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sets of file_unique_ids as strings, as `FileUniqueId.to_int` ints, and as a uint64 array:
+the memory they hold, building them and looking ids up.
+
+    python -m benchmarks.bench_unique_int
+"""
+import gc
+import tracemalloc
+
+from tg_file_id.file_unique_id import FileUniqueId, int_to_unique_id, unique_id_to_int
+from tg_file_id.generate import FileIdGenerator
+from benchmarks._common import measure, report
+
+__author__ = 'luckydonald'
+
+
+COUNT = 100000
+
+
+def traced(build) -> float:
+    """ Calls `build`, keeping its result alive, and returns the traced memory per id. """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return (after - before) / COUNT
+# end def
+
+
+def main():
+    # copies, so the strings are new objects like ones read from a file or the api, not the generator's.
+    unique_ids = [unique_id[:1] + unique_id[1:] for unique_id in FileIdGenerator(20).strings(COUNT, unique=True)]
+    ints = [unique_id_to_int(unique_id) for unique_id in unique_ids]
+    print(f'set of strings (incl. the strings)  {traced(lambda: set(unique_id[:1] + unique_id[1:] for unique_id in unique_ids)):8.1f} bytes/id')
+    print(f'set of ints (incl. the ints)        {traced(lambda: set(unique_id_to_int(unique_id) for unique_id in unique_ids)):8.1f} bytes/id')
+
+    sample = unique_ids[:1000]
+    report('unique_id_to_int (per id)', measure(lambda: [unique_id_to_int(unique_id) for unique_id in sample], number=20) / len(sample))
+    report('from_unique_id().to_int() (per id)', measure(lambda: [FileUniqueId.from_unique_id(unique_id).to_int() for unique_id in sample], number=20) / len(sample))
+    report('int_to_unique_id (per id)', measure(lambda: [int_to_unique_id(value) for value in ints[:1000]], number=20) / len(sample))
+
+    strings = set(unique_ids)
+    numbers = set(ints)
+    lookups = [unique_id[:1] + unique_id[1:] for unique_id in sample]  # new objects, their hash isn't cached yet on the first run
+    report('lookup in set of strings (per id)', measure(lambda: [unique_id in strings for unique_id in lookups], number=20) / len(sample))
+    report('lookup in set of ints (per id)', measure(lambda: [value in numbers for value in ints[:1000]], number=20) / len(sample))
+
+    try:
+        import numpy as np
+        from tg_file_id.batch import unique_ids_to_uint64
+    except ImportError:
+        print('numpy not installed, skipping unique_ids_to_uint64')
+        return
+    # end try
+    print(f'uint64 array, np.unique             {traced(lambda: np.unique(unique_ids_to_uint64(unique_ids), axis=0)):8.1f} bytes/id')
+    report('unique_ids_to_uint64 (per id)', measure(lambda: unique_ids_to_uint64(unique_ids), number=1, repeat=3) / COUNT)
+# end def
+
+
+if __name__ == '__main__':
+    main()
+# end if
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Auditing Bot API updates with `tg_file_id.updates.extract`: walking the JSON, decoding and checking the file_unique_ids.
+
+    python -m benchmarks.bench_updates
+"""
+import json
+
+from tg_file_id.file_unique_id import FileUniqueId
+from tg_file_id.generate import FileIdGenerator
+from tg_file_id.updates import extract, iter_file_id_fields
+from benchmarks._common import measure, report
+
+__author__ = 'luckydonald'
+
+
+def main():
+    photos = list(FileIdGenerator(24, types={2: 1}).strings(3000))
+    documents = list(FileIdGenerator(25, types={5: 1, 8: 1}).strings(1000))
+    updates = []
+    for n in range(1000):
+        sizes = photos[n * 3:n * 3 + 3]
+        updates.append({
+            'update_id': n,
+            'message': {
+                'message_id': n, 'chat': {'id': 1, 'type': 'private'}, 'text': 'x' * 50,
+                'photo': [{'file_id': file_id, 'file_unique_id': FileUniqueId.from_file_id(file_id).to_unique_id(), 'width': 90, 'height': 90} for file_id in sizes],
+                'document': {'file_id': documents[n], 'file_unique_id': FileUniqueId.from_file_id(documents[n]).to_unique_id(), 'file_name': 'a.pdf'},
+            },
+        })
+    # end for
+    texts = [json.dumps(update) for update in updates]
+    per_file_id = len(updates) * 4
+    report('iter_file_id_fields (per file_id)', measure(lambda: [field for update in updates for field in iter_file_id_fields(update)], number=5) / per_file_id)
+    report('extract, parsed (per file_id)', measure(lambda: list(extract(updates)), number=5) / per_file_id)
+    report('extract, JSON text (per file_id)', measure(lambda: list(extract(texts)), number=5) / per_file_id)
+# end def
+
+
+if __name__ == '__main__':
+    main()
+# end if
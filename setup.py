@@ -60,9 +60,13 @@ setup(
     # requirements files see:
     # https://packaging.python.org/en/latest/requirements.html
     install_requires=[
-        "luckydonald-utils>=0.73",  # general utils
+        # none, the codec only needs the standard library.
         # "pytgbot>=4.1.1",  # telegram communication
-    ]
+    ],
+    extras_require={
+        'numpy': ['numpy'],  # tg_file_id.batch
+        'test': ['luckydonald-utils>=0.73'],  # the tests, and running tg_file_id/utils.py directly
+    },
     # List additional groups of dependencies here (e.g. development dependencies).
     # You can install these using the following syntax, for example:
     # $ pip install -e .[dev,test]
@@ -84,4 +88,9 @@ setup(
     # To provide executable scripts, use entry points in preference to the
     # "scripts" keyword. Entry points provide cross-platform support and allow
     # pip to create the appropriate form of executable for the target platform.
+    entry_points={
+        'console_scripts': [
+            'tg-file-id = tg_file_id.cli:main',  # same as python -m tg_file_id
+        ],
+    },
 )
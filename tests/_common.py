@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+The real world file_ids the tests (and `benchmarks`) run on, and assertions for comparing decoded ones.
+"""
+import unittest
+from typing import Dict, List, Tuple
+
+from tg_file_id.file_id import PhotoFileId
+
+__author__ = 'luckydonald'
+
+
+SAMPLE_FILE_IDS: Dict[Tuple[str, Tuple[int, int]], str] = {
+    ('document', (2, 0)): 'CAADBAADwwADmFmqDf6xBrPTReqHAg',
+    ('document', (4, 22)): 'CAADBAADwwADmFmqDf6xBrPTReqHFgQ',
+    ('document', (4, 27)): 'CAACAgQAAxkBAAIC4l9CWDGzVUcDejU0TETLWbOdfsCoAALDAAOYWaoN_rEGs9NF6ocbBA',
+    ('document', (4, 30)): 'CAACAgQAAxkBAAIE4V-nVmlwWzNxKeRGZYjG0m7UWm0IAALDAAOYWaoN_rEGs9NF6oceBA',
+    ('photo', (2, 0)): 'AgADAgADRaoxG64rCUlfm3fj3nihW3PHUQ8ABLefjdP8kuxqa7ABAAEC',
+    ('photo', (4, 22)): 'AgADAgADRaoxG64rCUlfm3fj3nihW3PHUQ8ABAEAAwIAA3gAA2uwAQABFgQ',
+    ('photo', (4, 27)): 'AgACAgIAAxkBAAIBp19C0Fkv9R4D-TriZLzK7vBUw-DrAAJFqjEbrisJSV-bd-PeeKFbc8dRDwAEAQADAgADbQADbbABAAEbBA',
+    ('photo', (4, 30)): 'AgACAgIAAxkBAAIE3V-nVPRnkcGnCW8Vd53VQgouUt60AAJFqjEbrisJSV-bd-PeeKFbc8dRDwAEAQADAgADeAADa7ABAAEeBA',
+}
+""" One real world file_id per (type family, (version, sub_version)). """
+
+FILE_IDS: List[str] = list(SAMPLE_FILE_IDS.values())
+""" All of `SAMPLE_FILE_IDS`, the documents first, each oldest version first """
+
+
+class FileIdTestCase(unittest.TestCase):
+    def assertSameFileId(self, expected, actual, msg=None):
+        """ Asserts two decoded file_ids are of the same class and have the same fields, including the file_reference and photosize. """
+        self.assertIs(type(expected), type(actual), msg=msg)
+        self.assertEqual(repr(expected), repr(actual), msg=msg)
+        self.assertEqual(expected.file_reference, actual.file_reference, msg=msg)
+        if isinstance(expected, PhotoFileId):
+            self.assertEqual(repr(expected.photosize), repr(actual.photosize), msg=msg)
+        # end if
+    # end def
+# end class
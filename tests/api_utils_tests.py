@@ -7,7 +7,7 @@ from luckydonaldUtils.encoding import to_binary
 from tg_file_id.file_id import (
     FileId, DocumentFileId, PhotoFileId,
 )
-from tg_file_id.utils import base64url_decode, base64url_encode, rle_decode, rle_encode
+from tg_file_id.utils import base64url_decode, base64url_encode, rle_decode, rle_encode, pack_tl_string, unpack_tl_string_from
 from tg_file_id.file_unique_id import FileUniqueId
 
 
@@ -302,6 +302,18 @@ class MyTestCase(unittest.TestCase):
         self.assertEqual(expected, result)
     # end def
 
+    def test_unpack_tl_string_from(self):
+        for length in (0, 1, 3, 4, 253, 254, 300):
+            string = bytes(range(length % 256)) * (length // 256) + bytes(range(length % 256))
+            string = string[:length]
+            packed = b'\xff\xff' + pack_tl_string(string) + b'\x01'
+            result, offset = unpack_tl_string_from(memoryview(packed), 2)
+            self.assertEqual(string, result, msg=f'length = {length!r}')
+            self.assertEqual(len(packed) - 1, offset, msg=f'length = {length!r}')
+            self.assertEqual(0, (offset - 2) % 4, msg=f'length = {length!r}')
+        # end for
+    # end def
+
     def test_user_ids(self):
         #https://getstickers.me/sticker/test4458pack/CAADAgAD1AkAAgKLowABByoNoHLboHEC/
         test_data = {
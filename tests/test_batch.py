@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import random
+import struct
+import unittest
+import warnings
+
+import numpy as np
+
+from tg_file_id.file_id import FileId
+from tg_file_id.file_unique_id import FileUniqueId, int_to_unique_id, unique_id_to_int
+from tg_file_id.batch import FileIdBatch, unique_ids_to_uint64, uint64_to_unique_ids
+from tg_file_id.generate import FileIdGenerator
+from tg_file_id.utils import base64url_decode, base64url_encode, rle_decode, rle_encode
+from tests._common import FILE_IDS, SAMPLE_FILE_IDS
+
+__author__ = 'luckydonald'
+
+
+MORE_FILE_IDS = FILE_IDS + [
+    'BQADAgAD3AkAAgKLowABKlAd1pemg-gC',  # a document which isn't a sticker
+    'AgACAgIAAxkBAAIE2F-nHvTX7tX2Hg946DOPJWEahhgUAAI1sDEbClw4SX8n9AqBZEu9FpVJli4AAwEAAwIAA3gAA-YMBAABHgQ',
+]
+
+
+class TestFileIdBatch(unittest.TestCase):
+    def test_columns(self):
+        batch = FileIdBatch.from_file_ids(MORE_FILE_IDS)
+        self.assertEqual(len(MORE_FILE_IDS), len(batch))
+        for index, file_id in enumerate(MORE_FILE_IDS):
+            expected = FileId.from_file_id(file_id)
+            self.assertEqual(expected.type_id, batch.type_id[index], msg=file_id)
+            self.assertEqual(expected.dc_id, batch.dc_id[index], msg=file_id)
+            self.assertEqual(expected.id, batch.id[index], msg=file_id)
+            self.assertEqual(expected.access_hash, batch.access_hash[index], msg=file_id)
+            self.assertEqual(expected.version, batch.version[index], msg=file_id)
+            self.assertEqual(expected.sub_version, batch.sub_version[index], msg=file_id)
+            self.assertEqual(expected.has_reference, batch.has_reference[index], msg=file_id)
+            self.assertEqual(expected.file_reference, batch.file_reference(index), msg=file_id)
+            self.assertEqual(expected.type_detailed, batch.type_detailed[index], msg=file_id)
+            self.assertEqual(expected.type_generic, batch.type_generic[index], msg=file_id)
+            self.assertEqual(repr(expected.photosize) if expected.type_generic == 'photo' else None, repr(batch[index].photosize) if expected.type_generic == 'photo' else None, msg=file_id)
+            self.assertEqual(repr(expected).replace(repr(file_id), 'None'), repr(batch[index]), msg=file_id)
+            owner_id = batch.owner_id[index]
+            self.assertEqual(expected.owner_id, None if owner_id is np.ma.masked else owner_id, msg=file_id)
+        # end for
+    # end def
+
+    def test_to_file_ids(self):
+        batch = FileIdBatch.from_file_ids(MORE_FILE_IDS)
+        self.assertEqual(MORE_FILE_IDS, batch.to_file_ids())
+    # end def
+
+    def test_to_file_ids_version(self):
+        batch = FileIdBatch.from_file_ids(MORE_FILE_IDS[:4])
+        self.assertEqual([SAMPLE_FILE_IDS[('document', (2, 0))]] * 2, batch.to_file_ids(version=2)[:2])
+        self.assertEqual([SAMPLE_FILE_IDS[('document', (4, 22))]] * 2, batch.to_file_ids(version=4, sub_version=22)[:2])
+        photos = FileIdBatch.from_file_ids(MORE_FILE_IDS[-3:])
+        with self.assertRaises(ValueError):
+            photos.to_file_ids(version=2)  # the thumbnail photosize source doesn't exist in version 2
+        # end with
+    # end def
+
+    def test_to_unique_ids(self):
+        expected = [FileUniqueId.from_file_id(file_id).to_unique_id() for file_id in MORE_FILE_IDS]
+        self.assertEqual(expected, FileIdBatch.from_file_ids(MORE_FILE_IDS).to_unique_ids())
+        self.assertEqual(expected, FileIdBatch.from_file_ids(np.array(MORE_FILE_IDS)).to_unique_ids())
+        self.assertEqual(['AgADBAsAAgKLowAB'], FileIdBatch.from_file_ids(['CAACAgIAAxkBAAIEol9yQhBqFnT4HXldAh31a-hYXuDIAAIECwACAoujAAFFn1sl9AABHbkbBA']).to_unique_ids())
+        # all rows are encoded at once, the \0 runs of one must not run into the next.
+        rng = random.Random(5)
+        batch = FileIdBatch.from_file_ids(MORE_FILE_IDS * 200)
+        for column in (batch.id, batch.volume_id, batch.location_local_id):
+            column[:] = [rng.choice((0, 1, -1, 255 << 8 * rng.randrange(3))) for _ in range(len(batch))]
+        # end for
+        self.assertEqual([FileUniqueId.from_file_id(batch[index]).to_unique_id() for index in range(len(batch))], batch.to_unique_ids())
+    # end def
+
+    def test_to_unique_ids_malformed(self):
+        # invalid types, and mutated ids, the same as the object path, or a ValueError where that raises one.
+        rng = random.Random(505)
+        file_ids = [
+            base64url_encode(rle_encode(struct.pack('<LLqq', type_id, 2, -1234, 5678) + b'\x02'))
+            for type_id in list(range(FileId.TYPE_NONE + 2)) + [1 << 20]
+        ]
+        for file_id in FileIdGenerator(505).strings(300):
+            data = bytearray(rle_decode(base64url_decode(file_id)))
+            data[rng.randrange(len(data))] = rng.randrange(256)
+            file_ids.append(base64url_encode(rle_encode(bytes(data))))
+        # end for
+        checked = 0
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')  # unsupported versions
+            for file_id in file_ids:
+                try:
+                    decoded = FileId.from_file_id(file_id)
+                    expected = FileUniqueId.from_file_id(file_id).to_unique_id()
+                except ValueError:
+                    expected = None
+                # end try
+                if expected is None or decoded.has_web_location:  # batches don't support those
+                    with self.assertRaises(ValueError, msg=file_id):
+                        FileIdBatch.from_file_ids([file_id]).to_unique_ids()
+                    # end with
+                    continue
+                # end if
+                checked += 1
+                self.assertEqual([expected], FileIdBatch.from_file_ids([file_id]).to_unique_ids(), msg=file_id)
+                self.assertEqual(unique_id_to_int(expected), int.from_bytes(FileIdBatch.from_file_ids([file_id]).to_unique_uint64().astype('>u8').tobytes(), 'big'))
+            # end for
+        # end with
+        self.assertGreater(checked, 100)
+
+        # columns set directly, not by from_file_ids.
+        for type_id in (11, 12, 40):
+            batch = FileIdBatch.from_file_ids(MORE_FILE_IDS)
+            batch.type_id[0] = type_id
+            for convert in (batch.to_unique_ids, batch.to_unique_uint64):
+                with self.assertRaisesRegex(ValueError, f'Type has no file_unique_id: {type_id}'):
+                    convert()
+                # end with
+            # end for
+        # end for
+    # end def
+
+    def test_invalid_type(self):
+        for type_id in (6, 7, 11, 12, 14, 15, 16, 17, 18, 19, 3158575368 & ~(FileId.TYPE_ID_FILE_REFERENCE_FLAG | FileId.TYPE_ID_WEB_LOCATION_FLAG)):
+            file_id = base64url_encode(rle_encode(struct.pack('<LLqq', type_id, 2, 1234, 5678) + b'\x02'))
+            with self.assertRaisesRegex(ValueError, f'Type is invalid: {type_id}'):
+                FileIdBatch.from_file_ids(MORE_FILE_IDS + [file_id])
+            # end with
+        # end for
+    # end def
+
+    def test_unique_uint64(self):
+        unique_ids = [FileUniqueId.from_file_id(file_id).to_unique_id() for file_id in MORE_FILE_IDS]
+        packed = unique_ids_to_uint64(unique_ids)
+        self.assertEqual((len(unique_ids), 2), packed.shape)
+        self.assertEqual(np.uint64, packed.dtype)
+        self.assertEqual([unique_id_to_int(unique_id) for unique_id in unique_ids], [int(hi) << 64 | int(lo) for hi, lo in packed.tolist()])
+        self.assertTrue((packed == FileIdBatch.from_file_ids(MORE_FILE_IDS).to_unique_uint64()).all())
+        self.assertEqual(unique_ids, uint64_to_unique_ids(packed))
+        self.assertEqual(len(set(unique_ids)), len(np.unique(packed, axis=0)))
+
+        # \0 runs reaching the end of a row, or the start of the next one.
+        zeros = np.array([
+            [FileUniqueId.TYPE_PHOTO << 56, 0], [FileUniqueId.TYPE_DOCUMENT << 56, 0], [FileUniqueId.TYPE_PHOTO << 56 | 1, 1 << 56],
+            [FileUniqueId.TYPE_DOCUMENT << 56, 255], [FileUniqueId.TYPE_PHOTO << 56 | 1 << 24, 0], [FileUniqueId.TYPE_TEMP << 56, 0],
+        ], dtype=np.uint64)
+        self.assertEqual([int_to_unique_id(int(hi) << 64 | int(lo)) for hi, lo in zeros.tolist()], uint64_to_unique_ids(zeros))
+
+        web = FileUniqueId(type_id=FileUniqueId.TYPE_WEB, url='https://example.com/image.png').to_unique_id()
+        with self.assertRaises(ValueError):
+            unique_ids_to_uint64(unique_ids + [web])
+        # end with
+        with self.assertRaises(ValueError):
+            uint64_to_unique_ids(np.array([[FileUniqueId.TYPE_WEB << 56, 0]], dtype=np.uint64))
+        # end with
+    # end def
+
+    def test_empty(self):
+        batch = FileIdBatch.from_file_ids([])
+        self.assertEqual(0, len(batch))
+        self.assertEqual([], batch.to_file_ids())
+        self.assertEqual([], batch.to_unique_ids())
+        self.assertEqual((0, 2), batch.to_unique_uint64().shape)
+        self.assertEqual((0, 2), unique_ids_to_uint64([]).shape)
+    # end def
+# end class
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
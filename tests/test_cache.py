@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import struct
+import unittest
+
+from tg_file_id.cache import DecodeCache
+from tg_file_id.file_id import DocumentFileId, FileId, PhotoFileId
+from tg_file_id.file_unique_id import FileUniqueId
+from tg_file_id.policy import DecodePolicy
+from tg_file_id.utils import base64url_encode, rle_encode
+from tests._common import SAMPLE_FILE_IDS, FileIdTestCase
+
+__author__ = 'luckydonald'
+
+
+class FakeTimer(object):
+    def __init__(self):
+        self.now = 0.0
+    # end def
+
+    def __call__(self) -> float:
+        return self.now
+    # end def
+# end class
+
+
+class TestDecodeCache(FileIdTestCase):
+    STICKER = SAMPLE_FILE_IDS[('document', (2, 0))]
+    PHOTO = SAMPLE_FILE_IDS[('photo', (2, 0))]
+    UNIQUE = 'AgADBAsAAgKLowAB'
+
+    def test_hits_and_misses(self):
+        cache = DecodeCache(maxsize=10)
+        first = cache.from_file_id(self.STICKER)
+        second = cache.from_file_id(self.STICKER)
+        self.assertEqual(1, cache.misses)
+        self.assertEqual(1, cache.hits)
+        self.assertSameFileId(FileId.from_file_id(self.STICKER), first)
+        self.assertSameFileId(first, second)
+
+        unique = cache.from_unique_id(self.UNIQUE)
+        self.assertEqual(FileUniqueId.from_unique_id(self.UNIQUE).id, unique.id)
+        self.assertEqual(2, cache.misses)
+        self.assertEqual(2, len(cache))
+    # end def
+
+    def test_copies(self):
+        cache = DecodeCache(maxsize=10)
+        sticker = cache.from_file_id(self.STICKER)
+        sticker.change_type(FileId.TYPE_DOCUMENT)
+        self.assertEqual(FileId.TYPE_STICKER, cache.from_file_id(self.STICKER).type_id)
+
+        photo: PhotoFileId = cache.from_file_id(self.PHOTO)
+        photo.photosize.volume_id = 0
+        self.assertEqual(257017715, cache.from_file_id(self.PHOTO).photosize.volume_id)
+    # end def
+
+    def test_lru_eviction(self):
+        cache = DecodeCache(maxsize=2)
+        cache.from_file_id(self.STICKER)
+        cache.from_file_id(self.PHOTO)
+        cache.from_file_id(self.STICKER)  # sticker is now the most recently used one
+        cache.from_unique_id(self.UNIQUE)  # evicts the photo
+        self.assertEqual(1, cache.evictions)
+        self.assertEqual(2, len(cache))
+        cache.from_file_id(self.STICKER)
+        self.assertEqual(2, cache.hits)
+        cache.from_file_id(self.PHOTO)
+        self.assertEqual(4, cache.misses)
+    # end def
+
+    def test_ttl(self):
+        timer = FakeTimer()
+        cache = DecodeCache(maxsize=10, ttl=60, timer=timer)
+        cache.from_file_id(self.STICKER)
+        timer.now = 59
+        cache.from_file_id(self.STICKER)
+        self.assertEqual(1, cache.hits)
+        timer.now = 60
+        cache.from_file_id(self.STICKER)
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(2, cache.misses)
+        self.assertEqual(1, cache.expirations)
+    # end def
+
+    def test_policy_on_hits(self):
+        unsupported = DocumentFileId.from_file_id(self.STICKER).calculate_file_id(version=4, sub_version=99, policy=DecodePolicy(DecodePolicy.SILENT))
+        leftover = base64url_encode(rle_encode(struct.pack('<LLqq', FileId.TYPE_DOCUMENT, 2, 1, 2) + b'\xff\xff\x16\x04'))
+        cache = DecodeCache(maxsize=10)
+        policy = DecodePolicy(DecodePolicy.SILENT)
+        for _ in range(3):
+            cache.from_file_id(unsupported, policy=policy)
+            cache.from_file_id(leftover, policy=policy)
+            cache.from_file_id(self.STICKER, policy=policy)
+        # end for
+        self.assertEqual((3, 6), (cache.misses, cache.hits))
+        self.assertEqual({(4, 99): 3}, dict(policy.unsupported_versions))
+        self.assertEqual((3, 6), (policy.leftover_count, policy.leftover_bytes))
+        for file_id in (unsupported, leftover):
+            with self.assertRaises(ValueError, msg=file_id):
+                cache.from_file_id(file_id, policy=DecodePolicy(DecodePolicy.STRICT))  # a hit
+            # end with
+        # end for
+    # end def
+# end class
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
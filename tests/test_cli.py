@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+
+from tg_file_id.cli import audit, main, run
+from tg_file_id.file_id import FileId
+from tg_file_id.file_unique_id import FileUniqueId
+from tg_file_id.generate import FileIdGenerator
+from tests._common import SAMPLE_FILE_IDS
+
+__author__ = 'luckydonald'
+
+
+class TestCli(unittest.TestCase):
+    FILE_IDS = list(FileIdGenerator(23).strings(300))
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'file_ids.txt.gz')
+        with gzip.open(self.path, 'wt') as f:
+            f.write('\n'.join(self.FILE_IDS[:150] + ['', 'not a file_id'] + self.FILE_IDS[150:]) + '\n')
+        # end with
+    # end def
+
+    def tearDown(self):
+        self.directory.cleanup()
+    # end def
+
+    def run_command(self, command: str, output_format: str = 'jsonl', **kwargs):
+        output = io.StringIO()
+        failed = run(command, [self.path], output, output_format=output_format, chunksize=40, **kwargs)
+        return failed, output.getvalue()
+    # end def
+
+    def test_decode(self):
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                failed, text = self.run_command('decode', jobs=jobs)
+                rows = [json.loads(line) for line in text.splitlines()]
+                self.assertEqual(1, failed)
+                self.assertEqual(self.FILE_IDS[:150] + ['not a file_id'] + self.FILE_IDS[150:], [row['file_id'] for row in rows])
+                self.assertIn('error', rows[150])
+                for row in rows[:150]:
+                    expected = FileId.from_file_id(row['file_id'])
+                    self.assertEqual((expected.type_id, expected.id, expected.version, expected.sub_version), (row['type_id'], row['id'], row['version'], row['sub_version']))
+                # end for
+            # end with
+        # end for
+    # end def
+
+    def test_unique_csv(self):
+        failed, text = self.run_command('unique', 'csv')
+        rows = list(csv.DictReader(io.StringIO(text)))
+        self.assertEqual(1, failed)
+        self.assertEqual(
+            [FileUniqueId.from_file_id(file_id).to_unique_id() for file_id in self.FILE_IDS],
+            [row['file_unique_id'] for row in rows if not row['error']],
+        )
+    # end def
+
+    def test_reencode_and_peek_tsv(self):
+        documents = [file_id for file_id in self.FILE_IDS if FileId.from_file_id(file_id).type_generic == 'document']
+        with open(self.path, 'w') as f:
+            f.write('\n'.join(documents))
+        # end with
+        failed, text = self.run_command('reencode', 'tsv', version=2, sub_version=None)
+        lines = text.splitlines()
+        self.assertEqual((0, 'file_id\tnew_file_id\terror'), (failed, lines[0]))
+        for line, file_id in zip(lines[1:], documents):
+            old, new, error = line.split('\t')
+            self.assertEqual((file_id, ''), (old, error))
+            self.assertEqual((2, 0), (FileId.from_file_id(new).version, FileId.from_file_id(new).sub_version))
+        # end for
+
+        failed, text = self.run_command('reencode')  # without a version given: to the latest one
+        self.assertEqual(0, failed)
+        for row in map(json.loads, text.splitlines()):
+            self.assertEqual(FileId.MAX_VERSION, FileId.peek(row['new_file_id'] or row['file_id'])[4:])
+        # end for
+
+        failed, text = self.run_command('peek', 'tsv')
+        self.assertEqual(len(documents) + 1, len(text.splitlines()))
+        self.assertEqual(f'{documents[0]}\t' + '\t'.join(str(value) for value in FileId.peek(documents[0])) + '\t', text.splitlines()[1])
+    # end def
+
+    def test_stats(self):
+        failed, text = self.run_command('stats', jobs=2)
+        counts = {(row['group'], row['key']): row['count'] for row in map(json.loads, text.splitlines())}
+        self.assertEqual(1, failed)
+        self.assertEqual((300, 1), (counts['total', 'ok'], counts['total', 'failed']))
+        self.assertEqual(300, sum(count for (group, _), count in counts.items() if group == 'version'))
+    # end def
+
+    def test_json_lines(self):
+        with gzip.open(self.path, 'wt') as f:
+            f.write(''.join(json.dumps({'file_id': file_id, 'chat_id': 1}) + '\n' for file_id in self.FILE_IDS))
+        # end with
+        failed, text = self.run_command('unique', 'tsv', key='file_id')
+        self.assertEqual(0, failed)
+        self.assertEqual(FileUniqueId.from_file_id(self.FILE_IDS[0]).to_unique_id(), text.splitlines()[1].split('\t')[1])
+        self.assertEqual(301, len(text.splitlines()))
+    # end def
+
+    def test_main(self):
+        output = os.path.join(self.directory.name, 'unique.jsonl')
+        self.assertEqual(1, main(['unique', self.path, '-o', output]))
+        with open(output) as f:
+            self.assertEqual(301, len(f.read().splitlines()))
+        # end with
+        self.assertEqual(2, main(['unique', self.path, '-o', output, '--on-error', 'raise']))
+        with redirect_stderr(io.StringIO()) as stderr:
+            self.assertEqual(2, main(['reencode', self.path, '-o', output, '--version', '4', '--sub-version', '99']))
+        # end with
+        self.assertIn('Unsupported target', stderr.getvalue())
+    # end def
+
+    def test_reencode_errors(self):
+        failed, text = self.run_command('reencode', version=2)
+        rows = list(map(json.loads, text.splitlines()))
+        self.assertEqual(sum(1 for row in rows if 'error' in row), failed)
+        self.assertEqual('not a file_id', rows[150]['file_id'])
+        self.assertNotIn('new_file_id', rows[150])
+        for row in rows:
+            if 'error' not in row:
+                self.assertEqual((2, 0), FileId.peek(row['new_file_id'])[4:])
+            # end if
+        # end for
+    # end def
+
+    def test_generate(self):
+        output = os.path.join(self.directory.name, 'generated.txt')
+        self.assertEqual(0, main(['generate', '50', '-o', output, '--seed', '7', '--versions', '4.30:9,2.0', '--types', '8', '--file-reference-lengths', '0']))
+        with open(output) as f:
+            lines = f.read().splitlines()
+        # end with
+        expected = FileIdGenerator(7, versions={(4, 30): 9, (2, 0): 1}, types={FileId.TYPE_STICKER: 1}, file_reference_lengths={0: 1})
+        self.assertEqual(list(expected.strings(50)), lines)
+    # end def
+
+    def test_audit(self):
+        sticker = SAMPLE_FILE_IDS[('document', (4, 30))]
+        updates = [
+            {'update_id': 1, 'message': {'sticker': {'file_id': sticker, 'file_unique_id': FileUniqueId.from_file_id(sticker).to_unique_id()}}},
+            {'update_id': 2, 'message': {'sticker': {'file_id': sticker, 'file_unique_id': 'AgADBAsAAgKLowAB'}}},
+            {'update_id': 3, 'message': {'document': {'file_id': 'garbage', 'file_unique_id': 'x'}}},
+        ]
+        with gzip.open(self.path, 'wt') as f:
+            f.write(''.join(json.dumps(update) + '\n' for update in updates))
+        # end with
+        output = os.path.join(self.directory.name, 'problems.jsonl')
+        with redirect_stderr(io.StringIO()) as stderr:
+            self.assertEqual(1, main(['audit', self.path, '-o', output]))
+        # end with
+        self.assertIn('mismatched=1', stderr.getvalue())
+        with open(output) as f:
+            problems = [json.loads(line) for line in f]
+        # end with
+        self.assertEqual(
+            [(1, '$.message.sticker.file_id', False, False), (2, '$.message.document.file_id', None, True)],
+            [(problem['index'], problem['path'], problem['matches'], problem['error'] is not None) for problem in problems],
+        )
+        output = io.StringIO()
+        stats = audit([self.path], output, write_all=True, limit=2)
+        self.assertEqual((2, 2, 1, 1), (stats.updates, len(output.getvalue().splitlines()), stats.matched, stats.mismatched))
+    # end def
+# end class TestCli
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
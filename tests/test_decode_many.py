@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import unittest
+import warnings
+
+from tg_file_id.file_id import FileId, DocumentFileId, PhotoFileId
+from tg_file_id.file_unique_id import FileUniqueId
+from tg_file_id.policy import DecodePolicy
+from tests._common import FILE_IDS, SAMPLE_FILE_IDS, FileIdTestCase
+
+__author__ = 'luckydonald'
+
+
+class TestDecodeMany(FileIdTestCase):
+    def test_same_as_from_file_id(self):
+        results = FileId.decode_many(iter(FILE_IDS))
+        self.assertEqual(len(FILE_IDS), len(results))
+        for file_id, result in zip(FILE_IDS, results):
+            self.assertSameFileId(FileId.from_file_id(file_id), result, msg=file_id)
+        # end for
+    # end def
+
+    def test_on_error(self):
+        document = SAMPLE_FILE_IDS[('document', (4, 30))]
+        photo = SAMPLE_FILE_IDS[('photo', (4, 30))]
+        file_ids = [document, 'AAAA', photo]
+        with self.assertRaises(Exception):
+            FileId.decode_many(file_ids)
+        # end with
+
+        results = FileId.decode_many(file_ids, on_error='none')
+        self.assertIsInstance(results[0], DocumentFileId)
+        self.assertIsNone(results[1])
+        self.assertIsInstance(results[2], PhotoFileId)
+
+        results = FileId.decode_many(file_ids, on_error='pair')
+        self.assertIsInstance(results[0][0], DocumentFileId)
+        self.assertIsNone(results[0][1])
+        self.assertIsNone(results[1][0])
+        self.assertIsInstance(results[1][1], Exception)
+        self.assertIsInstance(results[2][0], PhotoFileId)
+
+        with self.assertRaises(ValueError):
+            FileId.decode_many(file_ids, on_error='ignore')
+        # end with
+    # end def
+
+    def test_warns_once(self):
+        file_id = DocumentFileId.from_file_id(SAMPLE_FILE_IDS[('document', (2, 0))]).to_file_id(version=4, sub_version=99)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            results = FileId.decode_many([file_id] * 10, policy=DecodePolicy())
+        # end with
+        self.assertEqual(10, len(results))
+        self.assertEqual(1, len(caught))
+    # end def
+
+    def test_unique_ids(self):
+        unique_ids = ['AgADBAsAAgKLowAB', 'AgADegAD997LEQ', 'AAAA']
+        results = FileUniqueId.decode_many(unique_ids, on_error='pair')
+        self.assertEqual(46033261910035204, results[0][0].id)
+        self.assertEqual(FileUniqueId.from_unique_id(unique_ids[1]).id, results[1][0].id)
+        self.assertIsNone(results[2][0])
+        self.assertIsInstance(results[2][1], Exception)
+    # end def
+# end class
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
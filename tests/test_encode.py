@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import unittest
+import warnings
+
+from tg_file_id.file_id import FileId, PhotoFileId
+from tg_file_id.policy import DecodePolicy
+from tests._common import FILE_IDS, SAMPLE_FILE_IDS
+
+__author__ = 'luckydonald'
+
+
+class TestEncode(unittest.TestCase):
+    def test_round_trip(self):
+        decoded = [FileId.from_file_id(file_id) for file_id in FILE_IDS]
+        for file_id, obj in zip(FILE_IDS, decoded):
+            self.assertEqual(file_id, obj.calculate_file_id(), msg=file_id)
+        # end for
+        self.assertEqual(FILE_IDS, FileId.encode_many(decoded))
+        self.assertEqual([], FileId.encode_many([]))
+    # end def
+
+    def test_legacy_photo_to_version_4(self):
+        photo = FileId.from_file_id(SAMPLE_FILE_IDS[('photo', (2, 0))])
+        converted = FileId.from_file_id(photo.calculate_file_id(version=4, sub_version=22))
+        self.assertEqual((4, 22), (converted.version, converted.sub_version))
+        self.assertIsInstance(converted.photosize, PhotoFileId.PhotosizeSourceLegacy)
+        for name in ('volume_id', 'location_local_id', 'secret'):
+            self.assertEqual(getattr(photo.photosize, name), getattr(converted.photosize, name), msg=name)
+        # end for
+        self.assertEqual((photo.id, photo.access_hash, photo.dc_id), (converted.id, converted.access_hash, converted.dc_id))
+        self.assertEqual(photo.to_file_id(), converted.calculate_file_id(version=2))
+    # end def
+
+    def test_to_version_2_has_no_sub_version(self):
+        document = FileId.from_file_id(SAMPLE_FILE_IDS[('document', (4, 30))])
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            converted = FileId.from_file_id(document.calculate_file_id(version=2))
+        # end with
+        self.assertEqual([], [str(warning.message) for warning in caught])
+        self.assertEqual((2, 0), (converted.version, converted.sub_version))
+        self.assertEqual(document.file_reference, converted.file_reference)
+        self.assertEqual((document.id, document.access_hash), (converted.id, converted.access_hash))
+    # end def
+
+    def test_photosize_not_in_version_2(self):
+        photo = FileId.from_file_id(SAMPLE_FILE_IDS[('photo', (4, 30))])
+        with self.assertRaises(ValueError):
+            photo.calculate_file_id(version=2)
+        # end with
+        with self.assertRaises(ValueError):
+            FileId.encode_many([photo], version=2)
+        # end with
+    # end def
+
+    def test_long_file_reference(self):
+        for length in (0, 1, 3, 4, 253, 254, 255, 1000):
+            document = FileId.from_file_id(SAMPLE_FILE_IDS[('document', (4, 30))])
+            document.file_reference = bytes(range(1, 256)) * 4 + b'\x00' * 20
+            document.file_reference = document.file_reference[:length]
+            converted = FileId.from_file_id(document.calculate_file_id())
+            self.assertEqual(document.file_reference or None, converted.file_reference, msg=f'length = {length}')
+            self.assertEqual(document.access_hash, converted.access_hash, msg=f'length = {length}')
+        # end for
+    # end def
+
+    def test_unsupported_version_policy(self):
+        documents = [FileId.from_file_id(SAMPLE_FILE_IDS[('document', (4, 22))])] * 10
+        policy = DecodePolicy()
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            FileId.encode_many(documents, version=4, sub_version=99, policy=policy)
+            documents[0].calculate_file_id(version=4, sub_version=99, policy=policy)
+        # end with
+        self.assertEqual(1, len(caught))
+        self.assertEqual({(4, 99): 11}, dict(policy.unsupported_versions))
+        strict = DecodePolicy(DecodePolicy.STRICT)
+        with self.assertRaises(ValueError):
+            documents[0].calculate_file_id(version=4, sub_version=99, policy=strict)
+        # end with
+        with self.assertRaises(ValueError):
+            FileId.encode_many(documents, version=4, sub_version=99, policy=strict)
+        # end with
+    # end def
+# end class
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
@@ -1,7 +1,10 @@
+import struct
 import unittest
 
 from tg_file_id.file_id import FileId
-from tg_file_id.file_unique_id import FileUniqueId
+from tg_file_id.file_unique_id import FileUniqueId, file_id_to_unique_id, int_to_unique_id, unique_id_to_int
+from tg_file_id.generate import FileIdGenerator
+from tg_file_id.utils import base64url_encode, rle_encode
 
 
 class MyTestCase(unittest.TestCase):
@@ -12,6 +15,83 @@ class MyTestCase(unittest.TestCase):
         self.assertEqual(expected, FileUniqueId.from_file_id(file_id_old).to_unique_id(), 'Old style file ID.')
         self.assertEqual(expected, FileUniqueId.from_file_id(file_id_new).to_unique_id(), 'Old style file ID.')
 
+    def test_file_id_to_unique_id(self):
+        file_ids = [
+            'CAADAQADegAD997LEUiQZafDlhIeAg',
+            'CAACAgEAAx0CVgtngQACAuFfU1GY9wiRG7A7jlIBbP2yvAostAACegAD997LEUiQZafDlhIeGwQ',
+            'CAACAgIAAxkBAAIEol9yQhBqFnT4HXldAh31a-hYXuDIAAIECwACAoujAAFFn1sl9AABHbkbBA',
+            'BQADAgAD3AkAAgKLowABKlAd1pemg-gC',
+            'AgADAgADRaoxG64rCUlfm3fj3nihW3PHUQ8ABLefjdP8kuxqa7ABAAEC',
+            'AgADAgADRaoxG64rCUlfm3fj3nihW3PHUQ8ABAEAAwIAA3gAA2uwAQABFgQ',
+            'AgACAgIAAxkBAAIBp19C0Fkv9R4D-TriZLzK7vBUw-DrAAJFqjEbrisJSV-bd-PeeKFbc8dRDwAEAQADAgADbQADbbABAAEbBA',
+            'AgACAgIAAxkBAAIE2F-nHvTX7tX2Hg946DOPJWEahhgUAAI1sDEbClw4SX8n9AqBZEu9FpVJli4AAwEAAwIAA3gAA-YMBAABHgQ',
+        ]
+        for file_id in file_ids:
+            self.assertEqual(FileUniqueId.from_file_id(file_id).to_unique_id(), file_id_to_unique_id(file_id), msg=f'file_id = {file_id!r}')
+        # end for
+        self.assertEqual('AgADBAsAAgKLowAB', file_id_to_unique_id(file_ids[2]))
+
+        # every type_id, in the document and the photo layout: the same result, or both a ValueError.
+        for type_id in range(FileId.TYPE_NONE + 3):
+            for payload in (
+                struct.pack('<qq', -1234, 5678) + b'\x02',  # document, version 2
+                struct.pack('<qqqLql', 1234, 5678, 91011, 0, 1213, -1415) + b'\x1e\x04',  # legacy photosize, version 4.30
+            ):
+                file_id = base64url_encode(rle_encode(struct.pack('<LL', type_id, 2) + payload))
+                try:
+                    expected = FileUniqueId.from_file_id(file_id).to_unique_id()
+                except ValueError:
+                    with self.assertRaisesRegex(ValueError, 'Type is invalid|Truncated', msg=f'type_id = {type_id}'):
+                        file_id_to_unique_id(file_id)
+                    # end with
+                    continue
+                # end try
+                self.assertEqual(expected, file_id_to_unique_id(file_id), msg=f'type_id = {type_id}')
+            # end for
+        # end for
+        for type_id in (6, 7, 11, 12, 14, 15, 16):
+            with self.assertRaisesRegex(ValueError, f'Type is invalid: {type_id}'):
+                file_id_to_unique_id(base64url_encode(rle_encode(struct.pack('<LLqq', type_id, 2, 1234, 5678) + b'\x1e\x04')))
+            # end with
+        # end for
+    # end def
+
+    def test_int(self):
+        unique_ids = ['AgADegAD997LEQ', 'AgADBAsAAgKLowAB'] + list(FileIdGenerator(20).strings(500, unique=True))
+        for unique_id in unique_ids:
+            decoded = FileUniqueId.from_unique_id(unique_id)
+            value = decoded.to_int()
+            self.assertEqual(value, unique_id_to_int(unique_id), msg=f'unique_id = {unique_id!r}')
+            self.assertEqual(unique_id, int_to_unique_id(value), msg=f'unique_id = {unique_id!r}')
+            from_int = FileUniqueId.from_int(value)
+            self.assertEqual((decoded.type_id, decoded.id, decoded.volume_id, decoded.local_id), (from_int.type_id, from_int.id, from_int.volume_id, from_int.local_id))
+            self.assertLess(value, 1 << 128)
+        # end for
+        self.assertEqual(len(set(unique_ids)), len({unique_id_to_int(unique_id) for unique_id in unique_ids}))
+        self.assertEqual(FileUniqueId.TYPE_DOCUMENT << 120 | 0x11CBDEF7_0000007A, unique_id_to_int('AgADegAD997LEQ'))
+    # end def
+
+    def test_int_invalid(self):
+        web = FileUniqueId(type_id=FileUniqueId.TYPE_WEB, url='https://example.com/image.png')
+        with self.assertRaises(ValueError):
+            web.to_int()
+        # end with
+        with self.assertRaises(ValueError):
+            unique_id_to_int(web.to_unique_id())
+        # end with
+        for value in (-1, 1 << 128, 9 << 120, FileUniqueId.TYPE_WEB << 120, FileUniqueId.TYPE_DOCUMENT << 120 | 1 << 64, FileUniqueId.TYPE_PHOTO << 120 | 1 << 100):
+            with self.subTest(value=hex(value)):
+                with self.assertRaises(ValueError):
+                    FileUniqueId.from_int(value)
+                # end with
+                with self.assertRaises(ValueError):
+                    int_to_unique_id(value)
+                # end with
+            # end with
+        # end for
+    # end def
+# end class
+
 
 if __name__ == '__main__':
     unittest.main()
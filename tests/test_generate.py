@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import io
+import unittest
+from collections import Counter
+
+from tg_file_id.file_id import FileId, DocumentFileId, PhotoFileId
+from tg_file_id.file_unique_id import FileUniqueId
+from tg_file_id.generate import FileIdGenerator
+
+__author__ = 'luckydonald'
+
+
+class TestFileIdGenerator(unittest.TestCase):
+    def test_same_seed_same_ids(self):
+        self.assertEqual(list(FileIdGenerator(42).strings(200)), list(FileIdGenerator(42).strings(200)))
+        self.assertNotEqual(list(FileIdGenerator(42).strings(200)), list(FileIdGenerator(43).strings(200)))
+        # chunking doesn't change anything
+        self.assertEqual(list(FileIdGenerator(42).strings(200)), list(FileIdGenerator(42).strings(200, chunk_size=7)))
+    # end def
+
+    def test_round_trip(self):
+        for file_id in FileIdGenerator(1).strings(2000):
+            decoded = FileId.from_file_id(file_id)
+            self.assertEqual(file_id, decoded.calculate_file_id())
+            self.assertEqual(FileUniqueId.from_file_id(decoded).to_unique_id(), FileUniqueId.from_file_id(file_id).to_unique_id())
+        # end for
+        for unique_id in FileIdGenerator(1).strings(500, unique=True):
+            self.assertEqual(unique_id, FileUniqueId.from_unique_id(unique_id).to_unique_id())
+        # end for
+    # end def
+
+    def test_covers_the_default_mix(self):
+        decoded = [FileId.from_file_id(file_id) for file_id in FileIdGenerator(2).strings(3000)]
+        self.assertEqual(set(FileId.SUPPORTED_VERSIONS), {(file_id.version, file_id.sub_version) for file_id in decoded})
+        photos = [file_id for file_id in decoded if isinstance(file_id, PhotoFileId) and file_id.version == 4]
+        self.assertEqual(set(PhotoFileId.PHOTOSIZE_SOURCES), {file_id.photosize.type_id for file_id in photos})
+        self.assertTrue(any(isinstance(file_id, DocumentFileId) for file_id in decoded))
+        self.assertFalse(any(file_id.has_reference for file_id in decoded if file_id.version == 2))
+    # end def
+
+    def test_configured_mix(self):
+        generator = FileIdGenerator(
+            3,
+            types={FileId.TYPE_STICKER: 3, FileId.TYPE_PHOTO: 1},
+            versions={(4, 30): 1},
+            file_reference_lengths={7: 1},
+            photosize_sources={PhotoFileId.PHOTOSIZE_SOURCE_DIALOGPHOTO_BIG: 1, PhotoFileId.PHOTOSIZE_SOURCE_THUMBNAIL: 0},
+        )
+        decoded = [FileId.from_file_id(file_id) for file_id in generator.strings(1000)]
+        types = Counter(file_id.type_id for file_id in decoded)
+        self.assertEqual({FileId.TYPE_STICKER, FileId.TYPE_PHOTO}, set(types))
+        self.assertGreater(types[FileId.TYPE_STICKER], types[FileId.TYPE_PHOTO] * 2)
+        self.assertEqual({(4, 30)}, {(file_id.version, file_id.sub_version) for file_id in decoded})
+        self.assertEqual({7}, {len(file_id.file_reference) for file_id in decoded})
+        self.assertEqual(
+            {PhotoFileId.PHOTOSIZE_SOURCE_DIALOGPHOTO_BIG},
+            {file_id.photosize.type_id for file_id in decoded if isinstance(file_id, PhotoFileId)},
+        )
+    # end def
+
+    def test_invalid_mix(self):
+        for kwargs in (
+            dict(types={FileId.TYPE_NONE: 1}),
+            dict(versions={(3, 0): 1}),
+            dict(photosize_sources={9: 1}),
+            dict(file_reference_lengths={-1: 1}),
+            dict(types={FileId.TYPE_PHOTO: 0}),
+        ):
+            with self.subTest(**{key: repr(value) for key, value in kwargs.items()}), self.assertRaises(ValueError):
+                FileIdGenerator(**kwargs)
+            # end with
+        # end for
+    # end def
+
+    def test_write_and_stream(self):
+        file = io.StringIO()
+        self.assertEqual(25, FileIdGenerator(4).write(file, 25))
+        self.assertEqual(list(FileIdGenerator(4).strings(25)), file.getvalue().splitlines())
+
+        endless = FileIdGenerator(4).file_ids()
+        self.assertEqual(100, sum(1 for _, _ in zip(range(100), endless)))
+    # end def
+# end class TestFileIdGenerator
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import subprocess
+import sys
+import unittest
+
+__author__ = 'luckydonald'
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(statement: str):
+    """
+    Runs the import statement in a fresh interpreter with `-X importtime`,
+    and without `site`, so nothing outside the stdlib is importable besides this package.
+
+    :return: (module, self µs, cumulative µs) of every module imported.
+    """
+    result = subprocess.run(
+        [sys.executable, '-S', '-X', 'importtime', '-c', statement],
+        cwd=ROOT, env=dict(os.environ, PYTHONPATH=ROOT), capture_output=True, text=True, check=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        # end if
+        self_time, cumulative, name = line[len('import time:'):].split('|')
+        times.append((name.strip(), int(self_time), int(cumulative)))
+    # end for
+    return times
+# end def
+
+
+class TestImport(unittest.TestCase):
+    def test_codec_only_needs_the_stdlib(self):
+        times = import_times('import tg_file_id.file_id, tg_file_id.file_unique_id, tg_file_id.utils')
+        modules = {name for name, _, _ in times}
+        self.assertIn('tg_file_id.file_id', modules)
+        third_party = sorted(
+            name for name in modules
+            if name.split('.')[0] not in sys.stdlib_module_names and name.split('.')[0] != 'tg_file_id'
+        )
+        self.assertEqual([], third_party)
+        cumulative = {name: total for name, _, total in times}
+        # generous, only meant to catch something heavy being pulled in again.
+        self.assertLess(cumulative['tg_file_id.file_id'], 1000000, msg='importing tg_file_id.file_id takes more than a second')
+    # end def
+
+    def test_optional_modules_load_lazily(self):
+        modules = {name for name, _, _ in import_times('import tg_file_id.file_id, tg_file_id.file_unique_id, tg_file_id.policy')}
+        self.assertNotIn('numpy', modules)
+        self.assertNotIn('tg_file_id.batch', modules)
+        self.assertEqual([], sorted(name for name in modules if name.startswith('luckydonaldUtils')))
+    # end def
+# end class TestImport
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
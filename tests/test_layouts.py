@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import struct
+import unittest
+import warnings
+
+from tg_file_id.file_id import FileId, DocumentFileId, PhotoFileId, _LAYOUTS
+from tg_file_id.layouts import LAYOUTS, VERSIONS, layout_version_of, photosize_field_names
+from tg_file_id.policy import DecodePolicy
+from tg_file_id.utils import base64url_decode, rle_decode
+
+__author__ = 'luckydonald'
+
+
+class TestLayouts(unittest.TestCase):
+    def test_supported_versions(self):
+        self.assertEqual(tuple(sorted(VERSIONS)), FileId.SUPPORTED_VERSIONS)
+        self.assertEqual((4, 30), FileId.MAX_VERSION)
+        for layout_version in VERSIONS.values():
+            self.assertIn((layout_version, 'document', None), LAYOUTS)
+            self.assertIn((layout_version, 'photo', PhotoFileId.PHOTOSIZE_SOURCE_LEGACY), LAYOUTS)
+        # end for
+    # end def
+
+    def test_layout_version_of(self):
+        self.assertEqual(2, layout_version_of(2, 0))
+        self.assertEqual(4, layout_version_of(4, 30))
+        self.assertEqual(4, layout_version_of(4, 99))  # unknown, newest one
+        self.assertEqual(2, layout_version_of(3, 0))
+    # end def
+
+    def test_sizes(self):
+        self.assertEqual(16, _LAYOUTS[2, 'document', None].size)
+        self.assertEqual(36, _LAYOUTS[2, 'photo', PhotoFileId.PHOTOSIZE_SOURCE_LEGACY].size)
+        self.assertEqual(40, _LAYOUTS[4, 'photo', PhotoFileId.PHOTOSIZE_SOURCE_THUMBNAIL].size)
+        self.assertEqual(48, _LAYOUTS[4, 'photo', PhotoFileId.PHOTOSIZE_SOURCE_STICKERSET_THUMBNAIL].size)
+    # end def
+
+    def test_round_trip_every_layout(self):
+        for layout, fields in LAYOUTS.items():
+            layout_version, family, photosize_source = layout
+            version, sub_version = max(pair for pair, known in VERSIONS.items() if known == layout_version)
+            values = {}
+            for number, (name, fmt) in enumerate(fields, start=1):
+                values[name] = b'm' if fmt.endswith('s') else -number if fmt.islower() else number
+            # end for
+            common = dict(
+                file_id=None, type_id=FileId.TYPE_PHOTO if family == 'photo' else FileId.TYPE_DOCUMENT,
+                has_reference=True, file_reference=b'\x01\x02\x03', has_web_location=False,
+                dc_id=2, id=values['id'], access_hash=values['access_hash'], version=version, sub_version=sub_version,
+            )
+            if family == 'photo':
+                photosize = PhotoFileId.PHOTOSIZE_SOURCES[photosize_source](**{
+                    name: values[name] for name in photosize_field_names(fields)
+                })
+                original = PhotoFileId(type_detailed='photo', photosize=photosize, **common)
+            else:
+                original = DocumentFileId(type_detailed='document', **common)
+            # end if
+            file_id = original.calculate_file_id()
+            decoded = FileId.from_file_id(file_id)
+            self.assertIs(original.__class__, decoded.__class__, msg=layout)
+            self.assertEqual((version, sub_version, b'\x01\x02\x03'), (decoded.version, decoded.sub_version, decoded.file_reference), msg=layout)
+            for name in ('id', 'access_hash'):
+                self.assertEqual(values[name], getattr(decoded, name), msg=(layout, name))
+            # end for
+            if family == 'photo':
+                self.assertEqual(photosize_source, decoded.photosize.type_id, msg=layout)
+                for name in photosize_field_names(fields):
+                    self.assertEqual(values[name], getattr(decoded.photosize, name), msg=(layout, name))
+                # end for
+            # end if
+            self.assertEqual(file_id, decoded.calculate_file_id(), msg=layout)
+        # end for
+    # end def
+
+    def test_unpack_fields(self):
+        file_id = 'AgADAgADRaoxG64rCUlfm3fj3nihW3PHUQ8ABAEAAwIAA3gAA2uwAQABFgQ'
+        photo = FileId.from_file_id(file_id)
+        data = rle_decode(base64url_decode(file_id))
+        version, sub_version, end = FileId._split_version(data)
+        type_id, has_reference, has_web_location, dc_id, file_reference, layout, values = FileId._unpack_fields(data, version, sub_version, end)
+        self.assertEqual((4, 'photo', PhotoFileId.PHOTOSIZE_SOURCE_THUMBNAIL), layout)
+        fields = dict(zip((name for name, _ in LAYOUTS[layout]), values))
+        self.assertEqual(photo.id, fields['id'])
+        self.assertEqual(photo.photosize.file_type, fields['file_type'])
+        self.assertEqual(b'x\x00\x00\x00', fields['thumbnail_type'])  # still padded
+        self.assertEqual(b'x', photo.photosize.thumbnail_type)
+    # end def
+
+    def test_unknown_photosize_source(self):
+        data = struct.pack('<LLqqqLql', FileId.TYPE_PHOTO, 2, 1, 2, 3, 7, 4, 5) + b'\x16\x04'
+        with self.assertRaises(ValueError):
+            FileId._from_decoded(None, data, 4, 22, len(data) - 2)
+        # end with
+    # end def
+
+    def test_leftover_data_is_logged(self):
+        data = struct.pack('<LLqq', FileId.TYPE_DOCUMENT, 2, 1, 2) + b'\xff\xff' + b'\x16\x04'
+        policy = DecodePolicy()
+        with self.assertLogs('tg_file_id.policy', level='WARNING') as logs:
+            document = FileId._from_decoded(None, data, 4, 22, len(data) - 2, policy)
+        # end with
+        self.assertEqual((1, 2), (document.id, document.access_hash))
+        self.assertIn('Found 2 leftover data.', logs.output[0])
+        self.assertEqual((1, 2), (policy.leftover_count, policy.leftover_bytes))
+    # end def
+
+    def test_str_thumbnail_type(self):
+        photo = FileId.from_file_id('AgADAgADRaoxG64rCUlfm3fj3nihW3PHUQ8ABAEAAwIAA3gAA2uwAQABFgQ')
+        file_id = photo.calculate_file_id()
+        photo.photosize.thumbnail_type = 'x'
+        self.assertEqual(file_id, photo.calculate_file_id())
+    # end def
+
+    def test_no_warning_for_known_versions(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            for version, sub_version in VERSIONS:
+                document = DocumentFileId(
+                    file_id=None, type_id=FileId.TYPE_DOCUMENT, has_reference=False, file_reference=None, has_web_location=False,
+                    type_detailed='document', dc_id=2, id=1, access_hash=2, version=version, sub_version=sub_version,
+                )
+                FileId.from_file_id(document.calculate_file_id())
+            # end for
+        # end with
+    # end def
+# end class TestLayouts
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
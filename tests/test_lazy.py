@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import copy
+import pickle
+import unittest
+
+from tg_file_id.file_id import FileId, DocumentFileId, PhotoFileId, LazyDocumentFileId, LazyPhotoFileId
+from tests._common import FILE_IDS, SAMPLE_FILE_IDS
+
+__author__ = 'luckydonald'
+
+
+class TestLazyFileId(unittest.TestCase):
+    def test_same_as_eager(self):
+        for file_id in FILE_IDS:
+            eager = FileId.from_file_id(file_id)
+            lazy = FileId.from_file_id(file_id, lazy=True)
+            self.assertIsInstance(lazy, LazyPhotoFileId if isinstance(eager, PhotoFileId) else LazyDocumentFileId, msg=file_id)
+            self.assertIsInstance(lazy, type(eager), msg=file_id)
+            for name in ('file_id', 'type_id', 'has_reference', 'has_web_location', 'type_generic', 'type_detailed', 'dc_id'):
+                self.assertEqual(getattr(eager, name), getattr(lazy, name), msg=f'{file_id}, {name}')
+            # end for
+            self.assertTrue(lazy._decode_pending, msg=f'{file_id}: header fields only')
+            for name in ('file_reference', 'id', 'access_hash', 'version', 'sub_version', 'owner_id'):
+                self.assertEqual(getattr(eager, name), getattr(lazy, name), msg=f'{file_id}, {name}')
+            # end for
+            self.assertFalse(lazy._decode_pending, msg=file_id)
+            self.assertEqual(repr(eager), repr(lazy), msg=file_id)
+            if isinstance(eager, PhotoFileId):
+                self.assertEqual(repr(eager.photosize), repr(lazy.photosize), msg=file_id)
+            # end if
+            self.assertEqual(eager.to_file_id(recalculate=True), lazy.to_file_id(recalculate=True), msg=file_id)
+        # end for
+    # end def
+
+    def test_subclass_from_file_id(self):
+        file_id = DocumentFileId.from_file_id(SAMPLE_FILE_IDS[('document', (2, 0))], lazy=True)
+        self.assertIsInstance(file_id, LazyDocumentFileId)
+        file_id = PhotoFileId.from_file_id(SAMPLE_FILE_IDS[('photo', (2, 0))], lazy=True)
+        self.assertIsInstance(file_id, LazyPhotoFileId)
+    # end def
+
+    def test_photosize_first(self):
+        file_id = SAMPLE_FILE_IDS[('photo', (4, 30))]
+        lazy = FileId.from_file_id(file_id, lazy=True)
+        self.assertEqual(PhotoFileId.PHOTOSIZE_SOURCE_THUMBNAIL, lazy.photosize.type_id)
+        self.assertEqual(b'x', lazy.photosize.thumbnail_type)
+        self.assertEqual(6602691427396197215, lazy.access_hash)
+    # end def
+
+    def test_set_before_decode(self):
+        lazy = FileId.from_file_id(SAMPLE_FILE_IDS[('document', (4, 22))], lazy=True)
+        lazy.access_hash = 1
+        self.assertEqual(1, lazy.access_hash, 'the set value is not overwritten by the decoding')
+        self.assertEqual(984697977903775939, lazy.id)
+        self.assertEqual(22, lazy.sub_version)
+    # end def
+
+    def test_change_type(self):
+        lazy = FileId.from_file_id(SAMPLE_FILE_IDS[('document', (2, 0))], lazy=True)
+        eager = FileId.from_file_id(SAMPLE_FILE_IDS[('document', (2, 0))])
+        self.assertEqual(eager.change_type(DocumentFileId.TYPE_DOCUMENT), lazy.change_type(DocumentFileId.TYPE_DOCUMENT))
+        self.assertEqual(DocumentFileId.TYPE_DOCUMENT, lazy.type_id)
+    # end def
+
+    def test_unknown_attribute(self):
+        lazy = FileId.from_file_id(SAMPLE_FILE_IDS[('document', (2, 0))], lazy=True)
+        with self.assertRaises(AttributeError):
+            lazy.photosize  # a document has none
+        # end with
+        with self.assertRaises(AttributeError):
+            lazy.foobar
+        # end with
+    # end def
+
+    def test_pickle_and_copy(self):
+        for file_id in FILE_IDS:
+            lazy = FileId.from_file_id(file_id, lazy=True)
+            for clone in (pickle.loads(pickle.dumps(lazy)), copy.deepcopy(FileId.from_file_id(file_id, lazy=True))):
+                self.assertIs(type(lazy), type(clone), msg=file_id)
+                self.assertEqual(repr(lazy), repr(clone), msg=file_id)
+            # end for
+        # end for
+    # end def
+
+    def test_web_location_is_eager(self):
+        # web locations are always decoded completely
+        from tg_file_id.file_id import WebLocationFileId
+        from tg_file_id.utils import base64url_encode, rle_encode, pack_tl_string
+        import struct
+        data = struct.pack('<LL', FileId.TYPE_PHOTO | FileId.TYPE_ID_WEB_LOCATION_FLAG, 1) + pack_tl_string(b'https://example.com/') + struct.pack('<q', 42) + b'\x16\x04'
+        lazy = FileId.from_file_id(base64url_encode(rle_encode(data)), lazy=True)
+        self.assertIsInstance(lazy, WebLocationFileId)
+        self.assertEqual(42, lazy.access_hash)
+    # end def
+# end class
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
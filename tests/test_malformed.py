@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import io
+import os
+import random
+import struct
+import tempfile
+import unittest
+import warnings
+
+from tg_file_id.batch import FileIdBatch
+from tg_file_id.file_id import FileId
+from tg_file_id.file_unique_id import FileUniqueId, file_id_to_unique_id, unique_id_to_int
+from tg_file_id.generate import FileIdGenerator
+from tg_file_id.migrate import migrate
+from tg_file_id.policy import DecodePolicy
+from tg_file_id.records import iter_records, write_records
+from tg_file_id.store import FileIdStore
+from tg_file_id.utils import (
+    base64url_decode, base64url_encode, rle_encode, rle_decode, pack_tl_string,
+    unpack_tl_string, unpack_tl_string_from, skip_tl_string_from, unpack_null_terminated_string,
+)
+
+__author__ = 'luckydonald'
+
+
+WEB_LOCATION = base64url_encode(rle_encode(
+    struct.pack('<LL', FileId.TYPE_PHOTO | FileId.TYPE_ID_WEB_LOCATION_FLAG, 4)
+    + pack_tl_string(b'https://example.com/image.png') + struct.pack('<q', 1234567890123) + b'\x1e\x04'
+))
+
+
+def mutations(file_id: str, rng: random.Random):
+    """ Truncations of the decoded data at every length, random byte flips, and random garbage around the size of it """
+    data = bytes(rle_decode(base64url_decode(file_id)))
+    for length in range(len(data)):
+        yield base64url_encode(rle_encode(data[:length]))
+        yield base64url_encode(data[:length])  # without RLE, zeros are then run lengths
+    # end for
+    for _ in range(10):
+        flipped = bytearray(data)
+        flipped[rng.randrange(len(flipped))] = rng.randrange(256)
+        yield base64url_encode(rle_encode(bytes(flipped)))
+    # end for
+    yield base64url_encode(bytes(rng.randrange(256) for _ in range(rng.randrange(len(data) + 8))))
+    yield file_id[:rng.randrange(len(file_id))]  # cut within the base64
+# end def
+
+
+def decode_batch(file_ids: list, policy: DecodePolicy) -> FileIdBatch:
+    """ `FileIdBatch.from_file_ids`, using the columns, so invalid rows in there fail as well """
+    batch = FileIdBatch.from_file_ids(file_ids, policy=policy)
+    batch.type_detailed, batch.type_generic
+    for index in range(len(batch)):
+        batch[index]
+    # end for
+    return batch
+# end def
+
+
+def record_round_trip(file_ids: list, policy: DecodePolicy) -> list:
+    """ `write_records` of the decoded file_ids, read back with `iter_records` """
+    file = io.BytesIO()
+    write_records(file, FileId.decode_many(file_ids, policy=policy))
+    return [file_id.to_file_id() for file_id in iter_records(file.getvalue())]
+# end def
+
+
+class TestMalformed(unittest.TestCase):
+    """ Malformed input either decodes, or raises a `ValueError`, never anything else. """
+    DECODERS = {
+        'from_file_id': lambda file_id, policy: FileId.from_file_id(file_id, policy=policy),
+        'lazy': lambda file_id, policy: repr(FileId.from_file_id(file_id, lazy=True, policy=policy)),
+        'decode_many': lambda file_id, policy: FileId.decode_many([file_id], policy=policy),
+        'peek': lambda file_id, policy: FileId.peek(file_id),
+        'file_id_to_unique_id': lambda file_id, policy: file_id_to_unique_id(file_id),
+        'FileUniqueId.from_file_id': lambda file_id, policy: FileUniqueId.from_file_id(file_id),
+        'FileIdBatch.from_file_ids': lambda file_id, policy: decode_batch([file_id], policy),
+        'FileIdBatch.to_unique_ids': lambda file_id, policy: FileIdBatch.from_file_ids([file_id], policy=policy).to_unique_ids(),
+        'migrate': lambda file_id, policy: list(migrate([file_id], on_error='raise', policy=policy)),
+        'records': lambda file_id, policy: record_round_trip([file_id], policy),
+    }
+    UNIQUE_DECODERS = {
+        'from_unique_id': lambda unique_id, policy: FileUniqueId.from_unique_id(unique_id, policy=policy),
+        'decode_many': lambda unique_id, policy: FileUniqueId.decode_many([unique_id], policy=policy),
+        'unique_id_to_int': lambda unique_id, policy: unique_id_to_int(unique_id),
+    }
+    def assert_only_value_errors(self, decoders: dict, inputs: list):
+        policy = DecodePolicy(DecodePolicy.SILENT)
+        for name, decode in decoders.items():
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')  # the ones using the default policy warn about the random versions.
+                for value in inputs:
+                    try:
+                        decode(value, policy)
+                    except ValueError:
+                        pass
+                    except Exception as e:
+                        self.fail(f'{name}({value!r}) raised {e!r}, not a ValueError')
+                    # end try
+                # end for
+            # end with
+        # end for
+    # end def
+
+    def test_file_ids(self):
+        rng = random.Random(2501)
+        file_ids = list(FileIdGenerator(2501).strings(150)) + [WEB_LOCATION]
+        self.assertEqual('https://example.com/image.png', FileId.from_file_id(WEB_LOCATION).url.decode())
+        with tempfile.TemporaryDirectory() as directory, FileIdStore(os.path.join(directory, 'store')) as store:
+            decoders = dict(self.DECODERS, **{'FileIdStore.put': lambda file_id, policy: store.put(file_id)})
+            self.assert_only_value_errors(decoders, [mutated for file_id in file_ids for mutated in mutations(file_id, rng)])
+        # end with
+    # end def
+
+    def test_unique_ids(self):
+        rng = random.Random(2502)
+        unique_ids = list(FileIdGenerator(2502).strings(150, unique=True)) + [file_id_to_unique_id(WEB_LOCATION)]
+        self.assert_only_value_errors(self.UNIQUE_DECODERS, [mutated for unique_id in unique_ids for mutated in mutations(unique_id, rng)])
+    # end def
+
+    def test_truncated_message(self):
+        file_id = 'CAACAgQAAxkBAAIC4l9CWDGzVUcDejU0TETLWbOdfsCoAALDAAOYWaoN_rEGs9NF6ocbBA'
+        data = bytes(rle_decode(base64url_decode(file_id)))
+        truncated = base64url_encode(rle_encode(data[:20] + data[-2:]))  # cut in the file_reference
+        for decode in (FileId.from_file_id, file_id_to_unique_id):
+            with self.assertRaisesRegex(ValueError, 'Truncated'):
+                decode(truncated)
+            # end with
+        # end for
+        truncated = base64url_encode(rle_encode(data[:-10] + data[-2:]))  # cut in the access_hash
+        for decode in (FileId.from_file_id, file_id_to_unique_id):
+            with self.assertRaisesRegex(ValueError, 'Truncated file_id: 8 bytes missing'):
+                decode(truncated)
+            # end with
+        # end for
+        # the file_reference only fits when counting the version suffix as part of it.
+        truncated = base64url_encode(rle_encode(data[:8] + b'\x0b' + bytes(9) + data[-2:]))
+        for decode in (FileId.from_file_id, file_id_to_unique_id, lambda file_id: decode_batch([file_id], DecodePolicy())):
+            with self.assertRaisesRegex(ValueError, 'Truncated tl_string: 11 bytes long, but only 9 left'):
+                decode(truncated)
+            # end with
+        # end for
+        with self.assertRaisesRegex(ValueError, 'Empty'):
+            FileId.from_file_id('')
+        # end with
+        with self.assertRaisesRegex(ValueError, 'Truncated file_unique_id'):
+            FileUniqueId.from_unique_id(base64url_encode(b'\x02\x00'))
+        # end with
+    # end def
+
+    def test_huge_file_reference(self):
+        # 16 MiB announced, 20 bytes there: fails right away, without reading or allocating that much.
+        file_id = base64url_encode(rle_encode(
+            struct.pack('<LL', FileId.TYPE_DOCUMENT | FileId.TYPE_ID_FILE_REFERENCE_FLAG, 2) + b'\xfe\xff\xff\xff' + b'abcd' * 5 + b'\x1e\x04'
+        ))
+        policy = DecodePolicy(DecodePolicy.SILENT)
+        for name, decode in self.DECODERS.items():
+            if name == 'peek':  # doesn't read the file_reference at all
+                continue
+            # end if
+            with self.subTest(name=name), self.assertRaisesRegex(ValueError, '16777215 bytes long, but only 20 left'):
+                decode(file_id, policy)
+            # end with
+        # end for
+    # end def
+
+    def test_unknown_type(self):
+        data = struct.pack('<LL', 99, 2) + bytes(range(1, 17)) + b'\x02'
+        for decode in (FileId.from_file_id, lambda file_id: FileId.from_file_id(file_id, lazy=True), file_id_to_unique_id):
+            with self.assertRaisesRegex(ValueError, 'Type is invalid: 99'):
+                decode(base64url_encode(rle_encode(data)))
+            # end with
+        # end for
+    # end def
+# end class
+
+
+class TestTlString(unittest.TestCase):
+    def test_round_trip(self):
+        for length in (0, 1, 3, 4, 253, 254, 255, 1000):
+            string = bytes(range(256)) * 4
+            string = string[:length]
+            packed = pack_tl_string(string)
+            self.assertEqual((string, len(packed)), unpack_tl_string_from(packed, 0))
+            self.assertEqual(len(packed), skip_tl_string_from(packed, 0))
+            buffer = io.BytesIO(packed + b'after')
+            self.assertEqual(string, unpack_tl_string(buffer))
+            self.assertEqual(b'after', buffer.read())
+        # end for
+    # end def
+
+    def test_truncated(self):
+        for length in (0, 5, 300):
+            packed = pack_tl_string(bytes(length))
+            string_end = len(packed) - (-length - 1) % 4 if length <= 253 else 4 + length
+            for cut in range(string_end):
+                for unpack in (unpack_tl_string_from, skip_tl_string_from, lambda data, offset: unpack_tl_string(io.BytesIO(data))):
+                    with self.assertRaisesRegex(ValueError, 'Truncated tl_string', msg=f'length={length}, cut={cut}'):
+                        unpack(packed[:cut], 0)
+                    # end with
+                # end for
+            # end for
+            # only the padding missing is fine.
+            self.assertEqual(bytes(length), unpack_tl_string_from(packed[:string_end], 0)[0])
+            for unpack in (unpack_tl_string_from, skip_tl_string_from):
+                with self.assertRaisesRegex(ValueError, 'Truncated tl_string'):
+                    unpack(packed + b'after', 0, end=string_end - 1)
+                # end with
+            # end for
+            self.assertEqual(len(packed), skip_tl_string_from(packed + b'after', 0, end=string_end))
+        # end for
+    # end def
+
+    def test_huge_length(self):
+        # 16 MiB announced, 4 bytes there: fails right away, without reading or allocating that much.
+        data = b'\xfe\xff\xff\xff' + b'abcd'
+        for unpack in (unpack_tl_string_from, skip_tl_string_from, lambda data, offset: unpack_tl_string(io.BytesIO(data))):
+            with self.assertRaisesRegex(ValueError, '16777215 bytes long, but only 4 left'):
+                unpack(data, 0)
+            # end with
+        # end for
+    # end def
+# end class
+
+
+class CountingBytesIO(io.BytesIO):
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.reads = 0
+    # end def
+
+    def read(self, size: int = -1) -> bytes:
+        self.reads += 1
+        return super().read(size)
+    # end def
+# end class
+
+
+class CountingReader(io.BufferedReader):
+    def __init__(self, raw):
+        super().__init__(raw)
+        self.reads = 0
+        self.bytes_read = 0
+    # end def
+
+    def read(self, size: int = -1) -> bytes:
+        self.reads += 1
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+    # end def
+# end class
+
+
+class TestNullTerminatedString(unittest.TestCase):
+    def test_unpack(self):
+        self.assertEqual(b'abc', unpack_null_terminated_string(b'abc\0def'))
+        self.assertEqual('äbc', unpack_null_terminated_string('äbc\0'.encode('utf-8'), as_string=True))
+        for make_file in (io.BytesIO, lambda data: io.BufferedReader(io.BytesIO(data))):
+            file = make_file(b'xyabc\0def')
+            file.read(2)
+            self.assertEqual(b'abc', unpack_null_terminated_string(file))
+            self.assertEqual(b'def', file.read())
+        # end for
+    # end def
+
+    def test_unterminated(self):
+        # this used to loop forever, reading b'' at the end.
+        for buffer in (b'abc', bytearray(b''), io.BytesIO(b'abc'), io.BufferedReader(io.BytesIO(b'abc'))):
+            with self.assertRaisesRegex(ValueError, 'Truncated null terminated string'):
+                unpack_null_terminated_string(buffer)
+            # end with
+        # end for
+    # end def
+
+    def test_reads_once(self):
+        # the string used to be built with `bytes +=` and read again, now every byte is read exactly once.
+        data = b'x' * 320000 + b'\0after'
+        self.assertEqual(320000, len(unpack_null_terminated_string(data)))
+        file = CountingBytesIO(data)
+        self.assertEqual(320000, len(unpack_null_terminated_string(file)))
+        self.assertEqual((1, b'after'), (file.reads, file.read()))  # all at once, as it is in memory already
+        file = CountingReader(io.BytesIO(data))
+        self.assertEqual(320000, len(unpack_null_terminated_string(file)))
+        self.assertEqual((320001, 320001, b'after'), (file.reads, file.bytes_read, file.read()))
+    # end def
+# end class
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import itertools
+import struct
+import unittest
+import warnings
+
+from tg_file_id.file_id import FileId
+from tg_file_id.migrate import migrate, MigrationStats
+from tg_file_id.policy import DecodePolicy
+from tg_file_id.utils import base64url_encode, pack_tl_string, rle_encode
+from tests._common import FILE_IDS, SAMPLE_FILE_IDS
+
+__author__ = 'luckydonald'
+
+
+class TestMigrate(unittest.TestCase):
+    def test_to_max_version(self):
+        stats = MigrationStats()
+        results = list(migrate(FILE_IDS, stats=stats))
+        self.assertEqual(len(FILE_IDS), len(results))
+        for old, new in zip(FILE_IDS, results):
+            old, new = FileId.from_file_id(old), FileId.from_file_id(new)
+            self.assertEqual(FileId.MAX_VERSION, (new.version, new.sub_version), msg=old.file_id)
+            for name in ('type_id', 'dc_id', 'id', 'access_hash', 'file_reference'):
+                self.assertEqual(getattr(old, name), getattr(new, name), msg=f'{old.file_id}, {name}')
+            # end for
+        # end for
+        self.assertEqual(FILE_IDS[3], results[3], 'already 4.30')
+        self.assertEqual(FILE_IDS[7], results[7], 'already 4.30')
+        self.assertEqual({(2, 0): 2, (4, 22): 2, (4, 27): 2, (4, 30): 2}, dict(stats.sources))
+        self.assertEqual((6, 2, 0, 8), (stats.migrated, stats.unchanged, stats.failed, stats.total))
+    # end def
+
+    def test_to_version_2(self):
+        # the photos with a non legacy photosize can't be version 2.
+        stats = MigrationStats()
+        results = list(migrate(FILE_IDS, version=2, on_error='none', stats=stats))
+        self.assertEqual(FILE_IDS[0], results[0])
+        self.assertEqual(FILE_IDS[4], results[4])
+        self.assertEqual([None, None, None], results[5:])
+        self.assertEqual((3, 2, 3), (stats.migrated, stats.unchanged, stats.failed))
+        with self.assertRaises(ValueError):
+            list(migrate(FILE_IDS, version=2))
+        # end with
+        self.assertEqual(FILE_IDS[5:], list(migrate(FILE_IDS[5:], version=2, on_error='keep')))
+    # end def
+
+    def test_streaming(self):
+        # only pulls as many file_ids as results are consumed.
+        results = migrate(itertools.cycle(FILE_IDS))
+        self.assertEqual(20, len(list(itertools.islice(results, 20))))
+    # end def
+
+    def test_invalid(self):
+        # a valid suffix of the target version doesn't make the rest of it valid.
+        target = b'\x1e\x04'  # 4.30
+        invalid = [
+            base64url_encode(rle_encode(struct.pack('<LL', 99, 2) + b'abcd' + target)),  # unknown type, truncated
+            base64url_encode(rle_encode(struct.pack('<LLqq', 99, 2, 1, 2) + target)),  # unknown type
+            base64url_encode(rle_encode(struct.pack('<LLq', FileId.TYPE_DOCUMENT, 2, 1) + target)),  # truncated
+            base64url_encode(b'\x07'),  # too short for anything
+        ]
+        for file_id in invalid:
+            with self.assertRaises(ValueError, msg=file_id):
+                list(migrate([file_id], version=4, sub_version=30, policy=DecodePolicy(DecodePolicy.SILENT)))
+            # end with
+        # end for
+        stats = MigrationStats()
+        self.assertEqual(invalid, list(migrate(invalid, version=4, sub_version=30, on_error='keep', stats=stats, policy=DecodePolicy(DecodePolicy.SILENT))))
+        self.assertEqual((0, 0, len(invalid)), (stats.migrated, stats.unchanged, stats.failed))
+        self.assertEqual({}, dict(stats.sources))
+    # end def
+
+    def test_web_location(self):
+        web_location = base64url_encode(rle_encode(
+            struct.pack('<LL', FileId.TYPE_PHOTO | FileId.TYPE_ID_WEB_LOCATION_FLAG, 4)
+            + pack_tl_string(b'https://example.com/image.png') + struct.pack('<q', 1234567890123) + b'\x1e\x04'
+        ))
+        stats = MigrationStats()
+        self.assertEqual([web_location], list(migrate([web_location], version=4, sub_version=30, stats=stats)))  # already there
+        self.assertEqual(1, stats.unchanged)
+        with self.assertRaisesRegex(ValueError, 'Web location file_ids can not be re-encoded'):
+            list(migrate([web_location], version=4, sub_version=27))
+        # end with
+    # end def
+
+    def test_target(self):
+        document = SAMPLE_FILE_IDS[('document', (2, 0))]
+        for version, expected in ((4, (4, 30)), (2, (2, 0)), (None, FileId.MAX_VERSION)):
+            new = FileId.from_file_id(next(migrate([document], version=version)))
+            self.assertEqual(expected, (new.version, new.sub_version), msg=version)
+        # end for
+        for version, sub_version in ((4, 99), (3, None), (2, 30)):
+            with self.assertRaisesRegex(ValueError, 'Unsupported target', msg=(version, sub_version)):
+                migrate(FILE_IDS, version=version, sub_version=sub_version)  # right away, not only once consumed
+            # end with
+        # end for
+    # end def
+
+    def test_warns_once(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            unsupported = FileId.from_file_id(SAMPLE_FILE_IDS[('document', (4, 30))]).to_file_id(version=4, sub_version=99)
+        # end with
+        policy = DecodePolicy()
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            list(migrate([unsupported] * 10, policy=policy))
+        # end with
+        self.assertEqual(1, len(caught))
+        self.assertEqual({(4, 99): 10}, dict(policy.unsupported_versions))
+    # end def
+
+    def test_pairs(self):
+        results = list(migrate(FILE_IDS + ['broken'], version=2, on_error='pair', policy=DecodePolicy(DecodePolicy.SILENT)))
+        self.assertEqual((FILE_IDS[0], None), results[0])
+        self.assertEqual([None] * 4, [new for new, error in results[5:]])  # the 3 photos, and the broken one
+        self.assertEqual([True] * 4, [isinstance(error, ValueError) for new, error in results[5:]])
+    # end def
+# end class
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import struct
+import unittest
+import warnings
+
+from tg_file_id.file_id import FileId
+from tg_file_id.generate import FileIdGenerator
+from tg_file_id.parallel import parallel_decode
+from tg_file_id.policy import DecodePolicy
+from tg_file_id.records import iter_records
+from tg_file_id.utils import base64url_encode, pack_tl_string, rle_encode
+
+__author__ = 'luckydonald'
+
+
+class TestParallelDecode(unittest.TestCase):
+    FILE_IDS = list(FileIdGenerator(21).strings(2000))
+
+    def test_records_in_order(self):
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                chunks = list(parallel_decode(self.FILE_IDS, workers=workers, chunksize=150))
+                self.assertEqual(14, len(chunks))
+                self.assertEqual(self.FILE_IDS, [record.to_file_id() for chunk in chunks for record in iter_records(chunk)])
+            # end with
+        # end for
+    # end def
+
+    def test_batch(self):
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            self.skipTest('numpy not installed')
+        # end try
+        batches = list(parallel_decode(iter(self.FILE_IDS), workers=2, chunksize=333, output='batch'))
+        self.assertEqual([333] * 6 + [2], [len(batch) for batch in batches])
+        self.assertEqual(self.FILE_IDS, [file_id for batch in batches for file_id in batch.to_file_ids()])
+    # end def
+
+    def test_policy(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')  # encoding to it warns
+            unsupported = FileId.from_file_id(self.FILE_IDS[0]).to_file_id(version=4, sub_version=99)
+        # end with
+        leftover = base64url_encode(rle_encode(struct.pack('<LLqq', FileId.TYPE_DOCUMENT, 2, 1, 2) + b'\xff\xff\x16\x04'))
+        file_ids = self.FILE_IDS[:100] + [unsupported] * 3 + [leftover] * 2
+        policy = DecodePolicy(DecodePolicy.SILENT)
+        self.assertEqual(105, sum(1 for chunk in parallel_decode(file_ids, workers=2, chunksize=10, policy=policy) for _ in iter_records(chunk)))
+        self.assertEqual({(4, 99): 3}, dict(policy.unsupported_versions))
+        self.assertEqual((2, 4), (policy.leftover_count, policy.leftover_bytes))
+
+        with self.assertRaises(ValueError):
+            list(parallel_decode(file_ids, workers=2, chunksize=10, policy=DecodePolicy(DecodePolicy.STRICT)))
+        # end with
+    # end def
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            list(parallel_decode(self.FILE_IDS, output='objects'))
+        # end with
+        with self.assertRaises(ValueError):
+            list(parallel_decode(self.FILE_IDS, chunksize=0))
+        # end with
+        self.assertEqual([], list(parallel_decode([], workers=2)))
+    # end def
+
+    def test_web_location(self):
+        web_location = base64url_encode(rle_encode(
+            struct.pack('<LL', FileId.TYPE_PHOTO | FileId.TYPE_ID_WEB_LOCATION_FLAG, 4)
+            + pack_tl_string(b'https://example.com/image.png') + struct.pack('<q', 1234567890123) + b'\x1e\x04'
+        ))
+        for workers in (1, 2):
+            with self.subTest(workers=workers), self.assertRaisesRegex(ValueError, 'Web location file_ids can not be stored as record'):
+                list(parallel_decode(self.FILE_IDS[:10] + [web_location], workers=workers, chunksize=4))
+            # end with
+        # end for
+    # end def
+# end class TestParallelDecode
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
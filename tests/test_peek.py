@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import random
+import struct
+import unittest
+
+from tg_file_id.file_id import FileId
+from tg_file_id.utils import base64url_encode, rle_encode
+from tests._common import FILE_IDS
+
+__author__ = 'luckydonald'
+
+
+class TestPeek(unittest.TestCase):
+    def test_same_as_from_file_id(self):
+        for file_id in FILE_IDS:
+            decoded = FileId.from_file_id(file_id)
+            self.assertEqual(
+                (decoded.type_id, decoded.has_reference, decoded.has_web_location, decoded.dc_id, decoded.version, decoded.sub_version),
+                FileId.peek(file_id),
+                msg=file_id,
+            )
+        # end for
+    # end def
+
+    def test_zero_runs(self):
+        # headers and version suffixes with zero runs reaching into, or out of them, compared to a complete decode.
+        rng = random.Random(4458)
+        for _ in range(5000):
+            type_id = rng.choice([0, 2, 5, 8, 18, 256, 1 << 23]) | rng.choice([0, FileId.TYPE_ID_FILE_REFERENCE_FLAG, FileId.TYPE_ID_WEB_LOCATION_FLAG])
+            dc_id = rng.choice([0, 1, 2, 4, 5, 256, 1 << 24])
+            middle = bytes(rng.choice([0, 0, 0, rng.randrange(256)]) for _ in range(rng.randrange(0, 40)))
+            suffix = rng.choice([b'\x02', b'\x16\x04', b'\x1e\x04', b'\x00\x04', b'\x00', b'\x01\x00\x02'])
+            data = struct.pack('<LL', type_id, dc_id) + middle + suffix
+            file_id = base64url_encode(rle_encode(data))
+            version = data[-1]
+            sub_version = data[-2] if version == 4 else 0
+            expected = FileId._normalize_type_id(type_id) + (dc_id, version, sub_version)
+            self.assertEqual(expected, FileId.peek(file_id), msg=f'data = {data!r}')
+        # end for
+    # end def
+# end class
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import logging
+import struct
+import unittest
+import warnings
+
+from tg_file_id.batch import FileIdBatch
+from tg_file_id.file_id import FileId, DocumentFileId
+from tg_file_id.file_unique_id import FileUniqueId
+from tg_file_id.migrate import migrate
+from tg_file_id.policy import DecodePolicy, get_default_policy, set_default_policy
+from tg_file_id.utils import base64url_encode, rle_encode
+
+__author__ = 'luckydonald'
+
+
+class TestDecodePolicy(unittest.TestCase):
+    FILE_ID = 'CAACAgQAAxkBAAIE4V-nVmlwWzNxKeRGZYjG0m7UWm0IAALDAAOYWaoN_rEGs9NF6oceBA'
+
+    def setUp(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')  # encoding to it warns
+            self.unsupported = DocumentFileId.from_file_id(self.FILE_ID).to_file_id(version=4, sub_version=99)
+        # end with
+        self.leftover = base64url_encode(rle_encode(struct.pack('<LLqq', FileId.TYPE_DOCUMENT, 2, 1, 2) + b'\xff\xff\x16\x04'))
+    # end def
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            DecodePolicy('loud')
+        # end with
+    # end def
+
+    def test_warn_once(self):
+        policy = DecodePolicy()
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            for _ in range(10):
+                FileId.from_file_id(self.unsupported, policy=policy)
+                FileId.from_file_id(self.FILE_ID, policy=policy)
+            # end for
+        # end with
+        self.assertEqual(1, len(caught))
+        self.assertEqual({(4, 99): 10}, dict(policy.unsupported_versions))
+
+        with self.assertLogs('tg_file_id.policy', level='WARNING') as logs:
+            for _ in range(3):
+                FileId.from_file_id(self.leftover, policy=policy)
+            # end for
+        # end with
+        self.assertEqual(1, len(logs.output))
+        self.assertEqual((3, 6), (policy.leftover_count, policy.leftover_bytes))
+
+        policy.reset()
+        self.assertEqual((0, 0, {}), (policy.leftover_count, policy.leftover_bytes, dict(policy.unsupported_versions)))
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            FileId.from_file_id(self.unsupported, policy=policy)
+        # end with
+        self.assertEqual(1, len(caught))
+    # end def
+
+    def test_silent(self):
+        policy = DecodePolicy('silent')
+        with warnings.catch_warnings(record=True) as caught, self.assertNoLogs('tg_file_id', level='DEBUG'):
+            warnings.simplefilter('always')
+            results = FileId.decode_many([self.unsupported, self.leftover] * 5, policy=policy)
+        # end with
+        self.assertEqual([], caught)
+        self.assertEqual(10, len(results))
+        self.assertEqual({(4, 99): 5}, dict(policy.unsupported_versions))
+        self.assertEqual(5, policy.leftover_count)
+    # end def
+
+    def test_strict(self):
+        policy = DecodePolicy('strict')
+        with self.assertRaises(ValueError):
+            FileId.from_file_id(self.unsupported, policy=policy)
+        # end with
+        with self.assertRaises(ValueError):
+            FileId.from_file_id(self.leftover, policy=policy)
+        # end with
+        document = FileId.from_file_id(self.FILE_ID, policy=policy)
+        self.assertEqual((4, 30), (document.version, document.sub_version))
+        results = FileId.decode_many([self.FILE_ID, self.unsupported, self.leftover], on_error='none', policy=policy)
+        self.assertIsNotNone(results[0])
+        self.assertEqual([None, None], results[1:])
+        self.assertEqual({(4, 99): 2}, dict(policy.unsupported_versions))
+    # end def
+
+    def test_lazy_keeps_the_policy(self):
+        policy = DecodePolicy('strict')
+        lazy = FileId.from_file_id(self.leftover, lazy=True, policy=policy)
+        self.assertEqual(2, lazy.dc_id)
+        with self.assertRaises(ValueError):
+            lazy.id
+        # end with
+    # end def
+
+    def test_unique_id(self):
+        policy = DecodePolicy('strict')
+        unique_id = base64url_encode(rle_encode(struct.pack('<iq', FileUniqueId.TYPE_DOCUMENT, 1234) + b'\x01'))
+        with self.assertRaises(ValueError):
+            FileUniqueId.from_unique_id(unique_id, policy=policy)
+        # end with
+        self.assertEqual(1234, FileUniqueId.from_unique_id(unique_id, policy=DecodePolicy('silent')).id)
+    # end def
+
+    def test_batch_and_migrate(self):
+        policy = DecodePolicy('silent')
+        batch = FileIdBatch.from_file_ids([self.unsupported, self.leftover, self.FILE_ID], policy=policy)
+        self.assertEqual(3, len(batch))
+        self.assertEqual(({(4, 99): 1}, 1), (dict(policy.unsupported_versions), policy.leftover_count))
+
+        policy = DecodePolicy('strict')
+        results = list(migrate([self.unsupported, self.FILE_ID], version=4, sub_version=22, on_error='none', policy=policy))
+        self.assertIsNone(results[0])
+        self.assertIsNotNone(results[1])
+    # end def
+
+    def test_default_policy(self):
+        policy = DecodePolicy('strict')
+        previous = set_default_policy(policy)
+        try:
+            self.assertIs(policy, get_default_policy())
+            with self.assertRaises(ValueError):
+                FileId.from_file_id(self.unsupported)
+            # end with
+            self.assertEqual({(4, 99): 1}, dict(policy.unsupported_versions))
+            set_default_policy('silent')
+            FileId.from_file_id(self.unsupported)
+            self.assertEqual('silent', get_default_policy().mode)
+        finally:
+            set_default_policy(previous)
+        # end try
+        self.assertIs(previous, get_default_policy())
+        with self.assertRaises(TypeError):
+            set_default_policy(None)
+        # end with
+    # end def
+
+    def test_debug_message_is_lazy(self):
+        logger = logging.getLogger('tg_file_id.file_unique_id')
+        with self.assertLogs(logger, level='DEBUG') as logs:
+            FileUniqueId.from_unique_id('AgADBAsAAgKLowAB')
+        # end with
+        self.assertIn("parsing unique_id 'AgADBAsAAgKLowAB'", logs.output[0])
+    # end def
+# end class TestDecodePolicy
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
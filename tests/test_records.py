@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import io
+import struct
+import unittest
+
+from tg_file_id.file_id import FileId, DocumentFileId, PhotoFileId
+from tg_file_id.file_unique_id import FileUniqueId
+from tg_file_id.generate import FileIdGenerator
+from tg_file_id.records import MAGIC, decode_record_from, iter_records, read_records, write_records
+from tg_file_id.utils import base64url_encode, pack_tl_string, rle_encode
+from tests._common import FILE_IDS, SAMPLE_FILE_IDS
+
+__author__ = 'luckydonald'
+
+
+class TestRecords(unittest.TestCase):
+    def test_file_id_round_trip(self):
+        file_ids = FILE_IDS + list(FileIdGenerator(18).strings(500))
+        for file_id in file_ids:
+            original = FileId.from_file_id(file_id)
+            decoded = FileId.from_record(original.to_record())
+            self.assertIsNone(decoded.file_id)
+            self.assertIs(type(original), type(decoded))
+            self.assertEqual(
+                (original.type_id, original.has_reference, original.file_reference, original.dc_id, original.id, original.access_hash, original.version, original.sub_version),
+                (decoded.type_id, decoded.has_reference, decoded.file_reference, decoded.dc_id, decoded.id, decoded.access_hash, decoded.version, decoded.sub_version),
+            )
+            if isinstance(original, PhotoFileId):
+                self.assertEqual(repr(original.photosize), repr(decoded.photosize))
+            # end if
+            self.assertEqual(file_id, decoded.to_file_id())
+        # end for
+    # end def
+
+    def test_layout(self):
+        document = DocumentFileId.from_file_id(SAMPLE_FILE_IDS[('document', (4, 30))])
+        record = document.to_record()
+        self.assertEqual((FileId.RECORD_FORMAT, 4, 30, 0xFF), tuple(record[:4]))
+        self.assertEqual(14 + 16 + len(document.file_reference), len(record))
+        self.assertTrue(record.endswith(document.file_reference))
+
+        photo = PhotoFileId.from_file_id(SAMPLE_FILE_IDS[('photo', (2, 0))])
+        self.assertEqual((FileId.RECORD_FORMAT, 2, 0, PhotoFileId.PHOTOSIZE_SOURCE_LEGACY), tuple(photo.to_record()[:4]))
+    # end def
+
+    def test_lazy(self):
+        lazy = FileId.from_file_id(SAMPLE_FILE_IDS[('photo', (4, 30))], lazy=True)
+        self.assertEqual(FileId.from_file_id(SAMPLE_FILE_IDS[('photo', (4, 30))]).to_record(), lazy.to_record())
+    # end def
+
+    def test_unique_id_round_trip(self):
+        unique_ids = [FileUniqueId.from_file_id(file_id).to_unique_id() for file_id in FILE_IDS]
+        unique_ids += list(FileIdGenerator(18).strings(200, unique=True))
+        for unique_id in unique_ids:
+            original = FileUniqueId.from_unique_id(unique_id)
+            decoded = FileUniqueId.from_record(original.to_record())
+            self.assertIsNone(decoded.unique_id)
+            self.assertEqual((original.type_id, original.id, original.volume_id, original.local_id), (decoded.type_id, decoded.id, decoded.volume_id, decoded.local_id))
+            self.assertEqual(unique_id, decoded.to_unique_id())
+        # end for
+        web = FileUniqueId(type_id=FileUniqueId.TYPE_WEB, url='https://example.com/image.png')
+        self.assertEqual(b'https://example.com/image.png', FileUniqueId.from_record(web.to_record()).url)
+        self.assertEqual(10, len(FileUniqueId.from_file_id(SAMPLE_FILE_IDS[('document', (2, 0))]).to_record()))
+        self.assertEqual(14, len(FileUniqueId.from_file_id(SAMPLE_FILE_IDS[('photo', (2, 0))]).to_record()))
+    # end def
+
+    def test_invalid(self):
+        record = FileId.from_file_id(SAMPLE_FILE_IDS[('document', (4, 30))]).to_record()
+        unique_record = FileUniqueId.from_file_id(SAMPLE_FILE_IDS[('document', (4, 30))]).to_record()
+        for data in (record[:-1], record[:20], record[:3], record + b'\0', b'\x09' + record[1:], record[:3] + b'\x09' + record[4:]):
+            with self.subTest(data=data), self.assertRaises(ValueError):
+                FileId.from_record(data)
+            # end with
+        # end for
+        for data in (unique_record[:-1], unique_record + b'\0', record, unique_record[:1] + b'\x09' + unique_record[2:]):
+            with self.subTest(data=data), self.assertRaises(ValueError):
+                FileUniqueId.from_record(data)
+            # end with
+        # end for
+        with self.assertRaises(ValueError):
+            decode_record_from(b'\x09' + record[1:])
+        # end with
+        photo_record = FileId.from_file_id(SAMPLE_FILE_IDS[('photo', (4, 30))]).to_record()
+        with self.assertRaisesRegex(ValueError, 'web locations'):
+            FileId.from_record(photo_record[:7] + bytes([photo_record[7] | FileId.TYPE_ID_WEB_LOCATION_FLAG >> 24]) + photo_record[8:])
+        # end with
+        web_location = base64url_encode(rle_encode(
+            struct.pack('<LL', FileId.TYPE_PHOTO | FileId.TYPE_ID_WEB_LOCATION_FLAG, 4)
+            + pack_tl_string(b'https://example.com/image.png') + struct.pack('<q', 1234567890123) + b'\x1e\x04'
+        ))
+        with self.assertRaisesRegex(ValueError, 'Web location file_ids can not be stored as record'):
+            write_records(io.BytesIO(), [FileId.from_file_id(web_location)])
+        # end with
+    # end def
+
+    def test_files(self):
+        objects = []
+        for file_id in FileIdGenerator(19).file_ids(3000):
+            objects += [file_id, FileUniqueId.from_file_id(file_id)]
+        # end for
+        file = io.BytesIO()
+        self.assertEqual(len(objects), write_records(file, objects, buffer_size=100))
+        self.assertTrue(file.getvalue().startswith(MAGIC))
+        self.assertEqual(10, write_records(file, objects[:10], magic=False))
+
+        file.seek(0)
+        read = list(read_records(file, chunk_size=10))
+        self.assertEqual(len(objects) + 10, len(read))
+        self.assertEqual(
+            [obj.to_record() for obj in objects + objects[:10]],
+            [obj.to_record() for obj in read],
+        )
+        self.assertEqual(len(read), sum(1 for _ in iter_records(file.getvalue(), len(MAGIC))))
+
+        with self.assertRaises(ValueError):
+            list(read_records(io.BytesIO(file.getvalue()[:-1])))
+        # end with
+        with self.assertRaises(ValueError):
+            list(read_records(io.BytesIO(b'CAADBAADwwADmFmqDf6xBrPTReqHAg\n')))
+        # end with
+    # end def
+# end class TestRecords
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import random
+import unittest
+
+from tg_file_id.utils import base64url_decode, rle_decode, rle_encode
+
+__author__ = 'luckydonald'
+
+
+def reference_rle_decode(binary: bytes) -> bytearray:
+    # the original, byte by byte implementation.
+    base256 = bytearray()
+    last = None
+    for cur in binary:
+        if last == 0:
+            for i in range(cur):
+                base256.append(0)
+            # end for
+            last = None
+        else:
+            if last is not None:
+                base256.append(last)
+            # end if
+            last = cur
+        # end if
+    # end for
+    if last is not None:
+        base256.append(last)
+    # end if
+    return base256
+# end def
+
+
+def reference_rle_encode(binary: bytes) -> bytearray:
+    # the original, byte by byte implementation.
+    new = bytearray()
+    count = 0
+    for cur in binary:
+        if cur == 0:
+            count += 1
+        else:
+            if count > 0:
+                new.append(0)
+                new.append(count)
+                count = 0
+            # end if
+            new.append(cur)
+        # end if
+    # end for
+    if count > 0:
+        new.append(0)
+        new.append(count)
+    # end if
+    return new
+# end def
+
+
+class TestRle(unittest.TestCase):
+    def test_file_ids(self):
+        file_ids = [
+            'CAADBAADwwADmFmqDf6xBrPTReqHAg',
+            'CAADBAADwwADmFmqDf6xBrPTReqHFgQ',
+            'CAACAgQAAxkBAAIC4l9CWDGzVUcDejU0TETLWbOdfsCoAALDAAOYWaoN_rEGs9NF6ocbBA',
+            'CAACAgQAAxkBAAIE4V-nVmlwWzNxKeRGZYjG0m7UWm0IAALDAAOYWaoN_rEGs9NF6oceBA',
+            'AgADAgADRaoxG64rCUlfm3fj3nihW3PHUQ8ABLefjdP8kuxqa7ABAAEC',
+            'AgADAgADRaoxG64rCUlfm3fj3nihW3PHUQ8ABAEAAwIAA3gAA2uwAQABFgQ',
+            'AgACAgIAAxkBAAIBp19C0Fkv9R4D-TriZLzK7vBUw-DrAAJFqjEbrisJSV-bd-PeeKFbc8dRDwAEAQADAgADbQADbbABAAEbBA',
+            'AgACAgIAAxkBAAIE3V-nVPRnkcGnCW8Vd53VQgouUt60AAJFqjEbrisJSV-bd-PeeKFbc8dRDwAEAQADAgADeAADa7ABAAEeBA',
+        ]
+        for file_id in file_ids:
+            binary = base64url_decode(file_id)
+            decoded = rle_decode(binary)
+            self.assertEqual(reference_rle_decode(binary), decoded, msg=f'file_id = {file_id!r}')
+            self.assertEqual(reference_rle_encode(decoded), rle_encode(decoded), msg=f'file_id = {file_id!r}')
+            self.assertEqual(binary, rle_encode(decoded), msg=f'file_id = {file_id!r}')
+        # end for
+    # end def
+
+    def test_edge_cases(self):
+        for binary in (b'', b'\x00', b'\x00\x00', b'\x00\x00\x00', b'a\x00', b'\x00\x00a', b'\x00\x03', b'a\x00\x01\x00'):
+            self.assertEqual(reference_rle_decode(binary), rle_decode(binary), msg=f'binary = {binary!r}')
+            self.assertEqual(reference_rle_encode(binary), rle_encode(binary), msg=f'binary = {binary!r}')
+        # end for
+    # end def
+
+    def test_random(self):
+        rng = random.Random(4458)
+        for i in range(2000):
+            # mostly zeros and small values, to get plenty of runs.
+            binary = bytes(rng.choice((0, 0, 0, 1, 2, 255)) for _ in range(rng.randrange(0, 64)))
+            self.assertEqual(reference_rle_decode(binary), rle_decode(binary), msg=f'binary = {binary!r}')
+            self.assertEqual(reference_rle_encode(binary), rle_encode(binary), msg=f'binary = {binary!r}')
+            self.assertEqual(binary, rle_decode(rle_encode(binary)), msg=f'binary = {binary!r}')
+        # end for
+    # end def
+
+    def test_long_zero_runs(self):
+        for length in (254, 255, 256, 510, 511, 1000):
+            binary = b'a' + bytes(length) + b'b'
+            self.assertEqual(binary, rle_decode(rle_encode(binary)), msg=f'length = {length!r}')
+            self.assertEqual(binary[:-1], rle_decode(rle_encode(binary[:-1])), msg=f'length = {length!r}')
+        # end for
+    # end def
+# end class
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import copy
+import pickle
+import unittest
+
+from tg_file_id.file_id import FileId, PhotoFileId
+from tg_file_id.file_unique_id import FileUniqueId
+from tests._common import FILE_IDS, FileIdTestCase
+
+__author__ = 'luckydonald'
+
+
+class TestSlots(FileIdTestCase):
+    def test_no_dict(self):
+        for file_id in FILE_IDS:
+            obj = FileId.from_file_id(file_id)
+            self.assertFalse(hasattr(obj, '__dict__'), msg=file_id)
+            if isinstance(obj, PhotoFileId):
+                self.assertFalse(hasattr(obj.photosize, '__dict__'), msg=file_id)
+            # end if
+            self.assertFalse(hasattr(FileUniqueId.from_file_id(obj), '__dict__'), msg=file_id)
+        # end for
+    # end def
+
+    def test_pickle_and_copy(self):
+        for file_id in FILE_IDS:
+            obj = FileId.from_file_id(file_id)
+            for clone in (pickle.loads(pickle.dumps(obj)), copy.deepcopy(obj)):
+                self.assertSameFileId(obj, clone, msg=file_id)
+                self.assertEqual(file_id, clone.to_file_id(), msg=file_id)
+            # end for
+
+            unique_id = FileUniqueId.from_file_id(obj)
+            clone = pickle.loads(pickle.dumps(unique_id))
+            for name in FileUniqueId.__slots__:
+                self.assertEqual(getattr(unique_id, name), getattr(clone, name), msg=f'{file_id}, {name}')
+            # end for
+            self.assertEqual(unique_id.to_unique_id(), clone.to_unique_id(), msg=file_id)
+        # end for
+    # end def
+# end class
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
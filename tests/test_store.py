@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import struct
+import tempfile
+import unittest
+
+from tg_file_id.file_id import FileId
+from tg_file_id.file_unique_id import FileUniqueId
+from tg_file_id.generate import FileIdGenerator
+from tg_file_id.store import FileIdStore
+from tg_file_id.utils import base64url_encode, pack_tl_string, rle_encode
+
+__author__ = 'luckydonald'
+
+
+class TestFileIdStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'media')
+    # end def
+
+    def tearDown(self):
+        self.directory.cleanup()
+    # end def
+
+    def test_put_and_get(self):
+        file_ids = [file_id.to_file_id() for file_id in FileIdGenerator(19).file_ids(3000)]  # grows the index and data file a few times
+        with FileIdStore(self.path) as store:
+            for file_id in file_ids:
+                self.assertEqual(FileUniqueId.from_file_id(file_id).to_unique_id(), store.put(file_id).to_unique_id())
+            # end for
+            self.assertEqual(len(file_ids), len(store))
+            for file_id in file_ids:
+                unique_id = FileUniqueId.from_file_id(file_id)
+                self.assertIn(unique_id, store)
+                self.assertEqual(file_id, store[unique_id.to_unique_id()].to_file_id())
+                self.assertEqual(file_id, store.get(unique_id).to_file_id())
+            # end for
+            missing = FileUniqueId(type_id=FileUniqueId.TYPE_DOCUMENT, id=1)
+            self.assertNotIn(missing, store)
+            self.assertIsNone(store.get(missing))
+            self.assertEqual('nope', store.get(missing, 'nope'))
+            with self.assertRaises(KeyError):
+                store[missing]
+            # end with
+        # end with
+    # end def
+
+    def test_latest_wins_and_compact(self):
+        sticker = 'CAACAgQAAxkBAAIE4V-nVmlwWzNxKeRGZYjG0m7UWm0IAALDAAOYWaoN_rEGs9NF6oceBA'
+        old_sticker = 'CAADBAADwwADmFmqDf6xBrPTReqHAg'  # same file, so the same file_unique_id
+        others = [file_id.to_file_id() for file_id in FileIdGenerator(20).file_ids(100)]
+        with FileIdStore(self.path) as store:
+            store.put(old_sticker)
+            for file_id in others:
+                store.put(file_id)
+            # end for
+            store.put(sticker)
+            self.assertEqual(101, len(store))
+            self.assertEqual(1, store.garbage)
+            unique_id = FileUniqueId.from_file_id(sticker).to_unique_id()
+            self.assertEqual(sticker, store.get(unique_id).to_file_id())
+
+            size = store._data_end
+            store.compact()
+            self.assertEqual((101, 0), (len(store), store.garbage))
+            self.assertLess(store._data_end, size)
+            self.assertEqual(sticker, store.get(unique_id).to_file_id())
+            self.assertEqual(
+                sorted(others + [sticker]),
+                sorted(file_id.to_file_id() for _, file_id in store.items()),
+            )
+        # end with
+        self.assertFalse(os.path.exists(self.path + '.compact.data'))
+    # end def
+
+    def test_reopen(self):
+        file_ids = list(FileIdGenerator(21).file_ids(500))
+        with FileIdStore(self.path) as store:
+            for file_id in file_ids:
+                store.put(file_id)
+            # end for
+        # end with
+        with FileIdStore(self.path) as store:
+            self.assertEqual(500, len(store))
+            for file_id in file_ids:
+                self.assertEqual(file_id.to_record(), store.get(FileUniqueId.from_file_id(file_id)).to_record())
+            # end for
+            store.put(file_ids[0])
+            self.assertEqual((500, 1), (len(store), store.garbage))
+        # end with
+    # end def
+
+    def test_not_a_store(self):
+        with open(self.path + '.data', 'wb') as f:
+            f.write(b'CAADBAADwwADmFmqDf6xBrPTReqHAg\n')
+        # end with
+        with self.assertRaises(ValueError):
+            FileIdStore(self.path)
+        # end with
+    # end def
+
+    def test_web_location(self):
+        web_location = base64url_encode(rle_encode(
+            struct.pack('<LL', FileId.TYPE_PHOTO | FileId.TYPE_ID_WEB_LOCATION_FLAG, 4)
+            + pack_tl_string(b'https://example.com/image.png') + struct.pack('<q', 1234567890123) + b'\x1e\x04'
+        ))
+        with FileIdStore(self.path) as store:
+            for file_id in (web_location, FileId.from_file_id(web_location)):
+                with self.assertRaisesRegex(ValueError, 'Web location file_ids can not be stored as record'):
+                    store.put(file_id)
+                # end with
+            # end for
+            self.assertEqual(0, len(store))
+        # end with
+    # end def
+# end class TestFileIdStore
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import bz2
+import gzip
+import io
+import json
+import lzma
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+from tg_file_id.file_id import FileId
+from tg_file_id.file_unique_id import FileUniqueId
+from tg_file_id.generate import FileIdGenerator
+from tg_file_id.policy import DecodePolicy
+from tg_file_id.stream import MAX_LINE_LENGTH, iter_decode, iter_file_ids, iter_lines, iter_unique_ids, open_input
+
+__author__ = 'luckydonald'
+
+
+class TestStream(unittest.TestCase):
+    FILE_IDS = list(FileIdGenerator(22).strings(1000))
+
+    def test_compressions(self):
+        text = ('\n'.join(self.FILE_IDS) + '\n').encode()
+        with tempfile.TemporaryDirectory() as directory:
+            for name, compress in (('plain.txt', bytes), ('ids.gz', gzip.compress), ('ids.bz2', bz2.compress), ('ids.xz', lzma.compress)):
+                path = os.path.join(directory, name)
+                with open(path, 'wb') as f:
+                    f.write(compress(text))
+                # end with
+                with self.subTest(name=name):
+                    with open_input(path) as f:
+                        self.assertEqual(self.FILE_IDS, list(iter_lines(f, block_size=333)))
+                    # end with
+                    with open(path, 'rb') as raw:
+                        with open_input(raw) as f:
+                            self.assertEqual(self.FILE_IDS[:5], list(iter_lines(f))[:5])
+                        # end with
+                        self.assertFalse(raw.closed)
+                    # end with
+                # end with
+            # end for
+        # end with
+    # end def
+
+    def test_lines(self):
+        data = b'  a\r\n\n\nb\nc \n\n' + 'dä'.encode() + b'\nlast'
+        for block_size in (1, 2, 3, 7, 1 << 20):
+            with self.subTest(block_size=block_size):
+                self.assertEqual(['a', 'b', 'c', 'dä', 'last'], list(iter_lines(io.BytesIO(data), block_size=block_size)))
+            # end with
+        # end for
+        self.assertEqual([], list(iter_lines(io.BytesIO(b''))))
+    # end def
+
+    def test_max_line_length(self):
+        longest = b'a' * MAX_LINE_LENGTH
+        self.assertEqual([longest.decode(), 'b'], list(iter_lines(io.BytesIO(longest + b'\nb'), block_size=1 << 16)))
+        lines = iter_lines(io.BytesIO(b'b\n' + longest + b'a\nc'), block_size=1 << 16)
+        self.assertEqual('b', next(lines))
+        with self.assertRaises(ValueError):
+            next(lines)
+        # end with
+    # end def
+
+    def test_iter_decode(self):
+        data = gzip.compress(('\n'.join(self.FILE_IDS) + '\n').encode())
+        decoded = list(iter_decode(io.BytesIO(data), batch_size=64, block_size=1000))
+        self.assertEqual(self.FILE_IDS, [file_id.file_id for file_id in decoded])
+        self.assertEqual(
+            [FileId.from_file_id(file_id).to_record() for file_id in self.FILE_IDS],
+            [file_id.to_record() for file_id in decoded],
+        )
+        self.assertEqual(
+            [FileUniqueId.from_file_id(file_id).to_unique_id() for file_id in self.FILE_IDS],
+            list(iter_unique_ids(io.BytesIO(data), batch_size=64, block_size=1000)),
+        )
+    # end def
+
+    def test_json_lines(self):
+        rows = [{'file_id': file_id, 'n': n} for n, file_id in enumerate(self.FILE_IDS[:50])] + [{'file_id': None}, {'other': 1}]
+        data = '\n'.join(json.dumps(row) for row in rows).encode()
+        self.assertEqual(self.FILE_IDS[:50], list(iter_file_ids(io.BytesIO(data), key='file_id', block_size=100)))
+        self.assertEqual(self.FILE_IDS[:50], [file_id.file_id for file_id in iter_decode(io.BytesIO(data), key='file_id')])
+        with self.assertRaises(ValueError):
+            list(iter_file_ids(io.BytesIO(b'[1, 2]\n'), key='file_id'))
+        # end with
+    # end def
+
+    def test_errors(self):
+        data = ('\n'.join(self.FILE_IDS[:10] + ['garbage'] + self.FILE_IDS[10:20])).encode()
+        with self.assertRaises(Exception):
+            list(iter_unique_ids(io.BytesIO(data)))
+        # end with
+        unique_ids = list(iter_unique_ids(io.BytesIO(data), on_error='none', batch_size=4))
+        self.assertEqual(21, len(unique_ids))
+        self.assertIsNone(unique_ids[10])
+        self.assertEqual(FileUniqueId.from_file_id(self.FILE_IDS[10]).to_unique_id(), unique_ids[11])
+        pairs = list(iter_decode(io.BytesIO(data), on_error='pair', batch_size=4, policy=DecodePolicy(DecodePolicy.SILENT)))
+        self.assertEqual([True] * 10 + [False] + [True] * 10, [error is None for _, error in pairs])
+    # end def
+
+    def test_constant_memory(self):
+        file_ids = list(FileIdGenerator(23).strings(20000))
+        data = gzip.compress(('\n'.join(file_ids) + '\n').encode())  # about 1.5 MB as text
+        tracemalloc.start()
+        count = sum(1 for _ in iter_decode(io.BytesIO(data), batch_size=100, block_size=1 << 14))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.assertEqual(len(file_ids), count)
+        self.assertLess(peak, 500000)
+    # end def
+# end class TestStream
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import gzip
+import json
+import os
+import tempfile
+import unittest
+
+from tg_file_id.file_id import DocumentFileId, PhotoFileId
+from tg_file_id.file_unique_id import FileUniqueId
+from tg_file_id.generate import FileIdGenerator
+from tg_file_id.policy import DecodePolicy
+from tg_file_id.updates import AuditStats, extract, iter_file_id_fields, iter_updates
+
+__author__ = 'luckydonald'
+
+
+class TestUpdates(unittest.TestCase):
+    STICKER = 'CAACAgEAAx0CVgtngQACAuFfU1GY9wiRG7A7jlIBbP2yvAostAACegAD997LEUiQZafDlhIeGwQ'
+    PHOTOS = [
+        'AgACAgIAAxkBAAIBp19C0Fkv9R4D-TriZLzK7vBUw-DrAAJFqjEbrisJSV-bd-PeeKFbc8dRDwAEAQADAgADbQADbbABAAEbBA',
+        'AgACAgIAAxkBAAIE2F-nHvTX7tX2Hg946DOPJWEahhgUAAI1sDEbClw4SX8n9AqBZEu9FpVJli4AAwEAAwIAA3gAA-YMBAABHgQ',
+    ]
+
+    def make_update(self, update_id: int, sent_unique_id: str = None) -> dict:
+        unique = lambda file_id: FileUniqueId.from_file_id(file_id).to_unique_id()
+        return {
+            'update_id': update_id,
+            'message': {
+                'message_id': 1,
+                'chat': {
+                    'id': -100, 'type': 'supergroup',
+                    'photo': {
+                        'small_file_id': self.PHOTOS[1], 'small_file_unique_id': unique(self.PHOTOS[1]),
+                        'big_file_id': self.PHOTOS[0], 'big_file_unique_id': unique(self.PHOTOS[0]),
+                    },
+                },
+                'photo': [{'file_id': file_id, 'file_unique_id': unique(file_id), 'width': 90, 'height': 90} for file_id in self.PHOTOS],
+                'reply_to_message': {
+                    'sticker': {
+                        'file_id': self.STICKER, 'file_unique_id': sent_unique_id or 'AgADegAD997LEQ',
+                        'thumbnail': {'file_id': self.PHOTOS[1]},  # no file_unique_id sent
+                    },
+                },
+            },
+        }
+    # end def
+
+    def test_fields(self):
+        self.assertEqual(
+            [
+                ('$.message.chat.photo.small_file_id', self.PHOTOS[1]),
+                ('$.message.chat.photo.big_file_id', self.PHOTOS[0]),
+                ('$.message.photo[0].file_id', self.PHOTOS[0]),
+                ('$.message.photo[1].file_id', self.PHOTOS[1]),
+                ('$.message.reply_to_message.sticker.file_id', self.STICKER),
+                ('$.message.reply_to_message.sticker.thumbnail.file_id', self.PHOTOS[1]),
+            ],
+            [(path, file_id) for path, file_id, _ in iter_file_id_fields(self.make_update(1))],
+        )
+    # end def
+
+    def test_extract(self):
+        updates = [self.make_update(1), json.dumps(self.make_update(2, sent_unique_id='AgADBAsAAgKLowAB')), {'update_id': 3, 'message': {'document': {'file_id': 'garbage', 'file_unique_id': 'x'}}}]
+        stats = AuditStats()
+        found = list(extract(updates, batch_size=4, stats=stats, policy=DecodePolicy(DecodePolicy.SILENT)))
+        self.assertEqual(13, len(found))
+        self.assertEqual([0] * 6 + [1] * 6 + [2], [result.index for result in found])
+        self.assertIsInstance(found[0].file_id, PhotoFileId)
+        self.assertIsInstance(found[4].file_id, DocumentFileId)
+        self.assertEqual([True, True, True, True, True, None], [result.matches for result in found[:6]])
+        self.assertFalse(found[10].matches)
+        self.assertEqual('AgADegAD997LEQ', found[10].file_unique_id.to_unique_id())
+        self.assertIsNotNone(found[12].error)
+        self.assertIsNone(found[12].matches)
+        self.assertEqual((3, 13, 1, 9, 1, 2), (stats.updates, stats.file_ids, stats.failed, stats.matched, stats.mismatched, stats.unchecked))
+    # end def
+
+    def test_generated(self):
+        file_ids = list(FileIdGenerator(24).strings(500))
+        updates = [{'update_id': n, 'message': {'document': {'file_id': file_id, 'file_unique_id': FileUniqueId.from_file_id(file_id).to_unique_id()}}} for n, file_id in enumerate(file_ids)]
+        stats = AuditStats()
+        self.assertEqual(file_ids, [result.raw for result in extract(updates, batch_size=64, stats=stats)])
+        self.assertEqual((500, 0, 0), (stats.matched, stats.mismatched, stats.failed))
+    # end def
+
+    def test_iter_updates(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'updates.jsonl.gz')
+            with gzip.open(path, 'wt') as f:
+                f.write(''.join(json.dumps(self.make_update(update_id)) + '\n\n' for update_id in range(1, 4)))
+            # end with
+            self.assertEqual([1, 2, 3], [update['update_id'] for update in iter_updates(path)])
+        # end with
+    # end def
+# end class TestUpdates
+
+
+if __name__ == '__main__':
+    unittest.main()
+# end if
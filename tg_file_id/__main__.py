@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    python -m tg_file_id --help
+"""
+import sys
+
+from tg_file_id.cli import main
+
+__author__ = 'luckydonald'
+
+
+if __name__ == '__main__':
+    sys.exit(main())
+# end if
@@ -0,0 +1,454 @@
+"""
+Columnar (struct-of-arrays) representation of many file_ids at once, backed by NumPy.
+
+Requires `numpy` (`pip install tg_file_id[numpy]`).
+"""
+import struct
+from typing import Iterable, List, Union, Dict, Tuple
+
+import numpy as np
+
+from tg_file_id.file_id import FileId, DocumentFileId, PhotoFileId
+from tg_file_id.layouts import LAYOUTS, VERSIONS, layout_version_of, photosize_field_names
+from tg_file_id.policy import DecodePolicy, get_default_policy
+from tg_file_id.file_unique_id import FileUniqueId, unique_id_to_int
+from tg_file_id.utils import base64url_decode, base64url_encode, base64url_encode_many, rle_decode, rle_encode, pack_tl_string
+
+__author__ = 'luckydonald'
+
+
+COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ('type_id', '<u4'),
+    ('dc_id', '<u4'),
+    ('id', '<i8'),
+    ('access_hash', '<i8'),
+    ('version', 'u1'),
+    ('sub_version', 'u1'),
+    ('has_reference', '?'),
+    ('photosize_source', 'i1'),  # -1 for documents
+    ('volume_id', '<i8'),
+    ('location_local_id', '<i4'),
+    ('secret', '<i8'),
+    ('file_type', '<u4'),
+    ('thumbnail_type', 'S4'),
+    ('dialog_id', '<i8'),
+    ('dialog_access_hash', '<i8'),
+    ('sticker_set_id', '<i8'),
+    ('sticker_set_access_hash', '<i8'),
+)
+""" The fixed width columns of a `FileIdBatch`, as (name, numpy dtype). Photosize fields not used by a row are 0. """
+
+_ROW_DTYPE = np.dtype(list(COLUMNS))
+_ROW = struct.Struct('<LLqqBB?bqlqL4sqqqq')  # same layout as _ROW_DTYPE
+assert _ROW.size == _ROW_DTYPE.itemsize
+
+_NO_PHOTOSIZE = -1
+
+_HEAD_FIELDS = [('type_id', '<u4'), ('dc_id', '<u4')]
+_NUMPY_FORMATS = {'q': '<i8', 'l': '<i4', 'L': '<u4', '4s': 'S4'}
+""" The numpy dtypes of the `struct` formats used in `tg_file_id.layouts.LAYOUTS` """
+_ENCODE_FIELDS: Dict[Tuple[int, int], List[Tuple[str, str]]] = {
+    (layout_version, _NO_PHOTOSIZE if photosize_source is None else photosize_source): [
+        (name, _NUMPY_FORMATS[fmt]) for name, fmt in fields
+    ]
+    for (layout_version, _, photosize_source), fields in LAYOUTS.items()
+}
+""" `tg_file_id.layouts.LAYOUTS` as numpy dtype fields, keyed by (layout version, photosize source). The names are the ones of the columns. """
+
+_COLUMN_INDEX = {name: index for index, (name, _) in enumerate(COLUMNS)}
+_ROW_POSITIONS: Dict[Tuple[int, str, Union[int, None]], Tuple[int, ...]] = {
+    layout: tuple(_COLUMN_INDEX[name] for name, _ in fields) for layout, fields in LAYOUTS.items()
+}
+""" The column of each field of a layout, i.e. its position in a `_ROW` """
+_EMPTY_ROWS: Dict[Tuple[int, str, Union[int, None]], List[Union[int, bytes]]] = {
+    layout: [
+        (_NO_PHOTOSIZE if layout[2] is None else layout[2]) if name == 'photosize_source' else b'' if dtype.startswith('S') else 0
+        for name, dtype in COLUMNS
+    ]
+    for layout in LAYOUTS
+}
+""" A `_ROW` of each layout, with the photosize source set and all other columns 0 """
+_PHOTOSIZE_FIELDS: Dict[int, Tuple[str, ...]] = {
+    photosize_source: photosize_field_names(fields)
+    for (_, family, photosize_source), fields in LAYOUTS.items() if family == 'photo'
+}
+""" The columns holding the `PhotoFileId.PhotosizeSource` fields, per photosize source """
+
+_TYPE_DETAILED = np.array([
+    PhotoFileId.TYPES.get(type_id, DocumentFileId.TYPES.get(type_id)) for type_id in range(FileId.TYPE_NONE + 1)
+], dtype=object)
+_TYPE_GENERIC = np.array([
+    'photo' if type_id in PhotoFileId.TYPES else 'document' if type_id in DocumentFileId.TYPES else None
+    for type_id in range(FileId.TYPE_NONE + 1)
+], dtype=object)
+
+_UNIQUE_TYPE = np.array([
+    FileUniqueId.FULL_TO_UNIQUE_MAP.get(type_id, -1) if type_id in PhotoFileId.TYPES or type_id in DocumentFileId.TYPES else -1
+    for type_id in range(FileId.TYPE_NONE + 1)
+], dtype='<i4')
+"""
+`FileUniqueId.FULL_TO_UNIQUE_MAP` as lookup array, of the types `FileId.from_file_id` decodes.
+-1 for the others, and for types without a unique type.
+"""
+
+_UNIQUE_PADDED_DTYPE = np.dtype([('type_id', '<u4'), ('lo', '<u8'), ('local_id', '<u4')])
+""" A decoded file_unique_id, padded to the 16 bytes of a photo, with the parts of the `FileUniqueId.to_int` halves """
+_UNIQUE_INT_TYPES = [type_id for type_id in FileUniqueId.TYPES if type_id != FileUniqueId.TYPE_WEB]
+""" The unique types `FileUniqueId.to_int` supports """
+
+
+class FileIdBatch(object):
+    """
+    Many decoded file_ids, stored as one NumPy array per field instead of one `FileId` object per file_id.
+    See `COLUMNS` for the available columns, which are attributes of the same name.
+
+    The file references are stored in a single `reference_blob`,
+    with the one of row `i` being `reference_blob[reference_offsets[i]:reference_offsets[i + 1]]`.
+
+    Web location file_ids are not supported.
+    """
+
+    def __init__(self, reference_offsets: np.ndarray, reference_blob: bytes, **columns: np.ndarray):
+        """
+        :param reference_offsets: Start offset of each row's file reference in `reference_blob`, plus the end of the last one.
+        :type  reference_offsets: numpy.ndarray
+
+        :param reference_blob: All the file references, concatenated.
+        :type  reference_blob: bytes
+
+        :param columns: One array per column in `COLUMNS`, all of the same length.
+        :type  columns: numpy.ndarray
+        """
+        missing = {name for name, _ in COLUMNS} - set(columns)
+        if missing:
+            raise TypeError(f'Missing columns: {", ".join(sorted(missing))}')
+        # end if
+        for name, dtype in COLUMNS:
+            setattr(self, name, np.asarray(columns.pop(name), dtype=dtype))
+        # end for
+        if columns:
+            raise TypeError(f'Unknown columns: {", ".join(sorted(columns))}')
+        # end if
+        self.reference_offsets = np.asarray(reference_offsets, dtype='<i8')
+        self.reference_blob = reference_blob
+    # end def __init__
+
+    @classmethod
+    def from_file_ids(cls, file_ids: Iterable[str], *, policy: Union[DecodePolicy, None] = None) -> 'FileIdBatch':
+        """
+        Decodes the given file_ids into columns.
+
+        :param file_ids: The file_ids to decode.
+        :param policy: What to do about unsupported versions and leftover data, see `tg_file_id.policy.DecodePolicy`.
+        :except ValueError: A file_id is invalid or a web location.
+        :return: The batch, in the same order as the file_ids.
+        """
+        rows = bytearray()
+        pack = _ROW.pack
+        references = []
+        append_reference = references.append
+        b64decode = base64url_decode
+        decode_rle = rle_decode
+        split_version = FileId._split_version
+        unpack_fields = FileId._unpack_fields
+        empty_rows = _EMPTY_ROWS
+        row_positions = _ROW_POSITIONS
+        if policy is None:
+            policy = get_default_policy()
+        # end if
+        for file_id in file_ids:
+            decoded = decode_rle(b64decode(file_id))
+            version, sub_version, end = split_version(decoded)
+            if (version, sub_version) not in VERSIONS:
+                policy.unsupported_version(version, sub_version)
+            # end if
+            type_id, has_reference, has_web_location, dc_id, file_reference, layout, values = unpack_fields(decoded, version, sub_version, end, policy)
+            if has_web_location:
+                raise ValueError(f'Web location file_ids are not supported: {file_id!r}')
+            # end if
+            append_reference(file_reference or b'')
+            row = empty_rows[layout].copy()
+            row[0:2] = type_id, dc_id
+            row[4:7] = version, sub_version, has_reference
+            for position, value in zip(row_positions[layout], values):
+                row[position] = value
+            # end for
+            rows += pack(*row)
+        # end for
+
+        table = np.frombuffer(rows, dtype=_ROW_DTYPE)
+        reference_offsets = np.zeros(len(references) + 1, dtype='<i8')
+        np.cumsum([len(reference) for reference in references], out=reference_offsets[1:])
+        return cls(
+            reference_offsets=reference_offsets, reference_blob=b''.join(references),
+            # copy each column into its own contiguous array, so the row table can be freed.
+            **{name: np.ascontiguousarray(table[name]) for name, _ in COLUMNS},
+        )
+    # end def
+
+    def __len__(self) -> int:
+        return len(self.type_id)
+    # end def
+
+    def file_reference(self, index: int) -> Union[bytes, None]:
+        """
+        The file reference of a single row.
+
+        :param index: The row.
+        :return: The file reference, or None if that row has none.
+        """
+        if not self.has_reference[index]:
+            return None
+        # end if
+        return self.reference_blob[self.reference_offsets[index]:self.reference_offsets[index + 1]]
+    # end def
+
+    def __getitem__(self, index: int) -> Union[DocumentFileId, PhotoFileId]:
+        """ Builds the full `FileId` object of a single row. """
+        index = range(len(self))[index]  # negative indices and bound checks
+        type_id = int(self.type_id[index])
+        version = int(self.version[index])
+        sub_version = int(self.sub_version[index])
+        common = dict(
+            file_id=None, type_id=type_id,
+            has_reference=bool(self.has_reference[index]), file_reference=self.file_reference(index), has_web_location=False,
+            dc_id=int(self.dc_id[index]), id=int(self.id[index]), access_hash=int(self.access_hash[index]),
+            version=version, sub_version=sub_version,
+        )
+        photosize_source = int(self.photosize_source[index])
+        if photosize_source == _NO_PHOTOSIZE:
+            return DocumentFileId(type_detailed=DocumentFileId.TYPES[type_id], **common)
+        # end if
+        photosize = PhotoFileId.PHOTOSIZE_SOURCES[photosize_source](**{
+            name: getattr(self, name)[index].item() for name in _PHOTOSIZE_FIELDS[photosize_source]
+        })
+        return PhotoFileId(type_detailed=PhotoFileId.TYPES[type_id], photosize=photosize, **common)
+    # end def
+
+    @property
+    def type_detailed(self) -> np.ndarray:
+        """ A human readable string of the type of each row, see `FileId.type_detailed`. """
+        return _TYPE_DETAILED[self.type_id]
+    # end def
+
+    @property
+    def type_generic(self) -> np.ndarray:
+        """ `'photo'` or `'document'` for each row, see `FileId.type_generic`. """
+        return _TYPE_GENERIC[self.type_id]
+    # end def
+
+    @property
+    def owner_id(self) -> np.ma.MaskedArray:
+        """ The owner_id of each row (see `FileId.owner_id`), masked where it has none (`None` there). """
+        has_owner = ((self.version == 2) | (self.version == 4)) & (self.type_id == FileId.TYPE_STICKER)
+        return np.ma.masked_array((self.id >> 32) & ((1 << 24) - 1), mask=~has_owner)
+    # end def
+
+    def to_file_ids(self, *, version: Union[int, None] = None, sub_version: Union[int, None] = None) -> List[str]:
+        """
+        Encodes all the rows into file_id strings again.
+        The fixed width parts of all the rows with the same layout are packed at once.
+
+        :param version: Encode all rows with this version, instead of their own.
+        :param sub_version: Encode all rows with this sub_version, instead of their own.
+        :except ValueError: A row can't be represented in the requested version.
+        :return: The file_ids, in the same order as the rows.
+        """
+        count = len(self)
+        versions = self.version if version is None else np.full(count, version, dtype='u1')
+        sub_versions = self.sub_version if sub_version is None else np.full(count, sub_version, dtype='u1')
+        layout_versions = np.empty(count, dtype='u1')
+        for version_pair in set(zip(versions.tolist(), sub_versions.tolist())):
+            layout_versions[(versions == version_pair[0]) & (sub_versions == version_pair[1])] = layout_version_of(*version_pair)
+        # end for
+        type_ids = self.type_id | np.where(self.has_reference, FileId.TYPE_ID_FILE_REFERENCE_FLAG, 0).astype('<u4')
+        columns = dict(
+            {name: getattr(self, name) for name, _ in COLUMNS},
+            type_id=type_ids, version=versions, sub_version=sub_versions,
+        )
+
+        payloads: List[Union[bytes, None]] = [None] * count
+        for layout_version, photosize_source in sorted(set(zip(layout_versions.tolist(), self.photosize_source.tolist()))):
+            fields = _ENCODE_FIELDS.get((layout_version, photosize_source))
+            if fields is None:
+                raise ValueError(f'Photosize source {photosize_source} can not be encoded in version {layout_version}.')
+            # end if
+            suffix = [('sub_version', 'u1'), ('version', 'u1')] if layout_version >= 4 else [('version', 'u1')]
+            indices = np.flatnonzero((layout_versions == layout_version) & (self.photosize_source == photosize_source))
+            packed = np.empty(len(indices), dtype=_HEAD_FIELDS + fields + suffix)
+            for name in packed.dtype.names:
+                packed[name] = columns[name][indices]
+            # end for
+            data = packed.tobytes()
+            size = packed.dtype.itemsize
+            for row, index in enumerate(indices.tolist()):
+                payloads[index] = data[row * size:(row + 1) * size]
+            # end for
+        # end for
+
+        head_size = 8  # type_id, dc_id
+        for index in np.flatnonzero(self.has_reference).tolist():
+            payload = payloads[index]
+            payloads[index] = payload[:head_size] + pack_tl_string(self.file_reference(index)) + payload[head_size:]
+        # end for
+        return base64url_encode_many([rle_encode(payload) for payload in payloads])
+    # end def
+
+    def to_unique_ids(self) -> List[str]:
+        """
+        Calculates the file_unique_id of every row,
+        like `FileUniqueId.from_file_id(file_id).to_unique_id()` would.
+
+        :except ValueError: A row's type is invalid, or has no file_unique_id type.
+        :return: The file_unique_ids, in the same order as the rows.
+        """
+        unique_types = self._unique_types()
+        is_photo = unique_types == FileUniqueId.TYPE_PHOTO
+        packed = np.zeros(len(self), dtype=_UNIQUE_PADDED_DTYPE)
+        packed['type_id'] = unique_types
+        packed['lo'] = np.where(is_photo, self.volume_id, self.id).view('<u8')
+        packed['local_id'] = np.where(is_photo, self.location_local_id.view('<u4'), 0)
+        return _encode_unique_payloads(packed, np.where(is_photo, 16, 12))
+    # end def
+
+    def to_unique_uint64(self) -> np.ndarray:
+        """
+        The file_unique_ids of all the rows as `FileUniqueId.to_int` halves, without encoding them as strings.
+        See `unique_ids_to_uint64`.
+
+        :except ValueError: A row's type is invalid, or has no file_unique_id type.
+        :return: A (len, 2) uint64 array, each row the upper and lower 64 bits.
+        """
+        unique_types = self._unique_types()
+        is_photo = unique_types == FileUniqueId.TYPE_PHOTO
+        packed = np.empty((len(self), 2), dtype='<u8')
+        packed[:, 0] = unique_types.astype('<u8') << np.uint64(56)
+        packed[:, 0] |= np.where(is_photo, self.location_local_id.view('<u4'), 0).astype('<u8')
+        packed[:, 1] = np.where(is_photo, self.volume_id, self.id).view('<u8')
+        return packed
+    # end def
+
+    def _unique_types(self) -> np.ndarray:
+        """
+        The file_unique_id type of every row, see `_UNIQUE_TYPE`.
+
+        :except ValueError: A row's type is invalid, or has no file_unique_id type.
+        """
+        type_ids = self.type_id
+        known = type_ids < len(_UNIQUE_TYPE)
+        unique_types = np.where(known, _UNIQUE_TYPE[np.where(known, type_ids, 0)], -1)
+        if (unique_types == -1).any():
+            raise ValueError(f'Type has no file_unique_id: {int(type_ids[unique_types == -1][0])}')
+        # end if
+        return unique_types
+    # end def
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(len={len(self)!r})"
+    # end def __repr__
+# end class FileIdBatch
+
+
+def unique_ids_to_uint64(unique_ids: Iterable[str]) -> np.ndarray:
+    """
+    Converts file_unique_ids to their `FileUniqueId.to_int` form, as two uint64 per id:
+    the upper 64 bits (type id and the photo's local_id) and the lower 64 bits (id, or the photo's volume_id).
+    That's 16 bytes per id, which numpy can deduplicate with `np.unique(array, axis=0)`.
+
+    :param unique_ids: The file_unique_ids, e.g. a list or numpy array of strings.
+    :except ValueError: A file_unique_id is invalid, or a web location.
+    :return: A (len, 2) uint64 array, in the same order.
+    """
+    unique_ids = list(unique_ids)
+    padded = []
+    append = padded.append
+    lengths = np.empty(len(unique_ids), dtype='<u4')
+    for index, unique_id in enumerate(unique_ids):
+        decoded = rle_decode(base64url_decode(unique_id))
+        if len(decoded) not in (12, 16):
+            # e.g. leftover data, let `unique_id_to_int` sort it out, or fail.
+            value = unique_id_to_int(unique_id)
+            decoded = ((value & ((1 << 96) - 1)) << 32 | value >> 120).to_bytes(16 if value >> 120 == FileUniqueId.TYPE_PHOTO else 12, 'little')
+        # end if
+        lengths[index] = len(decoded)
+        append(decoded.ljust(16, b'\0'))
+    # end for
+    packed = np.frombuffer(b''.join(padded), dtype=_UNIQUE_PADDED_DTYPE)
+    unique_types = packed['type_id']
+    is_photo = unique_types == FileUniqueId.TYPE_PHOTO
+    valid = np.isin(unique_types, _UNIQUE_INT_TYPES) & (lengths == np.where(is_photo, 16, 12))
+    if not valid.all():
+        raise ValueError(f'Not a file_unique_id with an int form: {unique_ids[int(np.flatnonzero(~valid)[0])]!r}')
+    # end if
+    result = np.empty((len(packed), 2), dtype='<u8')
+    result[:, 0] = unique_types.astype('<u8') << np.uint64(56) | packed['local_id'].astype('<u8')
+    result[:, 1] = packed['lo']
+    return result
+# end def
+
+
+def uint64_to_unique_ids(array: np.ndarray) -> List[str]:
+    """
+    Converts the output of `unique_ids_to_uint64` back to file_unique_id strings.
+
+    :param array: A (len, 2) uint64 array, each row the upper and lower 64 bits of a `FileUniqueId.to_int`.
+    :except ValueError: A row isn't a valid `FileUniqueId.to_int`.
+    :return: The file_unique_ids, in the same order.
+    """
+    array = np.asarray(array, dtype='<u8').reshape(-1, 2)
+    unique_types = (array[:, 0] >> np.uint64(56)).astype('<u4')
+    is_photo = unique_types == FileUniqueId.TYPE_PHOTO
+    local_ids = array[:, 0] & np.uint64(0xFFFFFFFF)
+    valid = np.isin(unique_types, _UNIQUE_INT_TYPES) & (array[:, 0] >> np.uint64(32) & np.uint64(0xFFFFFF) == 0) & (is_photo | (local_ids == 0))
+    if not valid.all():
+        raise ValueError(f'Not a file_unique_id int: {array[int(np.flatnonzero(~valid)[0])].tolist()!r}')
+    # end if
+    packed = np.empty(len(array), dtype=_UNIQUE_PADDED_DTYPE)
+    packed['type_id'] = unique_types
+    packed['lo'] = array[:, 1]
+    packed['local_id'] = local_ids
+    return _encode_unique_payloads(packed, np.where(is_photo, 16, 12))
+# end def
+
+
+def _encode_unique_payloads(packed: np.ndarray, lengths: np.ndarray) -> List[str]:
+    """
+    RLE and base64url encodes decoded file_unique_ids, all of them at once with array operations,
+    giving the same as `base64url_encode(rle_encode(payload))` for each.
+
+    :param packed: The payloads, as `_UNIQUE_PADDED_DTYPE` rows.
+    :param lengths: How many bytes of each row are the payload, 16 for photos and 12 for everything else.
+    :return: The file_unique_id strings, in the same order.
+    """
+    count = len(packed)
+    if not count:
+        return []
+    # end if
+    # one byte more than the payloads, so there's always a byte after the last \0 run of a row.
+    width = _UNIQUE_PADDED_DTYPE.itemsize + 1
+    in_payload = (np.arange(width) < lengths[:, None]).ravel()
+    data = np.zeros((count, width), dtype='u1')
+    data[:, :-1] = packed.view('u1').reshape(count, -1)
+    data = data.ravel()
+    zero = (data == 0) & in_payload
+    kept = in_payload & ~zero
+
+    # every \0 run becomes a \0 and the length of the run (never above 16 here), every other byte is kept.
+    run_starts = np.flatnonzero(zero & ~np.concatenate(([False], zero[:-1])))
+    run_ends = np.flatnonzero(zero & ~np.concatenate((zero[1:], [False])))
+    sizes = kept.astype('<i8')
+    sizes[run_starts] = 2
+    sizes = sizes.reshape(count, width)
+    rle_lengths = sizes.sum(axis=1)
+    # the extra byte fills each row up to a full 3 byte group of \0s, see `base64url_encode_many`.
+    sizes[:, -1] = -rle_lengths % 3
+    sizes = sizes.ravel()
+    positions = np.cumsum(sizes) - sizes
+
+    encoded = np.zeros(int(positions[-1] + sizes[-1]), dtype='u1')
+    encoded[positions[kept]] = data[kept]
+    encoded[positions[run_starts] + 1] = run_ends - run_starts + 1
+    text = base64url_encode(encoded.tobytes())
+    starts = (positions.reshape(count, width)[:, 0] // 3 * 4).tolist()
+    return [text[start:start + length] for start, length in zip(starts, ((rle_lengths * 4 + 2) // 3).tolist())]
+# end def
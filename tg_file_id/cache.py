@@ -0,0 +1,182 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Union, Callable, Tuple, Any, Dict
+
+from tg_file_id.file_id import FileId, PhotoFileId, WebLocationFileId, DocumentFileId
+from tg_file_id.file_unique_id import FileUniqueId
+from tg_file_id.policy import DecodePolicy, get_default_policy
+
+__author__ = 'luckydonald'
+
+
+class DecodeCache(object):
+    """
+    Opt-in, size bounded LRU cache in front of `FileId.from_file_id` and `FileUniqueId.from_unique_id`,
+    for when the same file_ids are decoded over and over again.
+
+    The decoded objects are mutable (see `DocumentFileId.change_type`),
+    so every call returns a fresh copy of the cached object, and callers can't change the cached one.
+
+        cache = DecodeCache(maxsize=10000, ttl=3600)
+        file_id = cache.from_file_id('CAADBAADwwADmFmqDf6xBrPTReqHAg')
+        print(cache.hits, cache.misses, cache.evictions)
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Union[float, None] = None, timer: Callable[[], float] = time.monotonic):
+        """
+        :param maxsize: How many decoded ids to keep at most. The least recently used ones are evicted first.
+        :type  maxsize: int
+
+        :param ttl: Optional time in seconds after which a cached entry is decoded again.
+        :type  ttl: float | None
+
+        :param timer: The clock to use for the `ttl`.
+        :type  timer: callable
+        """
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1.')
+        # end if
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        """ entries removed because the cache was full """
+        self.expirations = 0
+        """ entries removed because their `ttl` was over """
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[Union[float, None], Any]]' = OrderedDict()
+        self._lock = Lock()
+    # end def __init__
+
+    def from_file_id(self, file_id: str, *, policy: Union[DecodePolicy, None] = None) -> Union[PhotoFileId, DocumentFileId, WebLocationFileId]:
+        """
+        Cached `FileId.from_file_id`.
+        An unsupported version or leftover data of the file_id is reported to the `policy` on every call, cached or not.
+
+        :param file_id: The file_id to decode.
+        :param policy: What to do about unsupported versions and leftover data, see `DecodePolicy`.
+                       Default is the one of `tg_file_id.policy.set_default_policy`.
+        :except ValueError: Not a valid file_id, or an unsupported version or leftover data with a `'strict'` policy.
+        :return: A copy of the decoded object.
+        """
+        obj, unsupported_version, leftover = self._get('file_id', file_id, _decode_file_id)
+        if policy is None:
+            policy = get_default_policy()
+        # end if
+        if unsupported_version is not None:
+            policy.unsupported_version(*unsupported_version)
+        # end if
+        if leftover:
+            policy.leftover(leftover)
+        # end if
+        return _copy(obj)
+    # end def
+
+    def from_unique_id(self, unique_id: str) -> FileUniqueId:
+        """
+        Cached `FileUniqueId.from_unique_id`.
+
+        :param unique_id: The file_unique_id to decode.
+        :return: A copy of the decoded object.
+        """
+        return _copy(self._get('unique_id', unique_id, FileUniqueId.from_unique_id))
+    # end def
+
+    def _get(self, kind: str, string: str, decode: Callable[[str], Any]) -> Any:
+        """ The cached result of `decode(string)`, as it is, so the callers have to copy it. """
+        key = (kind, string)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, obj = entry
+                if expires is None or self.timer() < expires:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return obj
+                # end if
+                del self._entries[key]
+                self.expirations += 1
+            # end if
+            self.misses += 1
+        # end with
+
+        obj = decode(string)  # outside the lock, decoding the same id twice in parallel is harmless.
+
+        expires = None if self.ttl is None else self.timer() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires, obj)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            # end while
+        # end with
+        return obj
+    # end def
+
+    def clear(self):
+        """ Removes all entries. The counters are kept. """
+        with self._lock:
+            self._entries.clear()
+        # end with
+    # end def
+
+    def __len__(self) -> int:
+        return len(self._entries)
+    # end def
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"maxsize={self.maxsize!r}, ttl={self.ttl!r}, size={len(self)!r}, "
+            f"hits={self.hits!r}, misses={self.misses!r}, evictions={self.evictions!r}, expirations={self.expirations!r}"
+            f")"
+        )
+    # end def __repr__
+# end class DecodeCache
+
+
+def _decode_file_id(file_id: str) -> Tuple[Union[PhotoFileId, DocumentFileId, WebLocationFileId], Union[Tuple[int, int], None], int]:
+    """
+    Decodes the file_id, recording what its policy would be told, to tell it to the policy of every call to `DecodeCache.from_file_id`.
+
+    :return: The decoded object, its (version, sub_version) if unsupported, and how many bytes are left over.
+    """
+    recorder = DecodePolicy(DecodePolicy.SILENT)
+    obj = FileId.from_file_id(file_id, policy=recorder)
+    unsupported_version = next(iter(recorder.unsupported_versions), None)
+    return obj, unsupported_version, recorder.leftover_bytes
+# end def
+
+
+_SLOTS: Dict[type, Tuple[str, ...]] = {}
+""" All the `__slots__` of a class, including the inherited ones """
+
+
+def _copy(obj: Any) -> Any:
+    """
+    Shallow copy of a decoded object, including the photosize of a `PhotoFileId`, which is mutable as well.
+    Skips the `copy.copy` machinery, as all those objects keep their state in `__slots__`.
+    """
+    cls = obj.__class__
+    slots = _SLOTS.get(cls)
+    if slots is None:
+        slots = _SLOTS[cls] = tuple(
+            name for klass in cls.__mro__ for name in klass.__dict__.get('__slots__', ())
+        )
+    # end if
+    new = object.__new__(cls)
+    for name in slots:
+        try:
+            setattr(new, name, getattr(obj, name))
+        except AttributeError:  # not set
+            pass
+        # end try
+    # end for
+    if isinstance(new, PhotoFileId):
+        new.photosize = _copy(new.photosize)
+    # end if
+    return new
+# end def
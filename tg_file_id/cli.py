@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+The command line tool, streaming newline delimited file_ids from files or stdin (plain, gzip, bz2 or xz)
+to JSON lines, CSV or TSV.
+
+    python -m tg_file_id decode dump.txt.gz --format csv > decoded.csv
+    python -m tg_file_id unique --jobs 8 < file_ids.txt
+    python -m tg_file_id reencode --version 4 --sub-version 30 old.txt.xz -o new.tsv --format tsv
+    python -m tg_file_id peek file_ids.txt
+    python -m tg_file_id stats file_ids.txt.bz2
+
+The ids are processed in chunks, so memory stays bounded for any number of them.
+With `--jobs` the chunks are processed by that many worker processes, and written in the input's order.
+
+Besides those, `generate` writes random, but valid file_ids, e.g. for load tests,
+and `audit` checks the file_unique_ids in Bot API updates, one JSON update per line (see `tg_file_id.updates`):
+
+    python -m tg_file_id generate 1000000 --versions 4.30:9,2.0:1 -o corpus.txt
+    python -m tg_file_id audit updates.jsonl.gz > problems.jsonl
+"""
+import argparse
+import csv
+import io
+import json
+import logging
+import sys
+from collections import Counter
+from contextlib import contextmanager
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, TextIO, Tuple, TypeVar, Union
+
+from tg_file_id.file_id import FileId, DocumentFileId, PhotoFileId
+from tg_file_id.file_unique_id import file_id_to_unique_id
+from tg_file_id.generate import FileIdGenerator
+from tg_file_id.migrate import migrate
+from tg_file_id.parallel import iter_chunks, ordered_map
+from tg_file_id.policy import DecodePolicy
+from tg_file_id.stream import open_input, iter_file_ids
+from tg_file_id.updates import AuditStats, extract, iter_updates
+
+__author__ = 'luckydonald'
+
+logger = logging.getLogger(__name__)
+
+VALUE = TypeVar('VALUE')
+
+
+FORMATS = ('jsonl', 'csv', 'tsv')
+
+FIELDS: Dict[str, Tuple[str, ...]] = {
+    'decode': (
+        'file_id', 'type_id', 'type', 'dc_id', 'id', 'access_hash', 'version', 'sub_version', 'file_reference',
+        'photosize_source', 'volume_id', 'local_id', 'owner_id', 'url', 'error',
+    ),
+    'unique': ('file_id', 'file_unique_id', 'error'),
+    'reencode': ('file_id', 'new_file_id', 'error'),
+    'peek': ('file_id', 'type_id', 'has_reference', 'has_web_location', 'dc_id', 'version', 'sub_version', 'error'),
+    'stats': ('group', 'key', 'count'),
+}
+""" The columns of every command's output, in order """
+
+
+def _decode_row(file_id: str, options: dict) -> dict:
+    decoded = FileId.from_file_id(file_id, policy=options['policy'])
+    photosize = getattr(decoded, 'photosize', None)
+    file_reference = decoded.file_reference
+    url = getattr(decoded, 'url', None)
+    return {
+        'file_id': file_id,
+        'type_id': decoded.type_id,
+        'type': getattr(decoded, 'type_detailed', None),
+        'dc_id': getattr(decoded, 'dc_id', None),
+        'id': getattr(decoded, 'id', None),
+        'access_hash': decoded.access_hash,
+        'version': getattr(decoded, 'version', None),
+        'sub_version': getattr(decoded, 'sub_version', None),
+        'file_reference': file_reference.hex() if file_reference else None,
+        'photosize_source': photosize.type_id if photosize else None,
+        'volume_id': photosize.volume_id if photosize else None,
+        'local_id': photosize.location_local_id if photosize else None,
+        'owner_id': getattr(decoded, 'owner_id', None),
+        'url': url.decode('utf-8', 'replace') if isinstance(url, bytes) else url,
+    }
+# end def
+
+
+def _unique_row(file_id: str, options: dict) -> dict:
+    return {'file_id': file_id, 'file_unique_id': file_id_to_unique_id(file_id)}
+# end def
+
+
+def _peek_row(file_id: str, options: dict) -> dict:
+    return dict(zip(FIELDS['peek'], (file_id,) + FileId.peek(file_id)))
+# end def
+
+
+_ROWS: Dict[str, Callable[[str, dict], dict]] = {
+    'decode': _decode_row,
+    'unique': _unique_row,
+    'peek': _peek_row,
+}
+""" The function making the output row of a single file_id, per command (`reencode` and `stats` work on whole chunks) """
+
+
+def _rows(command: str, file_ids: List[str], options: dict) -> Iterable[dict]:
+    """ The output rows of a chunk, with failed file_ids reported in the `error` column, or raised """
+    if command == 'reencode':
+        # `migrate` skips decoding ids already in the target version, so it's used as is.
+        results = migrate(file_ids, version=options.get('version'), sub_version=options.get('sub_version'), on_error='pair', policy=options['policy'])
+        for file_id, (new_file_id, error) in zip(file_ids, results):
+            yield _failed(file_id, error, options) if error else {'file_id': file_id, 'new_file_id': new_file_id}
+        # end for
+        return
+    # end if
+    make_row = _ROWS[command]
+    for file_id in file_ids:
+        try:
+            row = make_row(file_id, options)
+        except Exception as e:
+            yield _failed(file_id, e, options)
+            continue
+        # end try
+        yield row
+    # end for
+# end def
+
+
+def _failed(file_id: str, error: Exception, options: dict) -> dict:
+    if options['on_error'] == 'raise':
+        raise ValueError(f'Failed to process {file_id!r}: {error!r}') from error
+    # end if
+    return {'file_id': file_id, 'error': repr(error)}
+# end def
+
+
+def _stats(file_ids: List[str], options: dict) -> 'Counter[Tuple[str, str]]':
+    """ The counts of a chunk per type, version and dc, from the headers only """
+    counts = Counter()
+    for file_id in file_ids:
+        try:
+            type_id, has_reference, has_web_location, dc_id, version, sub_version = FileId.peek(file_id)
+            type_name = 'web location' if has_web_location else PhotoFileId.TYPES.get(type_id) or DocumentFileId.TYPES.get(type_id, str(type_id))
+        except Exception:
+            counts['total', 'failed'] += 1
+            continue
+        # end try
+        counts['total', 'ok'] += 1
+        counts['type', type_name] += 1
+        counts['version', f'{version}.{sub_version}'] += 1
+        counts['dc_id', str(dc_id)] += 1
+        counts['has_reference', str(has_reference).lower()] += 1
+    # end for
+    return counts
+# end def
+
+
+def _format(rows: Iterable[dict], fields: Tuple[str, ...], output_format: str) -> str:
+    """ The rows as text in the output format, without the header """
+    if output_format == 'jsonl':
+        return ''.join([json.dumps(row, separators=(',', ':')) + '\n' for row in rows])
+    # end if
+    text = io.StringIO()
+    writer = csv.writer(text, delimiter='\t' if output_format == 'tsv' else ',', lineterminator='\n')
+    writer.writerows([['' if row.get(field) is None else row[field] for field in fields] for row in rows])
+    return text.getvalue()
+# end def
+
+
+def _process_chunk(command: str, chunk: str, options: dict) -> Union[Tuple[str, int], 'Counter[Tuple[str, str]]']:
+    """
+    Runs a command on one chunk of newline joined file_ids, possibly in a worker process.
+
+    :return: For `stats` the counts, else the formatted output and how many file_ids failed.
+    """
+    file_ids = chunk.split('\n')
+    if command == 'stats':
+        return _stats(file_ids, options)
+    # end if
+    rows = list(_rows(command, file_ids, options))
+    return _format(rows, FIELDS[command], options['format']), sum(1 for row in rows if 'error' in row)
+# end def
+
+
+def run(command: str, inputs: Iterable[str], output, *, key: Union[str, None] = None, output_format: str = 'jsonl', jobs: int = 1, chunksize: int = 10000, **options) -> int:
+    """
+    Runs a command over all the file_ids of the inputs, writing the results to `output`.
+
+    :param command: One of `FIELDS`.
+    :param inputs: Paths, or `'-'` for stdin.
+    :param output: The text file to write to.
+    :param key: For inputs of JSON lines, the field holding the file_id, see `tg_file_id.stream.iter_file_ids`.
+    :param output_format: One of `FORMATS`.
+    :param jobs: How many processes to use.
+    :param chunksize: How many file_ids to process at once.
+    :param options: The command's options: `on_error` (`'raise'` or `'keep'`), `policy` (not needed by `unique`),
+                    and `version` and `sub_version` for `reencode` (default is `FileId.MAX_VERSION`).
+    :return: How many file_ids failed.
+    """
+    options = dict(options, format=output_format)
+    options.setdefault('on_error', 'keep')
+    options.setdefault('policy', DecodePolicy(DecodePolicy.SILENT))
+    fields = FIELDS[command]
+    if output_format not in FORMATS:
+        raise ValueError(f'Unknown format: {output_format!r}')
+    # end if
+    if output_format != 'jsonl':
+        output.write(_format([dict(zip(fields, fields))], fields, output_format))
+    # end if
+
+    def read_chunks():
+        for path in inputs:
+            with open_input(path) as file:
+                yield from ((command, chunk, options) for chunk in iter_chunks(iter_file_ids(file, key=key), chunksize))
+            # end with
+        # end for
+    # end def
+
+    failed = 0
+    counts = Counter()
+    for result in ordered_map(_process_chunk, read_chunks(), workers=jobs):
+        if command == 'stats':
+            counts.update(result)
+            continue
+        # end if
+        text, chunk_failed = result
+        output.write(text)
+        failed += chunk_failed
+    # end for
+    if command == 'stats':
+        failed = counts['total', 'failed']
+        rows = [{'group': group, 'key': key, 'count': count} for (group, key), count in sorted(counts.items(), key=lambda item: (item[0][0], -item[1], item[0][1]))]
+        output.write(_format(rows, fields, output_format))
+    # end if
+    output.flush()
+    return failed
+# end def
+
+
+def audit(inputs: Iterable[str], output: TextIO, *, write_all: bool = False, limit: Union[int, None] = None) -> AuditStats:
+    """
+    Checks the file_unique_ids in Bot API updates against the ones calculated from the file_ids,
+    writing the mismatches and failures (or all file_ids found) as JSON lines. See `tg_file_id.updates.extract`.
+
+    :param inputs: Files of updates, one JSON update per line, plain or compressed. `'-'` for stdin.
+    :param output: The text file to write to.
+    :param write_all: Write every file_id found, not only the problems.
+    :param limit: Stop after this many updates.
+    :return: The counts.
+    """
+    def read_updates():
+        for path in inputs:
+            yield from iter_updates(path)
+        # end for
+    # end def
+
+    stats = AuditStats()
+    write = output.write
+    for found in extract(islice(read_updates(), limit), stats=stats, policy=DecodePolicy(DecodePolicy.SILENT)):
+        if not write_all and found.error is None and found.matches is not False:
+            continue
+        # end if
+        write(json.dumps({
+            'index': found.index,
+            'path': found.path,
+            'file_id': found.raw,
+            'sent_unique_id': found.sent_unique_id,
+            'file_unique_id': found.file_unique_id.unique_id if found.file_unique_id else None,
+            'matches': found.matches,
+            'error': repr(found.error) if found.error else None,
+        }) + '\n')
+    # end for
+    output.flush()
+    return stats
+# end def
+
+
+def _parse_mix(text: str, parse_value: Callable[[str], VALUE]) -> Dict[VALUE, float]:
+    """ `'4.30:9,2.0'` -> `{(4, 30): 9.0, (2, 0): 1.0}`, with the given `parse_value` """
+    mix = {}
+    for part in text.split(','):
+        value, _, weight = part.strip().partition(':')
+        mix[parse_value(value)] = float(weight) if weight else 1.0
+    # end for
+    return mix
+# end def
+
+
+def _parse_version(text: str) -> Tuple[int, int]:
+    version, _, sub_version = text.partition('.')
+    return int(version), int(sub_version or 0)
+# end def
+
+
+@contextmanager
+def _open_output(path: str) -> Iterator[TextIO]:
+    """ The file to write to, with a large buffer, or stdout for `'-'` """
+    if path == '-':
+        yield sys.stdout
+        return
+    # end if
+    with open(path, 'w', newline='', buffering=1 << 20) as output:
+        yield output
+    # end with
+# end def
+
+
+def main(argv: Union[None, Iterable[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m tg_file_id',
+        description='Decodes, converts and counts file_ids, one per line, read from files or stdin (plain, gzip, bz2 or xz).',
+    )
+    commands = parser.add_subparsers(dest='command', required=True, metavar='command')
+    for command, help_text in (
+        ('decode', 'decode every file_id into its fields'),
+        ('unique', 'calculate the file_unique_id of every file_id'),
+        ('reencode', 'encode every file_id in another (sub_)version'),
+        ('peek', 'read only the header and version of every file_id, the fastest'),
+        ('stats', 'count the file_ids per type, version, dc and file reference'),
+    ):
+        sub_parser = commands.add_parser(command, help=help_text, description=help_text)
+        sub_parser.add_argument('inputs', nargs='*', default=['-'], help='files with one file_id per line, default stdin')
+        sub_parser.add_argument('-o', '--output', default='-', help='where to write the results, default stdout')
+        sub_parser.add_argument('-k', '--key', default=None, help='read JSON lines, with the file_id in this field')
+        sub_parser.add_argument('-f', '--format', choices=FORMATS, default='jsonl', help='output format, default jsonl')
+        sub_parser.add_argument('-j', '--jobs', type=int, default=1, help='how many processes to use, 0 for all cores, default 1')
+        sub_parser.add_argument('--chunksize', type=int, default=10000, help='how many file_ids to process at once, default 10000')
+        if command != 'stats':
+            sub_parser.add_argument(
+                '--on-error', choices=('raise', 'keep'), default='keep',
+                help='what to do with a file_id failing: abort, or write it with the error in the "error" column (default)',
+            )
+        # end if
+        if command == 'reencode':
+            sub_parser.add_argument('--version', type=int, default=None, help=f'target version, default {FileId.MAX_VERSION[0]}')
+            sub_parser.add_argument('--sub-version', type=int, default=None, help='target sub_version, default the latest one of the version')
+        # end if
+    # end for
+    help_text = 'write random, but valid file_ids, one per line. Mixes are comma separated "value:weight" pairs, the weight defaulting to 1'
+    sub_parser = commands.add_parser('generate', help=help_text, description=help_text)
+    sub_parser.add_argument('count', type=int, help='how many to generate')
+    sub_parser.add_argument('-o', '--output', default='-', help='where to write them, default stdout')
+    sub_parser.add_argument('--seed', default='0', help='seed of the random number generator, default 0')
+    sub_parser.add_argument('--unique', action='store_true', help='write file_unique_ids instead of file_ids')
+    sub_parser.add_argument('--types', help='mix of FileId.TYPE_* numbers, e.g. "2:3,8:1"')
+    sub_parser.add_argument('--versions', help='mix of versions, e.g. "4.30:9,2.0:1"')
+    sub_parser.add_argument('--file-reference-lengths', help='mix of file_reference lengths, e.g. "0:1,29:4"')
+    sub_parser.add_argument('--photosize-sources', help='mix of PhotoFileId.PHOTOSIZE_SOURCE_* numbers, e.g. "1,2,3"')
+    help_text = (
+        'check the file_unique_ids in Bot API updates, one JSON update per line, against the ones calculated from the file_ids. '
+        'The mismatches and failures are written as JSON lines, the counts to stderr'
+    )
+    sub_parser = commands.add_parser('audit', help=help_text, description=help_text)
+    sub_parser.add_argument('inputs', nargs='*', default=['-'], help='files of updates, default stdin')
+    sub_parser.add_argument('-o', '--output', default='-', help='where to write the results, default stdout')
+    sub_parser.add_argument('--all', action='store_true', help='write every file_id found, not only the problems')
+    sub_parser.add_argument('--limit', type=int, default=None, help='stop after this many updates')
+    args = parser.parse_args(argv)
+
+    if args.command == 'generate':
+        generator = FileIdGenerator(
+            int(args.seed) if args.seed.isdigit() else args.seed,
+            types=_parse_mix(args.types, int) if args.types else None,
+            versions=_parse_mix(args.versions, _parse_version) if args.versions else None,
+            file_reference_lengths=_parse_mix(args.file_reference_lengths, int) if args.file_reference_lengths else None,
+            photosize_sources=_parse_mix(args.photosize_sources, int) if args.photosize_sources else None,
+        )
+        with _open_output(args.output) as output:
+            generator.write(output, args.count, unique=args.unique)
+            output.flush()
+        # end with
+        return 0
+    # end if
+    if args.command == 'audit':
+        with _open_output(args.output) as output:
+            stats = audit(args.inputs, output, write_all=args.all, limit=args.limit)
+        # end with
+        print(stats, file=sys.stderr)
+        return 1 if stats.failed or stats.mismatched else 0
+    # end if
+
+    options = {'on_error': getattr(args, 'on_error', 'keep')}
+    if args.command == 'reencode':
+        options.update(version=args.version, sub_version=args.sub_version)
+    # end if
+    try:
+        with _open_output(args.output) as output:
+            failed = run(args.command, args.inputs, output, key=args.key, output_format=args.format, jobs=args.jobs or None, chunksize=args.chunksize, **options)
+        # end with
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    # end try
+    if failed:
+        print(f'{failed} file_ids failed', file=sys.stderr)
+    # end if
+    return 1 if failed else 0
+# end def
+
+
+if __name__ == '__main__':
+    sys.exit(main())
+# end if
@@ -1,19 +1,25 @@
 import struct
 import logging
-from io import BytesIO, SEEK_END
-from typing import Union, Tuple, TypeVar, Type, Dict
+from operator import attrgetter
+from typing import Union, Tuple, TypeVar, Type, Dict, Iterable, List, Callable
 
-from luckydonaldUtils.exceptions import assert_type_or_raise
 from tg_file_id.utils import (
-    base64url_decode, base64url_encode, rle_decode, rle_encode, pack_tl_string,
-    unpack_tl_string, unpack_null_terminated_string, pack_null_terminated_string,
+    base64url_decode, base64url_encode, base64url_encode_many, rle_decode, rle_encode, tl_string_size,
+    pack_tl_string_into, unpack_tl_string_from,
 )
+from tg_file_id.layouts import LAYOUTS, VERSIONS, layout_version_of, photosize_field_names
+from tg_file_id.policy import DecodePolicy, get_default_policy
 
 logger = logging.getLogger(__name__)
 CLASS = TypeVar('CLASS')
 
 
 class FileId(object):
+    __slots__ = (
+        'file_id', 'type_id', 'has_reference', 'file_reference', 'has_web_location', 'type_generic', 'type_detailed',
+        'dc_id', 'id', 'access_hash', 'version', 'sub_version',
+    )
+
     TYPE_ID_WEB_LOCATION_FLAG = 1 << 24
     TYPE_ID_FILE_REFERENCE_FLAG = 1 << 25
 
@@ -96,30 +102,216 @@ class FileId(object):
     # end def
 
     @classmethod
-    def from_file_id(cls, file_id, decoded: Union[None, bytes] = None) -> Union['PhotoFileId', 'DocumentFileId', 'WebLocationFileId']:
+    def from_file_id(cls, file_id, decoded: Union[None, bytes] = None, *, lazy: bool = False, policy: Union[DecodePolicy, None] = None) -> Union['PhotoFileId', 'DocumentFileId', 'WebLocationFileId']:
         """
 
         :param file_id:
         :param decoded: if the file_id binary data is already decoded (rle + base64url).
-        :except ValueError: Unknown type id.
+        :param lazy: Only decode the header (`type_id`, `dc_id` and the flags, and with that `type_generic` and `type_detailed`) now,
+                     and the remaining fields (`id`, `access_hash`, `file_reference`, `version`, `sub_version` and `photosize`)
+                     the first time one of them is accessed.
+                     Errors in that remaining data are raised on that access as well.
+                     Has no effect for web locations, or if `decoded` is given.
+        :param policy: What to do about unsupported versions and leftover data, see `DecodePolicy`.
+                       Default is the one of `tg_file_id.policy.set_default_policy`.
+        :except ValueError: Unknown type id, or not a valid file_id, e.g. truncated.
         :return:
         """
+        if lazy and not decoded:
+            lazy_file_id = cls._from_header(file_id, policy)
+            if lazy_file_id is not None:
+                return lazy_file_id
+            # end if
+        # end if
         if not decoded:
             decoded = rle_decode(base64url_decode(file_id))
         # end if
-        data, version, sub_version = cls._parse_version(decoded)
-        buffer = BytesIO(data)
-        type_id = struct.unpack('<L', buffer.read(4))[0]
-        type_id, has_reference, has_web_location = cls._normalize_type_id(type_id)
-        dc_id = struct.unpack('<L', buffer.read(4))[0]
-        if has_reference:
-            file_reference = unpack_tl_string(buffer)
+        version, sub_version, end = cls._parse_version(decoded, policy)
+        return cls._from_decoded(file_id, decoded, version, sub_version, end, policy)
+    # end def
+
+    @classmethod
+    def peek(cls, file_id: str) -> Tuple[int, bool, bool, int, int, int]:
+        """
+        Reads only the header and the version of a file_id, without decoding the fields in between or building an object.
+        Meant for routing lots of file_ids, where `from_file_id` would be too much work.
+        Neither the type nor the version are checked, so there is no warning about unsupported versions either.
+
+        :param file_id: The file_id to look at.
+        :except ValueError: Too short for a header.
+        :return: type_id, has_reference, has_web_location, dc_id, version, sub_version
+        """
+        header = cls._peek_header(file_id)
+        version = cls._peek_version(file_id)
+        if header is None or version is None:
+            decoded = rle_decode(base64url_decode(file_id))
+            if len(decoded) < _HEADER.size:
+                raise ValueError(f'Truncated file_id: {len(decoded)} bytes.')
+            # end if
+            type_id, dc_id = _HEADER.unpack_from(decoded, 0)
+            header = cls._normalize_type_id(type_id) + (dc_id,)
+            version = cls._split_version(decoded)[:2]
+        # end if
+        return header + version
+    # end def
+
+    @staticmethod
+    def _peek_header(file_id: str) -> Union[Tuple[int, bool, bool, int], None]:
+        """
+        Decodes the header from the start of the file_id only.
+
+        :return: type_id, has_reference, has_web_location, dc_id, or `None` if the start isn't enough.
+        """
+        # the usual headers, encoded, are in a lookup table. The first 12 characters (9 bytes) hold all of those.
+        head = base64url_decode(file_id[:12])
+        for length in _ENCODED_HEADER_LENGTHS:
+            header = _ENCODED_HEADERS.get(head[:length])
+            if header is not None:
+                return header
+            # end if
+        # end for
+        # 24 characters are 18 bytes, enough for the 8 header bytes even if all of them are RLE encoded zeros.
+        # A zero run cut off at the end of those is decoded as a single \0, which still is the correct start of that run.
+        head = rle_decode(base64url_decode(file_id[:24]))
+        if len(head) < _HEADER.size:
+            return None
+        # end if
+        type_id, dc_id = _HEADER.unpack_from(head, 0)
+        return FileId._normalize_type_id(type_id) + (dc_id,)
+    # end def
+
+    @staticmethod
+    def _peek_version(file_id: str) -> Union[Tuple[int, int], None]:
+        """
+        Decodes the version suffix (see `_split_version`) from the last base64 characters of the file_id only.
+
+        :return: version, sub_version, or `None` if those bytes are part of an RLE zero run, and the whole file_id needs to be decoded to tell.
+        """
+        # the last two (complete or not) groups of 4 characters, which are at least the last 4 bytes.
+        start = max(0, ((len(file_id) - 1) // 4 - 1) * 4)
+        tail = base64url_decode(file_id[start:])
+        if len(tail) < 3 or not tail[-1] or not tail[-2]:
+            # a \0 at the end, or the last byte being the count of a zero run.
+            return None
+        # end if
+        version = tail[-1]
+        if version != 4:
+            return version, 0
+        # end if
+        if not tail[-3]:
+            # the sub_version byte is the count of a zero run, so it is a \0.
+            return None
+        # end if
+        return version, tail[-2]
+    # end def
+
+    @classmethod
+    def _from_header(cls, file_id: str, policy: Union[DecodePolicy, None] = None) -> Union['LazyPhotoFileId', 'LazyDocumentFileId', None]:
+        """
+        Decodes only the header of the file_id, for `from_file_id(..., lazy=True)`.
+        The `policy` is kept for decoding the remaining fields.
+
+        :return: The lazy object, or `None` if that file_id needs to be decoded completely.
+        """
+        header = cls._peek_header(file_id)
+        if header is None:
+            return None
+        # end if
+        type_id, has_reference, has_web_location, dc_id = header
+        if has_web_location:
+            return None
+        # end if
+        if type_id in PhotoFileId.TYPES:
+            lazy_file_id = object.__new__(LazyPhotoFileId)
+            type_generic = 'photo'
+            type_detailed = PhotoFileId.TYPES[type_id]
         else:
-            file_reference = None
+            lazy_file_id = object.__new__(LazyDocumentFileId)
+            type_generic = 'document'
+            type_detailed = DocumentFileId.TYPES.get(type_id)
+            if type_detailed is None:
+                raise ValueError(f"Type is invalid: {type_id}")
+            # end if
+        # end if
+        set_field = object.__setattr__  # skips the check of the lazy fields
+        set_field(lazy_file_id, 'file_id', file_id)
+        set_field(lazy_file_id, 'type_id', type_id)
+        set_field(lazy_file_id, 'has_reference', has_reference)
+        set_field(lazy_file_id, 'has_web_location', has_web_location)
+        set_field(lazy_file_id, 'type_generic', type_generic)
+        set_field(lazy_file_id, 'type_detailed', type_detailed)
+        set_field(lazy_file_id, 'dc_id', dc_id)
+        set_field(lazy_file_id, '_decode_pending', True)
+        set_field(lazy_file_id, '_policy', policy)
+        return lazy_file_id
+    # end def
+
+    @classmethod
+    def decode_many(cls, file_ids: Iterable[str], *, on_error: str = 'raise', policy: Union[DecodePolicy, None] = None) -> List[Union['PhotoFileId', 'DocumentFileId', 'WebLocationFileId', None, Tuple[Union['FileId', 'WebLocationFileId', None], Union[Exception, None]]]]:
+        """
+        Decodes a whole batch of file_ids at once, in order.
+        Same result as calling `FileId.from_file_id` for each of them.
+
+        :param file_ids: The file_ids to decode.
+        :param on_error: What to do with a file_id failing to decode.
+                         `'raise'` raises the error, aborting the batch (default),
+                         `'none'` puts a `None` in place of the result,
+                         `'pair'` makes every item a `(result, None)` or `(None, error)` tuple.
+                         With a `'strict'` policy, unsupported versions and leftover data are such failures too.
+        :param policy: What to do about unsupported versions and leftover data, see `DecodePolicy`.
+        :return: The list of results.
+        """
+        if on_error not in ('raise', 'none', 'pair'):
+            raise ValueError(f'Unknown on_error mode: {on_error!r}')
+        # end if
+        with_pairs = on_error == 'pair'
+        raise_errors = on_error == 'raise'
+        results = []
+        append = results.append
+        b64decode = base64url_decode
+        decode_rle = rle_decode
+        split_version = cls._split_version
+        from_decoded = cls._from_decoded
+        if policy is None:
+            policy = get_default_policy()
         # end if
+        for file_id in file_ids:
+            try:
+                decoded = decode_rle(b64decode(file_id))
+                version, sub_version, end = split_version(decoded)
+                if (version, sub_version) not in VERSIONS:
+                    policy.unsupported_version(version, sub_version)
+                # end if
+                result = from_decoded(file_id, decoded, version, sub_version, end, policy)
+            except Exception as e:
+                if raise_errors:
+                    raise
+                # end if
+                append((None, e) if with_pairs else None)
+                continue
+            # end try
+            append((result, None) if with_pairs else result)
+        # end for
+        return results
+    # end def
+
+    @classmethod
+    def _from_decoded(cls, file_id: Union[str, None], decoded: Union[bytes, bytearray], version: int, sub_version: int, end: int, policy: Union[DecodePolicy, None] = None) -> Union['PhotoFileId', 'DocumentFileId', 'WebLocationFileId']:
+        """
+        Parses the already decoded (rle + base64url) file_id binary data.
+
+        :param file_id: The original file_id.
+        :param decoded: The decoded binary data.
+        :param version: The version, as parsed by `_split_version`.
+        :param sub_version: The sub_version, as parsed by `_split_version`.
+        :param end: The length of the data before the version suffix, as parsed by `_split_version`.
+        :param policy: What to do about leftover data. Default is the default policy.
+        :except ValueError: Unknown type id, or the data is too short for its fields.
+        """
+        data = memoryview(decoded)
+        type_id, has_reference, has_web_location, dc_id, file_reference, offset = cls._unpack_header(data, end)
         if has_web_location:
-            url = unpack_tl_string(buffer)
-            access_hash = struct.unpack('<q', buffer.read(8))
+            url, access_hash = cls._unpack_web_location(data, offset, end)
             return WebLocationFileId(
                 file_id=file_id, type_id=type_id, has_reference=has_reference, has_web_location=has_web_location,
                 # type_detailed=PhotoFileId.TYPES[type_id],
@@ -127,70 +319,116 @@ class FileId(object):
                 url=url, access_hash=access_hash
             )
         # end if
-        # v2,00: AgADAgADRaoxG64rCUlfm3fj3nihW3PHUQ8ABLefjdP8kuxqa7ABAAEC via @teleflaskBot
-        # type_id, dc_id, id, access_hash, location_volume_id, location_secret, location_local_id = struct.unpack('<iiqqqqi', data)
-        # v4,22: AgADAgADRaoxG64rCUlfm3fj3nihW3PHUQ8ABAEAAwIAA3gAA2uwAQABFgQ via @teleflaskBot
-        # v4,27: AgACAgIAAxkBAAIBp19C0Fkv9R4D-TriZLzK7vBUw-DrAAJFqjEbrisJSV-bd-PeeKFbc8dRDwAEAQADAgADbQADbbABAAEbBA via @teleflaskBot
-        media_id = struct.unpack('<q', buffer.read(8))[0]
-        access_hash = struct.unpack('<q', buffer.read(8))[0]
         if type_id in PhotoFileId.TYPES:
-            volume_id = struct.unpack('<q', buffer.read(8))[0]
-            photosize_source = 0 if version < 4 else struct.unpack('<L', buffer.read(4))[0]
-            photosize = None
-            if photosize_source == PhotoFileId.PHOTOSIZE_SOURCE_LEGACY:
-                secret = struct.unpack('<q', buffer.read(8))[0]
-                location_local_id = struct.unpack('<l', buffer.read(4))[0]
-                photosize = PhotoFileId.PhotosizeSourceLegacy(volume_id=volume_id, secret=secret, location_local_id=location_local_id)
-            elif photosize_source == PhotoFileId.PHOTOSIZE_SOURCE_THUMBNAIL:
-                file_type = struct.unpack('<L', buffer.read(4))[0]
-                thumbnail_type = unpack_null_terminated_string(buffer.read(4))  # force to process two extra bytes (after the b'x' or b's').
-                location_local_id = struct.unpack('<l', buffer.read(4))[0]
-                photosize = PhotoFileId.PhotosizeSourceThumbnail(volume_id=volume_id, file_type=file_type, thumbnail_type=thumbnail_type, location_local_id=location_local_id)
-            elif photosize_source in (PhotoFileId.PHOTOSIZE_SOURCE_DIALOGPHOTO_SMALL, PhotoFileId.PHOTOSIZE_SOURCE_DIALOGPHOTO_BIG):
-                dialog_id = struct.unpack('<q', buffer.read(8))[0]
-                dialog_access_hash = struct.unpack('<q', buffer.read(8))[0]
-                location_local_id = struct.unpack('<l', buffer.read(4))[0]
-                if photosize_source == PhotoFileId.PHOTOSIZE_SOURCE_DIALOGPHOTO_SMALL:
-                    photosize = PhotoFileId.PhotosizeSourceDialogPhotoSmall(volume_id=volume_id, dialog_id=dialog_id, dialog_access_hash=dialog_access_hash, location_local_id=location_local_id)
-                else:
-                    photosize = PhotoFileId.PhotosizeSourceDialogPhotoBig(volume_id=volume_id, dialog_id=dialog_id, dialog_access_hash=dialog_access_hash, location_local_id=location_local_id)
-                # end if
-            elif photosize_source == PhotoFileId.PHOTOSIZE_SOURCE_STICKERSET_THUMBNAIL:
-                sticker_set_id = struct.unpack('<q', buffer.read(8))[0]
-                sticker_set_access_hash = struct.unpack('<q', buffer.read(8))[0]
-                location_local_id = struct.unpack('<l', buffer.read(4))[0]
-                photosize = PhotoFileId.PhotosizeSourceStickersetThumbnail(volume_id=volume_id, sticker_set_id=sticker_set_id, sticker_set_access_hash=sticker_set_access_hash, location_local_id=location_local_id)
-            # end if
+            layout = cls._decoded_layout_key(data, offset, type_id, version, sub_version)
+        else:  # same as _decoded_layout_key, without the function calls.
+            layout = (VERSIONS.get((version, sub_version)) or layout_version_of(version, sub_version), 'document', None)
+        # end if
+        return _DECODERS[layout](file_id, data, offset, end, type_id, has_reference, file_reference, dc_id, version, sub_version, policy)
+    # end def
 
-            file_id_obj = PhotoFileId(
-                file_id=file_id, type_id=type_id, has_reference=has_reference, has_web_location=has_web_location,
-                type_detailed=PhotoFileId.TYPES[type_id],
-                file_reference=file_reference,
-                dc_id=dc_id, id=media_id, access_hash=access_hash,
-                photosize=photosize,
-                version=version, sub_version=sub_version,
-            )
+    @classmethod
+    def _unpack_fields(cls, decoded: Union[bytes, bytearray], version: int, sub_version: int, end: int, policy: Union[DecodePolicy, None] = None) -> Tuple[int, bool, bool, int, Union[bytes, None], Tuple[int, str, Union[int, None]], tuple]:
+        """
+        Unpacks the raw fields of the already decoded (rle + base64url) file_id binary data, without building any objects.
+
+        :param decoded: The decoded binary data.
+        :param version: The version, as parsed by `_split_version`.
+        :param sub_version: The sub_version, as parsed by `_split_version`.
+        :param end: The length of the data before the version suffix, as parsed by `_split_version`.
+        :param policy: What to do about leftover data. Default is the default policy.
+        :except ValueError: Unknown type id or photosize source, or the data is too short for its fields.
+        :return: type_id, has_reference, has_web_location, dc_id, file_reference,
+                 the key of the layout in `tg_file_id.layouts.LAYOUTS`, and the values of the fields listed there.
+                 `s` fields still have their null padding.
+                 For web locations, the layout is `None` and the values are `(url, access_hash)`.
+        """
+        data = memoryview(decoded)
+        type_id, has_reference, has_web_location, dc_id, file_reference, offset = cls._unpack_header(data, end)
+        if has_web_location:
+            return type_id, has_reference, has_web_location, dc_id, file_reference, None, cls._unpack_web_location(data, offset, end)
+        # end if
+        if type_id not in PhotoFileId.TYPES and type_id not in DocumentFileId.TYPES:
+            raise ValueError(f"Type is invalid: {type_id}")
+        # end if
+        layout = cls._decoded_layout_key(data, offset, type_id, version, sub_version)
+        struct_layout = _LAYOUTS[layout]
+        stuff_left = end - offset - struct_layout.size
+        if stuff_left > 0:
+            _leftover(policy, stuff_left)
+        elif stuff_left < 0:
+            raise ValueError(f'Truncated file_id: {-stuff_left} bytes missing.')
+        # end if
+        return type_id, has_reference, has_web_location, dc_id, file_reference, layout, struct_layout.unpack_from(data, offset)
+    # end def
+
+    @classmethod
+    def _unpack_header(cls, data: Union[bytes, bytearray, memoryview], end: int) -> Tuple[int, bool, bool, int, Union[bytes, None], int]:
+        """
+        Unpacks the header and the file reference of the already decoded (rle + base64url) file_id binary data.
+
+        :param end: The length of the data before the version suffix, as parsed by `_split_version`.
+        :except ValueError: The data is too short for those.
+        :return: type_id, has_reference, has_web_location, dc_id, file_reference, and the offset of the data following those.
+        """
+        if end < _HEADER.size:
+            raise ValueError(f'Truncated file_id: {end} bytes before the version.')
+        # end if
+        type_id, dc_id = _HEADER.unpack_from(data, 0)
+        type_id, has_reference, has_web_location = cls._normalize_type_id(type_id)
+        if has_reference:
+            file_reference, offset = unpack_tl_string_from(data, _HEADER.size, end=end)
         else:
-            file_id_obj = DocumentFileId(
-                file_id=file_id, type_id=type_id, has_reference=has_reference, has_web_location=has_web_location,
-                type_detailed=DocumentFileId.TYPES[type_id],
-                file_reference=file_reference,
-                dc_id=dc_id, id=media_id, access_hash=access_hash,
-                version=version, sub_version=sub_version,
-            )
+            file_reference, offset = None, _HEADER.size
         # end if
+        return type_id, has_reference, has_web_location, dc_id, file_reference, offset
+    # end def
 
-        version_suffix_length = 1 if version < 4 else 2
+    @staticmethod
+    def _unpack_web_location(data: Union[bytes, bytearray, memoryview], offset: int, end: int) -> Tuple[bytes, int]:
+        """
+        Unpacks the fields of a web location, following the header and file reference (see `_unpack_header`).
 
-        end_position = buffer.tell()
-        buffer.seek(0, SEEK_END)
-        stuff_left = buffer.tell() - end_position
-        stuff_left -= version_suffix_length
-        if stuff_left > 0:
-            logger.warning(f'Found {stuff_left} leftover data.')
+        :except ValueError: The data is too short for those.
+        :return: url, access_hash
+        """
+        url, offset = unpack_tl_string_from(data, offset, end=end)
+        if offset + _LONG.size > end:
+            raise ValueError('Truncated file_id: no access_hash after the url.')
         # end if
+        return url, _LONG.unpack_from(data, offset)[0]
+    # end def
 
-        return file_id_obj
+    @staticmethod
+    def _decoded_layout_key(data: Union[bytes, bytearray, memoryview], offset: int, type_id: int, version: int, sub_version: int) -> Tuple[int, str, Union[int, None]]:
+        """
+        Finds the layout (see `tg_file_id.layouts.LAYOUTS`) of the fields following the header and file reference.
+
+        :param offset: Where those fields start.
+        :except ValueError: Unknown photosize source, or the data ends before it.
+        :return: The key of the layout.
+        """
+        # v2,00: AgADAgADRaoxG64rCUlfm3fj3nihW3PHUQ8ABLefjdP8kuxqa7ABAAEC via @teleflaskBot
+        # v4,22: AgADAgADRaoxG64rCUlfm3fj3nihW3PHUQ8ABAEAAwIAA3gAA2uwAQABFgQ via @teleflaskBot
+        # v4,27: AgACAgIAAxkBAAIBp19C0Fkv9R4D-TriZLzK7vBUw-DrAAJFqjEbrisJSV-bd-PeeKFbc8dRDwAEAQADAgADbQADbbABAAEbBA via @teleflaskBot
+        layout_version = layout_version_of(version, sub_version)
+        if type_id not in PhotoFileId.TYPES:
+            return layout_version, 'document', None
+        # end if
+        source_offset = _PHOTOSIZE_SOURCE_OFFSETS.get(layout_version)
+        if source_offset is None:  # layouts before the photosize source field
+            photosize_source = PhotoFileId.PHOTOSIZE_SOURCE_LEGACY
+        else:
+            if offset + source_offset + _UINT32.size > len(data):
+                raise ValueError('Truncated file_id: no photosize source.')
+            # end if
+            photosize_source = _UINT32.unpack_from(data, offset + source_offset)[0]
+        # end if
+        layout = (layout_version, 'photo', photosize_source)
+        if layout not in _LAYOUTS:
+            raise ValueError(f'Unknown photosize source: {photosize_source}')
+        # end if
+        return layout
     # end def
 
     def recalculate(self) -> str:
@@ -222,77 +460,182 @@ class FileId(object):
         return self.file_id
     # end def
 
-    def calculate_file_id(self, *, version: Union[int, None] = None, sub_version: Union[int, None] = None) -> str:
+    def calculate_file_id(self, *, version: Union[int, None] = None, sub_version: Union[int, None] = None, policy: Union[DecodePolicy, None] = None) -> str:
         """
         Calculates a new file id from our fields.
 
         :param version: supply a different version
         :param sub_version: supply a different version
+        :param policy: What to do about a potentially unsupported target version, see `DecodePolicy`.
+                       Default is the one of `tg_file_id.policy.set_default_policy`.
+        :except ValueError: Our fields can't be represented in that version, or it is unsupported with a `'strict'` policy.
         :return:
         """
-        if not version:
-            version = self.version
+        version, sub_version = self._target_version(version, sub_version)
+        if (version, sub_version) not in VERSIONS:
+            (policy or get_default_policy()).unsupported_version(version, sub_version)
         # end if
-        if not sub_version:
-            sub_version = self.sub_version
+        return base64url_encode(rle_encode(self._pack(version, sub_version)))
+    # end def
+
+    @classmethod
+    def encode_many(cls, file_ids: Iterable['FileId'], *, version: Union[int, None] = None, sub_version: Union[int, None] = None, policy: Union[DecodePolicy, None] = None) -> List[str]:
+        """
+        Calculates the file_ids of a whole batch of objects at once, in order.
+        Same result as calling `calculate_file_id` on each of them,
+        but the base64url encoding of all of them is done in a single pass.
+
+        :param file_ids: The objects to encode.
+        :param version: supply a different version for all of them
+        :param sub_version: supply a different sub_version for all of them
+        :param policy: See `calculate_file_id`.
+        :except ValueError: The fields of one of them can't be represented in that version, or it is unsupported with a `'strict'` policy.
+        :return: The list of file_ids.
+        """
+        if policy is None:
+            policy = get_default_policy()
+        # end if
+        payloads = []
+        append = payloads.append
+        for file_id in file_ids:
+            target_version = file_id._target_version(version, sub_version)
+            if target_version not in VERSIONS:
+                policy.unsupported_version(*target_version)
+            # end if
+            append(rle_encode(file_id._pack(*target_version)))
+        # end for
+        return base64url_encode_many(payloads)
+    # end def
+
+    RECORD_FORMAT = 1
+    """ The first byte of every `to_record` record, the version of that format. """
+
+    def to_record(self) -> bytes:
+        """
+        The file_id as compact binary record, for storing it without the RLE and base64 of `to_file_id`.
+        Fixed width fields first: the `RECORD_FORMAT` byte, version, sub_version, the photosize source (255 for documents),
+        type_id (with the file reference flag), dc_id, the length of the file_reference (2 bytes),
+        and the fields of the layout (see `tg_file_id.layouts.LAYOUTS`, without the photosize source), all little endian.
+        The file_reference follows those.
+
+        Decode it again with `FileId.from_record`, or many from a file with `tg_file_id.records.read_records`.
+
+        :except ValueError: Our fields can't be represented in our version, or the file_reference is too long.
+        :return: The record.
+        """
+        version, sub_version = self._target_version(None, None)
+        layout = self._layout_key(layout_version_of(version, sub_version))
+        file_reference = self.file_reference or b''
+        if isinstance(file_reference, str):
+            file_reference = file_reference.encode()
         # end if
-        if (version, sub_version) not in FileId.SUPPORTED_VERSIONS:
-            from warnings import warn
-            warn(f'Potentially unsupported file_id (sub_)version: {version, sub_version}')
+        if len(file_reference) > 0xFFFF:
+            raise ValueError(f'The file_reference is too long for a record: {len(file_reference)} bytes')
+        # end if
+        type_id = self.type_id | self.TYPE_ID_FILE_REFERENCE_FLAG if file_reference else self.type_id
+        header = (FileId.RECORD_FORMAT, version, sub_version, _RECORD_KINDS[layout], type_id, self.dc_id, len(file_reference))
+        return _RECORDS[layout].pack(*header, *_RECORD_ENCODERS[layout](self)) + file_reference
+    # end def
+
+    @classmethod
+    def from_record(cls, record: Union[bytes, bytearray, memoryview]) -> Union['PhotoFileId', 'DocumentFileId']:
+        """
+        Decodes a record of `to_record`.
+        The object has no `file_id` string, `to_file_id` calculates it when needed.
+
+        :param record: The record, and nothing else.
+        :except ValueError: Unknown record format or layout, or the record is truncated or followed by more data.
+        :return: The decoded object.
+        """
+        file_id, end = cls._from_record_from(record, 0)
+        if end != len(record):
+            raise ValueError(f'Found {len(record) - end} bytes after the record.')
         # end if
+        return file_id
+    # end def
 
-        type_id = self.type_id
-        if self.file_reference:
-            type_id |= self.TYPE_ID_FILE_REFERENCE_FLAG
+    @staticmethod
+    def _from_record_from(data: Union[bytes, bytearray, memoryview], offset: int) -> Tuple[Union['PhotoFileId', 'DocumentFileId'], int]:
+        """
+        Decodes the `to_record` record starting at `offset` of `data`.
+
+        :except ValueError: Unknown record format or layout, or the record is truncated.
+        :return: The decoded object, and the offset after the record.
+        """
+        if len(data) < offset + 4:
+            raise ValueError('Truncated record.')
         # end if
-        if self.has_web_location:
-            type_id |= self.TYPE_ID_WEB_LOCATION_FLAG
+        record_format, version, sub_version, kind = data[offset:offset + 4]
+        if record_format != FileId.RECORD_FORMAT:
+            raise ValueError(f'Unknown record format: {record_format}')
         # end if
+        if kind == _RECORD_DOCUMENT:
+            layout = (layout_version_of(version, sub_version), 'document', None)
+        else:
+            layout = (layout_version_of(version, sub_version), 'photo', kind)
+        # end if
+        decode = _RECORD_DECODERS.get(layout)
+        if decode is None:
+            raise ValueError(f'Unknown record layout: {layout}')
+        # end if
+        return decode(data, offset)
+    # end def
 
-        file_id = b''
-        file_id += struct.pack('<LL', type_id, self.dc_id)
-        if self.file_reference:
-            file_id += pack_tl_string(self.file_reference)
+    def _target_version(self, version: Union[int, None], sub_version: Union[int, None]) -> Tuple[int, int]:
+        """
+        The version and sub_version to encode with, defaulting to our own ones.
+        Versions before 4 have no sub_version, so that is always 0 for them.
+        """
+        if not version:
+            version = self.version
+        # end if
+        if version < 4:
+            return version, 0
         # end if
-        if self.has_web_location:
-            assert isinstance(self, WebLocationFileId)
-            file_id += pack_tl_string(self.url)
-            file_id += struct.pack('<iq', self.access_hash)
-            return base64url_encode(rle_encode(file_id))
+        if not sub_version:
+            sub_version = self.sub_version
         # end if
+        return version, sub_version
+    # end def
 
-        file_id += struct.pack('<qq', self.id, self.access_hash)
+    def _pack(self, version: int, sub_version: int) -> Union[bytes, bytearray]:
+        """
+        Packs the binary data of the file_id (before rle and base64url).
+        Without a file_reference that's a single precompiled struct for the whole thing,
+        otherwise the size is calculated first, and everything is written in place into a new bytearray of that size.
+        That isn't a reused buffer, as `rle_encode` would need a copy of the used part of it anyway.
 
-        if self.type_id <= self.TYPE_PHOTO:
-            assert isinstance(self, PhotoFileId)
-            file_id += struct.pack('<q', self.photosize.volume_id)  # Long
-            if self.version >= 4:
-                file_id += struct.pack('<L', self.photosize.type_id)  # V
-            # end if
-            if self.photosize.type_id == self.PHOTOSIZE_SOURCE_LEGACY:
-                assert isinstance(self.photosize, PhotoFileId.PhotosizeSourceLegacy)
-                file_id += struct.pack('<q', self.photosize.volume_id)  # Long
-            elif self.photosize.type_id == self.PHOTOSIZE_SOURCE_THUMBNAIL:
-                assert isinstance(self.photosize, PhotoFileId.PhotosizeSourceThumbnail)
-                file_id += struct.pack('<L', self.photosize.file_type)
-                file_id += pack_null_terminated_string(self.photosize.thumbnail_type)
-            elif self.photosize.type_id in (self.PHOTOSIZE_SOURCE_DIALOGPHOTO_BIG, self.PHOTOSIZE_SOURCE_DIALOGPHOTO_SMALL):
-                assert isinstance(self.photosize, (PhotoFileId.PhotosizeSourceDialogPhotoBig, PhotoFileId.PhotosizeSourceDialogPhotoSmall))
-                assert isinstance(self.photosize, PhotoFileId.PhotosizeSourceDialogPhoto)
-                file_id += struct.pack('<q', self.photosize.dialog_id)
-                file_id += struct.pack('<q', self.photosize.dialog_access_hash)
-            elif self.photosize.type_id == self.PHOTOSIZE_SOURCE_STICKERSET_THUMBNAIL:
-                assert isinstance(self.photosize, PhotoFileId.PhotosizeSourceStickersetThumbnail)
-                file_id += struct.pack('<q', self.photosize.sticker_set_id)
-                file_id += struct.pack('<q', self.photosize.sticker_set_access_hash)
-            # end if
-            file_id += struct.pack('<l', self.photosize.location_local_id)
+        :except ValueError: Our fields can't be represented in that version.
+        """
+        layout = self._layout_key(layout_version_of(version, sub_version))
+        fields = _ENCODERS[layout](self)
+        suffix = (sub_version, version) if version >= 4 else (version,)
+        file_reference = self.file_reference
+        if not file_reference:
+            return _PAYLOADS[layout].pack(self.type_id, self.dc_id, *fields, *suffix)
         # end if
-        if version >= 4:
-            file_id += chr(sub_version).encode()
+        if isinstance(file_reference, str):
+            file_reference = file_reference.encode()
+        # end if
+        tail = _PAYLOAD_TAILS[layout]
+        buffer = bytearray(_HEADER.size + tl_string_size(len(file_reference)) + tail.size)
+        _HEADER.pack_into(buffer, 0, self.type_id | self.TYPE_ID_FILE_REFERENCE_FLAG, self.dc_id)
+        offset = pack_tl_string_into(buffer, _HEADER.size, file_reference)
+        tail.pack_into(buffer, offset, *fields, *suffix)
+        return buffer
+    # end def
+
+    def _layout_key(self, layout_version: int) -> Tuple[int, str, Union[int, None]]:
+        """
+        :param layout_version: See `tg_file_id.layouts.VERSIONS`.
+        :except ValueError: Our fields can't be represented in that layout version.
+        :return: The key of the layout (see `tg_file_id.layouts.LAYOUTS`) of the fields following the header and file reference.
+        """
+        layout = (layout_version, 'document', None)
+        if layout not in _LAYOUTS:
+            raise ValueError(f'Documents can not be encoded in layout version {layout_version}.')
         # end if
-        file_id += chr(version).encode()
-        return base64url_encode(rle_encode(file_id))
+        return layout
     # end def
 
     def __repr__(self) -> str:
@@ -324,12 +667,8 @@ class FileId(object):
     TYPE_SIZE = 17
     TYPE_NONE = 18
 
-    SUPPORTED_VERSIONS: Tuple[Tuple[int, int], ...] = (
-        (2, 0),
-        (4, 22),
-        (4, 27),
-        (4, 30),
-    )
+    SUPPORTED_VERSIONS: Tuple[Tuple[int, int], ...] = tuple(sorted(VERSIONS))
+    """ See `tg_file_id.layouts.VERSIONS` """
     MAX_VERSION = SUPPORTED_VERSIONS[-1]
 
     @classmethod
@@ -342,25 +681,47 @@ class FileId(object):
     # end def
 
     @classmethod
-    def _parse_version(cls, decoded: bytearray) -> Tuple[bytearray, int, int]:
-        data, version = decoded[:-1], decoded[-1]
-        if version == 4:
-            data, sub_version = data[:-1], data[-1]
-        else:
-            sub_version = 0
+    def _parse_version(cls, decoded: Union[bytes, bytearray], policy: Union[DecodePolicy, None] = None) -> Tuple[int, int, int]:
+        """
+        Reads the version suffix at the end of the decoded file_id, reporting unsupported versions to the policy.
+
+        :param policy: Default is the default policy.
+        :return: version, sub_version, and the length of the data before the version suffix.
+        """
+        version, sub_version, end = cls._split_version(decoded)
+        if (version, sub_version) not in VERSIONS:
+            (policy or get_default_policy()).unsupported_version(version, sub_version)
         # end if
+        return version, sub_version, end
+    # end def
 
-        if (version, sub_version) not in FileId.SUPPORTED_VERSIONS:
-            from warnings import warn
-            warn(f'Potentially unsupported file_id (sub_)version: {version, sub_version}')
+    @staticmethod
+    def _split_version(decoded: Union[bytes, bytearray]) -> Tuple[int, int, int]:
+        """
+        Reads the version suffix at the end of the decoded file_id.
+
+        :except ValueError: There is no data, or only the version without the sub_version.
+        :return: version, sub_version, and the length of the data before the version suffix.
+        """
+        if not decoded:
+            raise ValueError('Empty file_id.')
+        # end if
+        version = decoded[-1]
+        if version == 4:
+            if len(decoded) < 2:
+                raise ValueError('Truncated file_id: no sub_version.')
+            # end if
+            return version, decoded[-2], len(decoded) - 2
         # end if
-        return data, version, sub_version
+        return version, 0, len(decoded) - 1
     # end def
 # end class FileId
 
 
 # noinspection PyShadowingBuiltins
 class DocumentFileId(FileId):
+    __slots__ = ()
+
     def __init__(
             self,
             file_id: Union[str, None],
@@ -444,13 +805,15 @@ class DocumentFileId(FileId):
     # end def
 
     @classmethod
-    def from_file_id(cls: Type[CLASS], file_id, decoded: Union[None, bytes] = None) -> Union[FileId, CLASS]:
+    def from_file_id(cls: Type[CLASS], file_id, decoded: Union[None, bytes] = None, *, lazy: bool = False, policy: Union[DecodePolicy, None] = None) -> Union[FileId, CLASS]:
         """
         :param file_id:
         :param decoded:
+        :param lazy: See `FileId.from_file_id`.
+        :param policy: See `FileId.from_file_id`.
         :return:
         """
-        return FileId.from_file_id(file_id=file_id, decoded=decoded)
+        return FileId.from_file_id(file_id=file_id, decoded=decoded, lazy=lazy, policy=policy)
     # end def
 
     def __repr__(self) -> str:
@@ -463,6 +826,8 @@ class DocumentFileId(FileId):
 
 
 class WebLocationFileId(object):  # TODO make proper (FileId) subclass:
+    __slots__ = ('file_id', 'type_id', 'has_reference', 'has_web_location', 'file_reference', 'url', 'access_hash')
+
     def __init__(
         self,
         file_id, type_id, has_reference, has_web_location,
@@ -497,6 +862,8 @@ class WebLocationFileId(object):  # TODO make proper (FileId) subclass:
 
 class PhotoFileId(FileId):
     class PhotosizeSource(object):
+        __slots__ = ('volume_id', 'type_id', 'location_local_id')
+
         def __init__(self, type_id: int, volume_id: int, location_local_id: int):
             self.volume_id: int = volume_id
             self.type_id: int = type_id
@@ -513,6 +880,8 @@ class PhotoFileId(FileId):
     # end class PhotosizeSource
 
     class PhotosizeSourceLegacy(PhotosizeSource):
+        __slots__ = ('secret',)
+
         def __init__(self, volume_id: int, location_local_id: int, secret):
             self.secret = secret
             super().__init__(PhotoFileId.PHOTOSIZE_SOURCE_LEGACY, volume_id=volume_id, location_local_id=location_local_id)
@@ -524,6 +893,8 @@ class PhotoFileId(FileId):
     # end class PhotosizeSourceLegacy
 
     class PhotosizeSourceThumbnail(PhotosizeSource):
+        __slots__ = ('file_type', 'thumbnail_type')
+
         def __init__(self, volume_id: int, location_local_id: int, file_type, thumbnail_type):
             self.file_type = file_type
             self.thumbnail_type = thumbnail_type
@@ -541,6 +912,8 @@ class PhotoFileId(FileId):
     # end class PhotosizeSourceThumbnail
 
     class PhotosizeSourceDialogPhoto(PhotosizeSource):
+        __slots__ = ('dialog_id', 'dialog_access_hash')
+
         def __init__(self, type_id: int, volume_id: int, location_local_id: int, dialog_id, dialog_access_hash):
             self.dialog_id = dialog_id
             self.dialog_access_hash = dialog_access_hash  # stays 0 for non-super group chats
@@ -558,18 +931,24 @@ class PhotoFileId(FileId):
     # end class PhotosizeSourceDialogPhoto
 
     class PhotosizeSourceDialogPhotoSmall(PhotosizeSourceDialogPhoto):
+        __slots__ = ()
+
         def __init__(self, volume_id: int, location_local_id: int, dialog_id, dialog_access_hash):
             super().__init__(PhotoFileId.PHOTOSIZE_SOURCE_DIALOGPHOTO_SMALL, volume_id, location_local_id, dialog_id, dialog_access_hash)
         # end def __init__
     # end class PhotosizeSourceDialogPhotoSmall
 
     class PhotosizeSourceDialogPhotoBig(PhotosizeSourceDialogPhoto):
+        __slots__ = ()
+
         def __init__(self, volume_id: int, location_local_id: int, dialog_id, dialog_access_hash):
             super().__init__(PhotoFileId.PHOTOSIZE_SOURCE_DIALOGPHOTO_BIG, volume_id, location_local_id, dialog_id, dialog_access_hash)
         # end def __init__
     # end class PhotosizeSourceDialogPhotoBig
 
     class PhotosizeSourceStickersetThumbnail(PhotosizeSource):
+        __slots__ = ('sticker_set_id', 'sticker_set_access_hash')
+
         def __init__(self, volume_id: int, location_local_id: int, sticker_set_id, sticker_set_access_hash):
             self.sticker_set_id = sticker_set_id
             self.sticker_set_access_hash = sticker_set_access_hash
@@ -587,6 +966,8 @@ class PhotoFileId(FileId):
 
     # end class PhotosizeSourceStickersetThumbnail
 
+    __slots__ = ('photosize',)
+
     def __init__(
         self,
         file_id: Union[str, None],
@@ -635,7 +1016,9 @@ class PhotoFileId(FileId):
             dc_id=dc_id, id=id, access_hash=access_hash,
             version=version, sub_version=sub_version,
         )
-        assert_type_or_raise(photosize, PhotoFileId.PhotosizeSource, parameter_name='photosize')
+        if not isinstance(photosize, PhotoFileId.PhotosizeSource):
+            raise TypeError(f'The parameter photosize should be of type {PhotoFileId.PhotosizeSource!r}, but is type {type(photosize)}: {photosize!r}')
+        # end if
         self.photosize = photosize
     # end def __init__
 
@@ -657,9 +1040,27 @@ class PhotoFileId(FileId):
     PHOTOSIZE_SOURCE_STICKERSET_THUMBNAIL: int = 4
     """ Used for document and photo thumbnails """
 
+    PHOTOSIZE_SOURCES: Dict[int, Type[PhotosizeSource]] = {
+        PHOTOSIZE_SOURCE_LEGACY: PhotosizeSourceLegacy,
+        PHOTOSIZE_SOURCE_THUMBNAIL: PhotosizeSourceThumbnail,
+        PHOTOSIZE_SOURCE_DIALOGPHOTO_SMALL: PhotosizeSourceDialogPhotoSmall,
+        PHOTOSIZE_SOURCE_DIALOGPHOTO_BIG: PhotosizeSourceDialogPhotoBig,
+        PHOTOSIZE_SOURCE_STICKERSET_THUMBNAIL: PhotosizeSourceStickersetThumbnail,
+    }
+    """ The `PhotosizeSource` class of each photosize source """
+
     @classmethod
-    def from_file_id(cls: Type[CLASS], file_id, decoded: Union[None, bytes] = None) -> Union[FileId, CLASS]:
-        return FileId.from_file_id(file_id=file_id, decoded=decoded)
+    def from_file_id(cls: Type[CLASS], file_id, decoded: Union[None, bytes] = None, *, lazy: bool = False, policy: Union[DecodePolicy, None] = None) -> Union[FileId, CLASS]:
+        return FileId.from_file_id(file_id=file_id, decoded=decoded, lazy=lazy, policy=policy)
+    # end def
+
+    def _layout_key(self, layout_version: int) -> Tuple[int, str, Union[int, None]]:
+        photosize_source = self.photosize.type_id
+        layout = (layout_version, 'photo', photosize_source)
+        if layout not in _LAYOUTS:
+            raise ValueError(f'Photosize source {photosize_source} can not be encoded in version {layout_version}.')
+        # end if
+        return layout
     # end def
 
     def __repr__(self) -> str:
@@ -671,3 +1072,321 @@ class PhotoFileId(FileId):
                f")"
     # end def __str__
 # end class PhotoFileId
+
+
+class _LazyFileId(object):
+    """
+    The part shared by the `from_file_id(..., lazy=True)` results.
+
+    Only the header fields are set on creation, the others are left as unset slots.
+    Reading one of those ends up in `__getattr__`, which decodes the remaining data and fills them all in,
+    so from then on they are plain slot lookups again.
+    Setting one of them decodes the remaining data first as well, so the new value isn't overwritten later.
+    """
+    __slots__ = ()
+
+    _LAZY_FIELDS = frozenset(('file_reference', 'id', 'access_hash', 'version', 'sub_version', 'photosize'))
+
+    def __getattr__(self, name: str):
+        # only called if the normal lookup failed, i.e. for slots not set (yet).
+        if name in _LazyFileId._LAZY_FIELDS and self._decode_pending:
+            self._decode_remaining()
+            return object.__getattribute__(self, name)
+        # end if
+        raise AttributeError(f'{self.__class__.__name__!r} object has no attribute {name!r}')
+    # end def
+
+    def __setattr__(self, name: str, value):
+        if name in _LazyFileId._LAZY_FIELDS and getattr(self, '_decode_pending', False):
+            self._decode_remaining()
+        # end if
+        object.__setattr__(self, name, value)
+    # end def
+
+    def __getstate__(self) -> dict:
+        # pickle and copy get the state complete, with nothing left to decode.
+        if self._decode_pending:
+            self._decode_remaining()
+        # end if
+        state = {}
+        for klass in self.__class__.__mro__:
+            for name in klass.__dict__.get('__slots__', ()):
+                try:
+                    state[name] = object.__getattribute__(self, name)
+                except AttributeError:  # not set
+                    pass
+                # end try
+            # end for
+        # end for
+        return state
+    # end def
+
+    def __setstate__(self, state: dict):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+        # end for
+    # end def
+
+    def _decode_remaining(self):
+        """ Decodes and sets the fields not in the header. """
+        decoded = rle_decode(base64url_decode(self.file_id))
+        policy = self._policy
+        version, sub_version, end = FileId._parse_version(decoded, policy)
+        decoded_file_id = FileId._from_decoded(self.file_id, decoded, version, sub_version, end, policy)
+        set_field = object.__setattr__
+        for name in _LazyFileId._LAZY_FIELDS:
+            if name != 'photosize' or isinstance(decoded_file_id, PhotoFileId):
+                set_field(self, name, getattr(decoded_file_id, name))
+            # end if
+        # end for
+        set_field(self, '_decode_pending', False)
+        set_field(self, '_policy', None)
+    # end def
+# end class _LazyFileId
+
+
+class LazyDocumentFileId(_LazyFileId, DocumentFileId):
+    """ A `DocumentFileId` as returned by `from_file_id(..., lazy=True)`. """
+    __slots__ = ('_decode_pending', '_policy')
+# end class LazyDocumentFileId
+
+
+class LazyPhotoFileId(_LazyFileId, PhotoFileId):
+    """ A `PhotoFileId` as returned by `from_file_id(..., lazy=True)`. """
+    __slots__ = ('_decode_pending', '_policy')
+# end class LazyPhotoFileId
+
+
+_HEADER = struct.Struct('<LL')  # type_id, dc_id
+_UINT32 = struct.Struct('<L')
+_LONG = struct.Struct('<q')
+_ENCODED_HEADERS: Dict[bytes, Tuple[int, bool, bool, int]] = {
+    bytes(rle_encode(_HEADER.pack(type_id | flags, dc_id))): FileId._normalize_type_id(type_id | flags) + (dc_id,)
+    for type_id in range(FileId.TYPE_NONE + 1)
+    for flags in (0, FileId.TYPE_ID_FILE_REFERENCE_FLAG, FileId.TYPE_ID_WEB_LOCATION_FLAG, FileId.TYPE_ID_FILE_REFERENCE_FLAG | FileId.TYPE_ID_WEB_LOCATION_FLAG)
+    for dc_id in range(1, 6)
+}
+"""
+RLE encoded headers of all the types, flags, and the production DCs, for `FileId.peek`.
+Zeros following those in the file_id would be part of the last zero run, so a found header is always complete.
+"""
+_ENCODED_HEADER_LENGTHS = sorted({len(encoded) for encoded in _ENCODED_HEADERS})
+_LAYOUTS: Dict[Tuple[int, str, Union[int, None]], struct.Struct] = {
+    key: struct.Struct('<' + ''.join(fmt for _, fmt in fields))
+    for key, fields in LAYOUTS.items()
+}
+""" Precompiled `tg_file_id.layouts.LAYOUTS`, keyed by (layout version, type family, photosize source). """
+
+
+def _photosize_source_offsets() -> Dict[int, int]:
+    """ Where the photosize source is in the photo layouts, relative to the end of the file reference, per layout version having one. """
+    offsets = {}
+    for (layout_version, family, _), fields in LAYOUTS.items():
+        names = [name for name, _ in fields]
+        if family != 'photo' or 'photosize_source' not in names:
+            continue
+        # end if
+        offset = struct.calcsize('<' + ''.join(fmt for _, fmt in fields[:names.index('photosize_source')]))
+        if offsets.setdefault(layout_version, offset) != offset:
+            raise ValueError(f'The photosize source has to be at the same offset in all photo layouts of version {layout_version}.')
+        # end if
+    # end for
+    return offsets
+# end def
+
+
+def _record_fields(layout: Tuple[int, str, Union[int, None]]) -> Tuple[Tuple[str, str], ...]:
+    """ The fields of a layout stored in the records, all but the photosize source, which is in the record header. """
+    return tuple((name, fmt) for name, fmt in LAYOUTS[layout] if name != 'photosize_source')
+# end def
+
+
+def _leftover(policy: Union[DecodePolicy, None], count: int):
+    (policy or get_default_policy()).leftover(count)
+# end def
+
+
+def _constructor_source(layout: Tuple[int, str, Union[int, None]], fields: Tuple[Tuple[str, str], ...]) -> Tuple[str, Dict[str, object]]:
+    """
+    The source of the constructor call for the generated decode functions of a layout,
+    with the values of the given fields (and `file_id`, `type_id`, ...) in local variables of the same name.
+
+    :return: The source, and the names it needs in the namespace of the function.
+    """
+    _, family, photosize_source = layout
+    values = {name: name for name, _ in fields}
+    for name, fmt in fields:
+        if fmt.endswith('s'):
+            values[name] = f"{name}.split(b'\\x00', 1)[0]"  # null padded
+        # end if
+    # end for
+    if family == 'photo':
+        cls = PhotoFileId
+        photosize = ', '.join(f'{name}={values[name]}' for name in photosize_field_names(fields))
+        photosize = f'photosize=Photosize({photosize}),'
+    else:
+        cls = DocumentFileId
+        photosize = ''
+    # end if
+    source = f"""Class(
+        file_id=file_id, type_id=type_id, has_reference=has_reference, has_web_location=False,
+        type_detailed=TYPES[type_id], file_reference=file_reference,
+        dc_id=dc_id, id=id, access_hash=access_hash,
+        {photosize}
+        version=version, sub_version=sub_version,
+    )"""
+    return source, {'Class': cls, 'TYPES': cls.TYPES, 'Photosize': PhotoFileId.PHOTOSIZE_SOURCES.get(photosize_source)}
+# end def
+
+
+def _type_check_source(layout: Tuple[int, str, Union[int, None]]) -> str:
+    """
+    The source of the generated decoders' check of the type_id, followed by the indentation of the next line.
+    Photo layouts are only used for photo types, so only the document ones need it.
+    """
+    if layout[1] == 'photo':
+        return ''
+    # end if
+    return "if type_id not in TYPES:\n        raise ValueError(f'Type is invalid: {type_id}')\n    "
+# end def
+
+
+def _make_decoder(layout: Tuple[int, str, Union[int, None]]) -> Callable[..., Union[PhotoFileId, DocumentFileId]]:
+    """
+    Generates the straight-line decode function of a layout:
+    a single unpack of all the fields, and a single constructor call with them as keyword arguments.
+    """
+    fields = LAYOUTS[layout]
+    size = _LAYOUTS[layout].size
+    constructor, namespace = _constructor_source(layout, fields)
+    check_type = _type_check_source(layout)
+    source = f"""
+def decode(file_id, data, offset, end, type_id, has_reference, file_reference, dc_id, version, sub_version, policy=None):
+    if end < offset + {size}:
+        raise ValueError(f'Truncated file_id: {{offset + {size} - end}} bytes missing.')
+    {check_type}{', '.join('_' if name == 'photosize_source' else name for name, _ in fields)} = unpack_from(data, offset)
+    if end > offset + {size}:
+        leftover(policy, end - offset - {size})
+    return {constructor}
+"""
+    namespace.update(unpack_from=_LAYOUTS[layout].unpack_from, leftover=_leftover)
+    exec(compile(source, f'<tg_file_id decoder {layout}>', 'exec'), namespace)
+    return namespace['decode']
+# end def
+
+
+def _make_record_decoder(layout: Tuple[int, str, Union[int, None]]) -> Callable[[Union[bytes, bytearray, memoryview], int], Tuple[Union[PhotoFileId, DocumentFileId], int]]:
+    """
+    Generates the straight-line decode function of the records (see `FileId.to_record`) of a layout:
+    a single unpack of all the fixed width fields, a slice for the file_reference, and a single constructor call.
+    """
+    fields = _record_fields(layout)
+    size = _RECORDS[layout].size
+    constructor, namespace = _constructor_source(layout, fields)
+    check_type = _type_check_source(layout)
+    source = f"""
+def decode(data, offset):
+    if len(data) < offset + {size}:
+        raise ValueError('Truncated record.')
+    _, version, sub_version, _, type_id, dc_id, reference_length, {', '.join(name for name, _ in fields)} = unpack_from(data, offset)
+    end = offset + {size} + reference_length
+    file_id = None
+    type_id, has_reference, has_web_location = normalize_type_id(type_id)
+    if has_web_location:
+        raise ValueError('Records can not hold web locations.')
+    if has_reference:
+        file_reference = bytes(data[offset + {size}:end])
+        if len(file_reference) != reference_length:
+            raise ValueError('Truncated record.')
+    else:
+        file_reference = None
+    {check_type}return {constructor}, end
+"""
+    namespace.update(unpack_from=_RECORDS[layout].unpack_from, normalize_type_id=FileId._normalize_type_id)
+    exec(compile(source, f'<tg_file_id record decoder {layout}>', 'exec'), namespace)
+    return namespace['decode']
+# end def
+
+
+def _make_encoder(layout: Tuple[int, str, Union[int, None]], fields: Union[Tuple[Tuple[str, str], ...], None] = None) -> Callable[[FileId], tuple]:
+    """
+    Generates the function getting the values of a layout's fields from an object, in order, ready to be packed.
+    `s` fields given as `str` are encoded as utf-8.
+
+    :param fields: The fields to get, default all of the layout.
+    """
+    if fields is None:
+        fields = LAYOUTS[layout]
+    # end if
+    if layout[1] == 'photo':
+        photosize_fields = set(photosize_field_names(fields))
+        paths = [
+            'photosize.type_id' if name == 'photosize_source' else f'photosize.{name}' if name in photosize_fields else name
+            for name, _ in fields
+        ]
+    else:
+        paths = [name for name, _ in fields]
+    # end if
+    get_values = attrgetter(*paths)
+    text_indices = [index for index, (_, fmt) in enumerate(fields) if fmt.endswith('s')]
+    if not text_indices:
+        return get_values
+    # end if
+
+    def get_encoded_values(file_id: FileId) -> tuple:
+        values = get_values(file_id)
+        if any(isinstance(values[index], str) for index in text_indices):
+            values = list(values)
+            for index in text_indices:
+                if isinstance(values[index], str):
+                    values[index] = values[index].encode('utf-8')
+                # end if
+            # end for
+        # end if
+        return values  # null padded by the layout
+    # end def
+    return get_encoded_values
+# end def
+
+
+_PHOTOSIZE_SOURCE_OFFSETS: Dict[int, int] = _photosize_source_offsets()
+""" Where the photosize source is in the photo layouts, per layout version having one """
+_DECODERS: Dict[Tuple[int, str, Union[int, None]], Callable[..., Union[PhotoFileId, DocumentFileId]]] = {
+    layout: _make_decoder(layout) for layout in LAYOUTS
+}
+""" The generated decode function of each layout, see `_make_decoder` """
+_ENCODERS: Dict[Tuple[int, str, Union[int, None]], Callable[[FileId], tuple]] = {
+    layout: _make_encoder(layout) for layout in LAYOUTS
+}
+""" The generated functions getting the field values of each layout for encoding, see `_make_encoder` """
+_PAYLOAD_TAILS: Dict[Tuple[int, str, Union[int, None]], struct.Struct] = {
+    key: struct.Struct(layout.format + ('BB' if key[0] >= 4 else 'B'))  # + sub_version, version
+    for key, layout in _LAYOUTS.items()
+}
+""" The `_LAYOUTS` followed by the version suffix, for encoding. """
+_PAYLOADS: Dict[Tuple[int, str, Union[int, None]], struct.Struct] = {
+    key: struct.Struct(_HEADER.format + tail.format[1:])
+    for key, tail in _PAYLOAD_TAILS.items()
+}
+""" The complete payload of file_ids without a file_reference: the header, `_LAYOUTS` and the version suffix, for encoding. """
+_RECORD_DOCUMENT = 0xFF
+""" The photosize source byte of the records of documents. """
+_RECORD_HEADER_FORMAT = '<BBBBLLH'  # record format, version, sub_version, photosize source, type_id, dc_id, file_reference length
+_RECORDS: Dict[Tuple[int, str, Union[int, None]], struct.Struct] = {
+    key: struct.Struct(_RECORD_HEADER_FORMAT + ''.join(fmt for _, fmt in _record_fields(key)))
+    for key in LAYOUTS
+}
+""" The fixed width part of the records (see `FileId.to_record`) of each layout. """
+_RECORD_KINDS: Dict[Tuple[int, str, Union[int, None]], int] = {
+    key: _RECORD_DOCUMENT if key[1] == 'document' else key[2]
+    for key in LAYOUTS
+}
+""" The photosize source byte of the records of each layout. """
+_RECORD_DECODERS: Dict[Tuple[int, str, Union[int, None]], Callable[[Union[bytes, bytearray, memoryview], int], Tuple[Union[PhotoFileId, DocumentFileId], int]]] = {
+    layout: _make_record_decoder(layout) for layout in LAYOUTS
+}
+""" The generated decode function of the records of each layout, see `_make_record_decoder` """
+_RECORD_ENCODERS: Dict[Tuple[int, str, Union[int, None]], Callable[[FileId], tuple]] = {
+    layout: _make_encoder(layout, _record_fields(layout)) for layout in LAYOUTS
+}
+""" The generated functions getting the field values of the records of each layout, see `_make_encoder` """
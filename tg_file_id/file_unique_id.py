@@ -1,19 +1,23 @@
 from .file_id import (
-    FileId, WebLocationFileId, PhotoFileId,
+    FileId, WebLocationFileId, PhotoFileId, DocumentFileId, _LAYOUTS, _UINT32,
+)
+from .layouts import LAYOUTS
+from .policy import DecodePolicy, get_default_policy
+from .utils import (
+    base64url_decode, base64url_encode, rle_decode, rle_encode, pack_tl_string, unpack_tl_string_from,
+    skip_tl_string_from,
 )
-from .utils import base64url_decode, base64url_encode, rle_decode, rle_encode, pack_tl_string, unpack_tl_string
 
 import struct
 import logging
-from io import BytesIO, SEEK_END
-from typing import Union, Type, TypeVar
-
-from luckydonaldUtils.exceptions import assert_type_or_raise
+from typing import Dict, Union, Type, TypeVar, Iterable, List, Tuple
 
 logger = logging.getLogger(__name__)
 CLASS = TypeVar('CLASS')
 
 class FileUniqueId(object):
+    __slots__ = ('unique_id', 'type_id', 'type_detailed', 'url', 'volume_id', 'local_id', 'id')
+
     # type: def __init__(self, type_id: int, id: int, unique_id: Union[str, None]): pass
     # type: def __init__(self, type_id: int, volume_id: int, local_id: int, unique_id: Union[str, None]): pass
     # type: def __init__(self, type_id: int, url: str, unique_id: Union[str, None]): pass
@@ -54,7 +58,7 @@ class FileUniqueId(object):
     # end def
 
     @classmethod
-    def from_unique_id(cls, unique_id, *, decoded=None, version_002_fix=False):
+    def from_unique_id(cls, unique_id, *, decoded=None, version_002_fix=False, policy: Union[DecodePolicy, None] = None):
         """
 
         :param unique_id:
@@ -62,21 +66,79 @@ class FileUniqueId(object):
         :param version_002_fix: tg_file_id v0.0.2 and below had a bug in `rle_encode`, where the last \0s would not be encoded.
                                 We try to fix that here, by appending \0s until it has the correct length.
                                 Only done for media_id ones, not possible for volume_id + local_id.
+        :param policy: What to do about leftover data, see `DecodePolicy`.
         :except ValueError: Unknown type id.
         :return:
         """
         if not decoded:
             decoded = rle_decode(base64url_decode(unique_id))
         # end if
-        logger.debug(f'parsing unique_id {unique_id!r}')
+        if logger.isEnabledFor(logging.DEBUG):  # skips formatting the message for every id
+            logger.debug(f'parsing unique_id {unique_id!r}')
+        # end if
+        return cls._from_decoded(unique_id, decoded, version_002_fix, policy)
+    # end def
+
+    @classmethod
+    def decode_many(cls, unique_ids: Iterable[str], *, version_002_fix=False, on_error: str = 'raise', policy: Union[DecodePolicy, None] = None) -> List[Union['FileUniqueId', None, Tuple[Union['FileUniqueId', None], Union[Exception, None]]]]:
+        """
+        Decodes a whole batch of file_unique_ids at once, in order.
+        Same result as calling `FileUniqueId.from_unique_id` for each of them.
+
+        :param unique_ids: The file_unique_ids to decode.
+        :param version_002_fix: See `FileUniqueId.from_unique_id`.
+        :param on_error: What to do with a file_unique_id failing to decode.
+                         `'raise'` raises the error, aborting the batch (default),
+                         `'none'` puts a `None` in place of the result,
+                         `'pair'` makes every item a `(result, None)` or `(None, error)` tuple.
+        :param policy: What to do about leftover data, see `DecodePolicy`.
+        :return: The list of results.
+        """
+        if on_error not in ('raise', 'none', 'pair'):
+            raise ValueError(f'Unknown on_error mode: {on_error!r}')
+        # end if
+        with_pairs = on_error == 'pair'
+        raise_errors = on_error == 'raise'
+        results = []
+        append = results.append
+        b64decode = base64url_decode
+        decode_rle = rle_decode
+        from_decoded = cls._from_decoded
+        for unique_id in unique_ids:
+            try:
+                result = from_decoded(unique_id, decode_rle(b64decode(unique_id)), version_002_fix, policy)
+            except Exception as e:
+                if raise_errors:
+                    raise
+                # end if
+                append((None, e) if with_pairs else None)
+                continue
+            # end try
+            append((result, None) if with_pairs else result)
+        # end for
+        return results
+    # end def
 
+    @classmethod
+    def _from_decoded(cls, unique_id: Union[str, None], decoded: Union[bytes, bytearray], version_002_fix: bool, policy: Union[DecodePolicy, None] = None) -> 'FileUniqueId':
+        """
+        Parses the already decoded (rle + base64url) file_unique_id binary data.
+
+        :param unique_id: The original file_unique_id.
+        :param decoded: The decoded binary data.
+        :param version_002_fix: See `FileUniqueId.from_unique_id`.
+        :param policy: What to do about leftover data. Default is the default policy.
+        :except ValueError: Unknown type id, or the data is too short for its fields.
+        """
+        if len(decoded) < 4:
+            raise ValueError(f'Truncated file_unique_id: {len(decoded)} bytes.')
+        # end if
         type_id = struct.unpack('<i', decoded[:4])[0]
         if type_id not in cls.TYPES:
             raise ValueError(f"Type is invalid: {type_id}")
         # end if
         if type_id == cls.TYPE_WEB:
-            buffer = BytesIO(decoded[:4])
-            url = unpack_tl_string(buffer)
+            url, _ = unpack_tl_string_from(decoded, 4)
             file_id_obj = FileUniqueId(type_id=type_id, url=url, _unique_id=unique_id)
         elif len(decoded) == 16:  # 16 = 4 + 8 + 4 = file_id + volume_id + local_id
             volume_id = struct.unpack('<q', decoded[4:12])[0]  # read(8)
@@ -85,6 +147,9 @@ class FileUniqueId(object):
         else:
             decoded_len = len(decoded)  # should be 12 = 4 + 8 = file_id + media_id
             bin_media_id = decoded[4:12]  # read(8)
+            if decoded_len < 12 and not version_002_fix:
+                raise ValueError(f'Truncated file_unique_id: {decoded_len} bytes.')
+            # end if
             if version_002_fix:
                 for i in range(len(bin_media_id), 8):
                     # fill until we have 8 chars, add `\0`s as the broken rle_encode algorithm didn't store the last occurrence of `\0`s.
@@ -94,7 +159,7 @@ class FileUniqueId(object):
             media_id = struct.unpack('<q', bin_media_id)[0]  # read(8)
             file_id_obj = FileUniqueId(type_id=type_id, id=media_id, _unique_id=unique_id)
             if decoded_len > 12:
-                logger.warning(f'Found {decoded_len - 12!r} leftover data.')
+                (policy or get_default_policy()).leftover(decoded_len - 12)
             # end if
         # end if
         return file_id_obj
@@ -118,24 +183,164 @@ class FileUniqueId(object):
         elif self.type_id == self.TYPE_PHOTO:
             binary += struct.pack('<ql', self.volume_id, self.local_id)
         else:
-            binary += struct.pack('<Q', self.id)
+            binary += struct.pack('<q', self.id)
         # end if
 
         return base64url_encode(rle_encode(binary))
     # end def
 
+    def to_int(self) -> int:
+        """
+        The file_unique_id as a single, canonical int, e.g. for compact sets and dict keys.
+        128 bits: the type_id in the top 8 bits, for photos the `local_id` (as unsigned 32 bit) in bits 64 to 95,
+        and the `id`, or for photos the `volume_id`, (as unsigned 64 bit) in the lowest 64 bits.
+        So the upper and lower 64 bits are a pair of uint64s, see `tg_file_id.batch.unique_ids_to_uint64`.
+
+        Decode it again with `FileUniqueId.from_int`, or convert strings directly with `unique_id_to_int` and `int_to_unique_id`.
+
+        :except ValueError: Web locations, their url doesn't fit, photos without volume_id and local_id, or others without id.
+        :return: The int.
+        """
+        if self.type_id == self.TYPE_PHOTO:
+            if self.volume_id is None or self.local_id is None:
+                raise ValueError('Photo file_unique_id without volume_id and local_id.')
+            # end if
+            return self.type_id << 120 | (self.local_id & _UINT32_MASK) << 64 | self.volume_id & _UINT64_MASK
+        # end if
+        if self.type_id == self.TYPE_WEB:
+            raise ValueError('Web location file_unique_ids have no int form.')
+        # end if
+        if self.id is None:
+            raise ValueError('File_unique_id without id.')
+        # end if
+        return self.type_id << 120 | self.id & _UINT64_MASK
+    # end def
+
+    @classmethod
+    def from_int(cls, value: int) -> 'FileUniqueId':
+        """
+        Decodes the int of `to_int`.
+        The object has no `unique_id` string, `to_unique_id` calculates it.
+
+        :except ValueError: Not a valid int of `to_int`.
+        :return: The decoded object.
+        """
+        type_id, local_id, value_id = _split_int(value)
+        if type_id == FileUniqueId.TYPE_PHOTO:
+            return FileUniqueId(type_id=type_id, volume_id=_signed(value_id, 64), local_id=_signed(local_id, 32))
+        # end if
+        return FileUniqueId(type_id=type_id, id=_signed(value_id, 64))
+    # end def
+
+    RECORD_FORMAT = 0x81
+    """
+    The first byte of every `to_record` record, the version of that format.
+    Different from `FileId.RECORD_FORMAT`, so both kinds of records can be told apart.
+    """
+
+    def to_record(self) -> bytes:
+        """
+        The file_unique_id as compact binary record, for storing it without the RLE and base64 of `to_unique_id`.
+        The `RECORD_FORMAT` byte, the type_id byte, and then, all little endian,
+        `volume_id` and `local_id` for photos, the length of the `url` (2 bytes) and the `url` itself for web locations,
+        or the `id` for everything else.
+
+        Decode it again with `FileUniqueId.from_record`, or many from a file with `tg_file_id.records.read_records`.
+
+        :except ValueError: The url is too long.
+        :return: The record.
+        """
+        if self.type_id == self.TYPE_PHOTO:
+            return _PHOTO_RECORD.pack(FileUniqueId.RECORD_FORMAT, self.type_id, self.volume_id, self.local_id)
+        # end if
+        if self.type_id != self.TYPE_WEB:
+            return _ID_RECORD.pack(FileUniqueId.RECORD_FORMAT, self.type_id, self.id)
+        # end if
+        url = self.url.encode('utf-8') if isinstance(self.url, str) else self.url
+        if len(url) > 0xFFFF:
+            raise ValueError(f'The url is too long for a record: {len(url)} bytes')
+        # end if
+        return _WEB_RECORD.pack(FileUniqueId.RECORD_FORMAT, self.type_id, len(url)) + url
+    # end def
+
+    @classmethod
+    def from_record(cls, record: Union[bytes, bytearray, memoryview]) -> 'FileUniqueId':
+        """
+        Decodes a record of `to_record`.
+        The object has no `unique_id` string, `to_unique_id` calculates it.
+
+        :param record: The record, and nothing else.
+        :except ValueError: Unknown record format or type, or the record is truncated or followed by more data.
+        :return: The decoded object.
+        """
+        unique_id, end = cls._from_record_from(record, 0)
+        if end != len(record):
+            raise ValueError(f'Found {len(record) - end} bytes after the record.')
+        # end if
+        return unique_id
+    # end def
+
+    @staticmethod
+    def _from_record_from(data: Union[bytes, bytearray, memoryview], offset: int) -> Tuple['FileUniqueId', int]:
+        """
+        Decodes the `to_record` record starting at `offset` of `data`.
+
+        :except ValueError: Unknown record format or type, or the record is truncated.
+        :return: The decoded object, and the offset after the record.
+        """
+        if len(data) < offset + 2:
+            raise ValueError('Truncated record.')
+        # end if
+        record_format, type_id = data[offset:offset + 2]
+        if record_format != FileUniqueId.RECORD_FORMAT:
+            raise ValueError(f'Unknown record format: {record_format}')
+        # end if
+        if type_id not in FileUniqueId.TYPES:
+            raise ValueError(f"Type is invalid: {type_id}")
+        # end if
+        record = _PHOTO_RECORD if type_id == FileUniqueId.TYPE_PHOTO else _WEB_RECORD if type_id == FileUniqueId.TYPE_WEB else _ID_RECORD
+        end = offset + record.size
+        if len(data) < end:
+            raise ValueError('Truncated record.')
+        # end if
+        if record is _ID_RECORD:
+            return FileUniqueId(type_id=type_id, id=record.unpack_from(data, offset)[2]), end
+        elif record is _PHOTO_RECORD:
+            _, _, volume_id, local_id = record.unpack_from(data, offset)
+            return FileUniqueId(type_id=type_id, volume_id=volume_id, local_id=local_id), end
+        # end if
+        url_end = end + record.unpack_from(data, offset)[2]
+        if len(data) < url_end:
+            raise ValueError('Truncated record.')
+        # end if
+        return FileUniqueId(type_id=type_id, url=bytes(data[end:url_end])), url_end
+    # end def
+
     @classmethod
     def from_file_id(cls: Type[CLASS], file_id: Union[str, FileId, WebLocationFileId]) -> CLASS:
-        assert_type_or_raise(file_id, str, FileId, parameter_name="file_id")
+        if not isinstance(file_id, (str, FileId, WebLocationFileId)):
+            raise TypeError(f'The parameter file_id should be one of the types [{str!r}, {FileId!r}, {WebLocationFileId!r}], but is type {type(file_id)}: {file_id!r}')
+        # end if
         if isinstance(file_id, str):
             file_id = FileId.from_file_id(file_id)
         # end if
-        unique_type_id = cls.FULL_TO_UNIQUE_MAP[file_id.type_id]
+        if isinstance(file_id, WebLocationFileId):
+            unique_type_id = cls.TYPE_WEB  # any type, the url is what identifies it.
+        else:
+            unique_type_id = cls.FULL_TO_UNIQUE_MAP.get(file_id.type_id)
+        # end if
+        if unique_type_id is None:
+            raise ValueError(f"Type is invalid: {file_id.type_id}")
+        # end if
         if unique_type_id == cls.TYPE_WEB:
-            assert_type_or_raise(file_id, WebLocationFileId, parameter_name="file_id of type FileUniqueId.TYPE_WEB")
+            if not isinstance(file_id, WebLocationFileId):
+                raise TypeError(f'The parameter file_id of type FileUniqueId.TYPE_WEB should be of type {WebLocationFileId!r}, but is type {type(file_id)}: {file_id!r}')
+            # end if
             unique_id_obj = FileUniqueId(type_id=unique_type_id, url=file_id.url, _unique_id=None)
         elif unique_type_id == cls.TYPE_PHOTO:
-            assert_type_or_raise(file_id, PhotoFileId, parameter_name="file_id of type FileUniqueId.TYPE_PHOTO")
+            if not isinstance(file_id, PhotoFileId):
+                raise TypeError(f'The parameter file_id of type FileUniqueId.TYPE_PHOTO should be of type {PhotoFileId!r}, but is type {type(file_id)}: {file_id!r}')
+            # end if
             file_id: PhotoFileId
             unique_id_obj = FileUniqueId(
                 type_id=unique_type_id,
@@ -184,3 +389,140 @@ class FileUniqueId(object):
         FileId.TYPE_TEMP: TYPE_TEMP,
     }
 # end class FileId
+
+
+_INT32 = struct.Struct('<l')
+_UINT32_MASK = (1 << 32) - 1
+_UINT64_MASK = (1 << 64) - 1
+_ID_RECORD = struct.Struct('<BBq')  # record format, type_id, id
+_PHOTO_RECORD = struct.Struct('<BBql')  # record format, type_id, volume_id, local_id
+_WEB_RECORD = struct.Struct('<BBH')  # record format, type_id, url length
+
+
+def file_id_to_unique_id(file_id: str) -> str:
+    """
+    Calculates the file_unique_id of a file_id, directly from string to string.
+    Same as `FileUniqueId.from_file_id(file_id).to_unique_id()`,
+    but only reads the few fields the file_unique_id consists of, and builds no objects in between.
+
+    :param file_id: The file_id.
+    :except ValueError: Unknown type id or photosize source, or the file_id is too short for its fields.
+    :return: The file_unique_id.
+    """
+    decoded = rle_decode(base64url_decode(file_id))
+    version, sub_version, end = FileId._split_version(decoded)
+    if end < 8:
+        raise ValueError(f'Truncated file_id: {end} bytes before the version.')
+    # end if
+    type_id = _UINT32.unpack_from(decoded, 0)[0]
+    if type_id & FileId.TYPE_ID_WEB_LOCATION_FLAG:
+        # not worth an extra code path, those are rare.
+        return FileUniqueId.from_file_id(file_id).to_unique_id()
+    # end if
+    offset = 8  # type_id, dc_id
+    if type_id & FileId.TYPE_ID_FILE_REFERENCE_FLAG:
+        offset = skip_tl_string_from(decoded, offset, end)
+    # end if
+    type_id &= ~ (FileId.TYPE_ID_FILE_REFERENCE_FLAG | FileId.TYPE_ID_WEB_LOCATION_FLAG)
+    if type_id not in PhotoFileId.TYPES and type_id not in DocumentFileId.TYPES:
+        # same as FileId.from_file_id, even if FULL_TO_UNIQUE_MAP has a unique type for it.
+        raise ValueError(f"Type is invalid: {type_id}")
+    # end if
+    layout = FileId._decoded_layout_key(decoded, offset, type_id, version, sub_version)
+    size = _LAYOUTS[layout].size
+    if offset + size > end:
+        raise ValueError(f'Truncated file_id: {offset + size - end} bytes missing.')
+    # end if
+    binary = _INT32.pack(FileUniqueId.FULL_TO_UNIQUE_MAP[type_id])
+    for start, stop in _UNIQUE_FIELD_SLICES[layout]:
+        binary += decoded[offset + start:offset + stop]
+    # end for
+    return base64url_encode(rle_encode(binary))
+# end def
+
+
+def _unique_field_slices() -> Dict[Tuple[int, str, Union[int, None]], Tuple[Tuple[int, int], ...]]:
+    """
+    Where the fields a file_unique_id consists of are in each layout, relative to the end of the file reference:
+    the `id` of documents, and the `volume_id` and `location_local_id` of photos.
+    """
+    slices = {}
+    for layout, fields in LAYOUTS.items():
+        names = [name for name, _ in fields]
+        positions = []
+        for name in (('volume_id', 'location_local_id') if layout[1] == 'photo' else ('id',)):
+            index = names.index(name)
+            start = struct.calcsize('<' + ''.join(fmt for _, fmt in fields[:index]))
+            positions.append((start, start + struct.calcsize('<' + fields[index][1])))
+        # end for
+        slices[layout] = tuple(positions)
+    # end for
+    return slices
+# end def
+
+
+_UNIQUE_FIELD_SLICES: Dict[Tuple[int, str, Union[int, None]], Tuple[Tuple[int, int], ...]] = _unique_field_slices()
+""" See `_unique_field_slices`, keyed like `tg_file_id.layouts.LAYOUTS` """
+
+
+def _signed(value: int, bits: int) -> int:
+    """ The unsigned `value` as signed int of that many bits """
+    return value - (1 << bits) if value >> (bits - 1) else value
+# end def
+
+
+def _split_int(value: int) -> Tuple[int, int, int]:
+    """
+    Splits and checks an int of `FileUniqueId.to_int`.
+
+    :except ValueError: Not a valid one.
+    :return: type_id, local_id (unsigned), id or volume_id (unsigned)
+    """
+    if not 0 <= value < 1 << 128:
+        raise ValueError(f'Not a file_unique_id int: {value!r}')
+    # end if
+    type_id = value >> 120
+    local_id = (value >> 64) & _UINT32_MASK
+    if type_id not in FileUniqueId.TYPES or type_id == FileUniqueId.TYPE_WEB or (value >> 96) & ((1 << 24) - 1):
+        raise ValueError(f'Not a file_unique_id int: {value!r}')
+    # end if
+    if local_id and type_id != FileUniqueId.TYPE_PHOTO:
+        raise ValueError(f'Not a file_unique_id int: {value!r}')
+    # end if
+    return type_id, local_id, value & _UINT64_MASK
+# end def
+
+
+def unique_id_to_int(unique_id: str) -> int:
+    """
+    Calculates the int (see `FileUniqueId.to_int`) of a file_unique_id, directly from string to int.
+    Same as `FileUniqueId.from_unique_id(unique_id).to_int()`, but without building the object.
+
+    :param unique_id: The file_unique_id.
+    :except ValueError: Unknown type id, or a web location.
+    :return: The int.
+    """
+    decoded = rle_decode(base64url_decode(unique_id))
+    type_id = _INT32.unpack_from(decoded, 0)[0] if len(decoded) >= 4 else None
+    if type_id in FileUniqueId.TYPES and type_id != FileUniqueId.TYPE_WEB and len(decoded) == (16 if type_id == FileUniqueId.TYPE_PHOTO else 12):
+        # id, or volume_id and local_id, little endian, are the low bits already.
+        return type_id << 120 | int.from_bytes(decoded[4:], 'little')
+    # end if
+    # anything unusual, like leftover data, the way from_unique_id deals with it.
+    return FileUniqueId.from_unique_id(unique_id, decoded=decoded).to_int()
+# end def
+
+
+def int_to_unique_id(value: int) -> str:
+    """
+    Calculates the file_unique_id of an int of `FileUniqueId.to_int`, directly from int to string.
+    Same as `FileUniqueId.from_int(value).to_unique_id()`, but without building the object.
+
+    :param value: The int.
+    :except ValueError: Not a valid int of `FileUniqueId.to_int`.
+    :return: The file_unique_id.
+    """
+    type_id, local_id, value_id = _split_int(value)
+    payload = value_id | local_id << 64
+    return base64url_encode(rle_encode(_INT32.pack(type_id) + payload.to_bytes(12 if type_id == FileUniqueId.TYPE_PHOTO else 8, 'little')))
+# end def
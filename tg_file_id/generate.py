@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Made up, but valid file_ids and file_unique_ids, in any amount, for benchmarks and load tests.
+
+    generator = FileIdGenerator(seed=1, versions={(4, 30): 9, (2, 0): 1})
+    with open('corpus.txt', 'w') as f:
+        generator.write(f, 1000000)
+
+Or from the command line, see `python -m tg_file_id generate --help`.
+"""
+import random
+from itertools import accumulate, islice
+from typing import Dict, Iterator, List, Tuple, Union, TextIO, Sequence, TypeVar
+
+from tg_file_id.file_id import FileId, DocumentFileId, PhotoFileId
+from tg_file_id.file_unique_id import FileUniqueId
+
+__author__ = 'luckydonald'
+
+VALUE = TypeVar('VALUE')
+
+
+DEFAULT_TYPES: Dict[int, float] = {
+    FileId.TYPE_PHOTO: 30, FileId.TYPE_THUMBNAIL: 5, FileId.TYPE_PROFILE_PHOTO: 5,
+    FileId.TYPE_DOCUMENT: 15, FileId.TYPE_STICKER: 15, FileId.TYPE_VIDEO: 10, FileId.TYPE_VOICE: 5,
+    FileId.TYPE_AUDIO: 5, FileId.TYPE_ANIMATION: 5, FileId.TYPE_VIDEO_NOTE: 5,
+}
+""" type_id: weight """
+
+DEFAULT_FILE_REFERENCE_LENGTHS: Dict[int, float] = {0: 1, 29: 4}
+""" length: weight. 29 bytes is what the Bot API hands out. """
+
+
+class FileIdGenerator(object):
+    """
+    Generates `DocumentFileId`s and `PhotoFileId`s from a seeded random number generator,
+    so the same seed and mix always give the same ids (on the same python version).
+    The strings are calculated by the regular encoder, so they all decode again.
+
+    Each mix is a dict of value to weight, values not in there are not generated:
+
+    - `types`: the `FileId.TYPE_*` type_ids, documents as well as photos.
+    - `versions`: (version, sub_version)s, out of `FileId.SUPPORTED_VERSIONS`.
+    - `file_reference_lengths`: lengths of random `file_reference`s, 0 for none.
+      Version 2 file_ids never have a file_reference, so that is only used for version 4 ones.
+    - `photosize_sources`: the `PhotoFileId.PHOTOSIZE_SOURCE_*` of photos.
+      Version 2 file_ids only know the legacy one, so version 2 photos always use that.
+    """
+
+    def __init__(
+        self,
+        seed: Union[int, str, bytes, None] = 0,
+        *,
+        types: Union[Dict[int, float], None] = None,
+        versions: Union[Dict[Tuple[int, int], float], None] = None,
+        file_reference_lengths: Union[Dict[int, float], None] = None,
+        photosize_sources: Union[Dict[int, float], None] = None,
+    ):
+        """
+        :param seed: Seed of the random number generator.
+        :type  seed: int | str | bytes | None
+
+        :param types: Mix of type_ids. Defaults to `DEFAULT_TYPES`.
+        :type  types: dict
+
+        :param versions: Mix of (version, sub_version)s. Defaults to all supported ones, equally.
+        :type  versions: dict
+
+        :param file_reference_lengths: Mix of file_reference lengths. Defaults to `DEFAULT_FILE_REFERENCE_LENGTHS`.
+        :type  file_reference_lengths: dict
+
+        :param photosize_sources: Mix of photosize sources. Defaults to all of them, equally.
+        :type  photosize_sources: dict
+        """
+        if types is None:
+            types = DEFAULT_TYPES
+        # end if
+        if versions is None:
+            versions = dict.fromkeys(FileId.SUPPORTED_VERSIONS, 1)
+        # end if
+        if file_reference_lengths is None:
+            file_reference_lengths = DEFAULT_FILE_REFERENCE_LENGTHS
+        # end if
+        if photosize_sources is None:
+            photosize_sources = dict.fromkeys(PhotoFileId.PHOTOSIZE_SOURCES, 1)
+        # end if
+        for type_id in types:
+            if type_id not in DocumentFileId.TYPES and type_id not in PhotoFileId.TYPES:
+                raise ValueError(f'Unknown type_id: {type_id!r}')
+            # end if
+        # end for
+        for version in versions:
+            if version not in FileId.SUPPORTED_VERSIONS:
+                raise ValueError(f'Unsupported (version, sub_version): {version!r}')
+            # end if
+        # end for
+        for photosize_source in photosize_sources:
+            if photosize_source not in PhotoFileId.PHOTOSIZE_SOURCES:
+                raise ValueError(f'Unknown photosize source: {photosize_source!r}')
+            # end if
+        # end for
+        if any(length < 0 for length in file_reference_lengths):
+            raise ValueError('file_reference lengths can not be negative.')
+        # end if
+        self.random = random.Random(seed)
+        self._types = _Mix(types, 'types')
+        self._versions = _Mix(versions, 'versions')
+        self._file_reference_lengths = _Mix(file_reference_lengths, 'file_reference_lengths')
+        self._photosize_sources = _Mix(photosize_sources, 'photosize_sources')
+    # end def __init__
+
+    def file_id(self) -> Union[DocumentFileId, PhotoFileId]:
+        """ A new random file_id object, with `file_id` still unset. """
+        rng = self.random
+        type_id = self._types.pick(rng)
+        version, sub_version = self._versions.pick(rng)
+        file_reference = rng.randbytes(self._file_reference_lengths.pick(rng)) if version >= 4 else b''
+        common = dict(
+            file_id=None, type_id=type_id,
+            has_reference=bool(file_reference), file_reference=file_reference, has_web_location=False,
+            # ids are positive, file_unique_ids store them unsigned.
+            dc_id=rng.randint(1, 5), id=rng.getrandbits(63), access_hash=rng.getrandbits(64) - (1 << 63),
+            version=version, sub_version=sub_version,
+        )
+        if type_id not in PhotoFileId.TYPES:
+            return DocumentFileId(type_detailed=DocumentFileId.TYPES[type_id], **common)
+        # end if
+        photosize_source = self._photosize_sources.pick(rng) if version >= 4 else PhotoFileId.PHOTOSIZE_SOURCE_LEGACY
+        return PhotoFileId(type_detailed=PhotoFileId.TYPES[type_id], photosize=self._photosize(photosize_source), **common)
+    # end def
+
+    def _photosize(self, photosize_source: int) -> PhotoFileId.PhotosizeSource:
+        rng = self.random
+        volume_id, location_local_id = rng.getrandbits(64) - (1 << 63), rng.getrandbits(32) - (1 << 31)
+        if photosize_source == PhotoFileId.PHOTOSIZE_SOURCE_LEGACY:
+            return PhotoFileId.PhotosizeSourceLegacy(volume_id, location_local_id, secret=rng.getrandbits(64) - (1 << 63))
+        elif photosize_source == PhotoFileId.PHOTOSIZE_SOURCE_THUMBNAIL:
+            return PhotoFileId.PhotosizeSourceThumbnail(
+                volume_id, location_local_id, file_type=rng.choice((FileId.TYPE_PHOTO, FileId.TYPE_THUMBNAIL)),
+                thumbnail_type=rng.choice((b's', b'm', b'x', b'y', b'w')),
+            )
+        elif photosize_source == PhotoFileId.PHOTOSIZE_SOURCE_STICKERSET_THUMBNAIL:
+            return PhotoFileId.PhotosizeSourceStickersetThumbnail(
+                volume_id, location_local_id, sticker_set_id=rng.getrandbits(64) - (1 << 63), sticker_set_access_hash=rng.getrandbits(64) - (1 << 63),
+            )
+        # end if
+        return PhotoFileId.PHOTOSIZE_SOURCES[photosize_source](
+            volume_id, location_local_id, dialog_id=rng.getrandbits(64) - (1 << 63), dialog_access_hash=rng.getrandbits(64) - (1 << 63),
+        )
+    # end def
+
+    def file_ids(self, count: Union[int, None] = None) -> Iterator[Union[DocumentFileId, PhotoFileId]]:
+        """
+        :param count: How many to generate, or `None` to generate them endlessly.
+        :return: Iterator of new random file_id objects, with `file_id` still unset.
+        """
+        generated = 0
+        while count is None or generated < count:
+            yield self.file_id()
+            generated += 1
+        # end while
+    # end def
+
+    def unique_ids(self, count: Union[int, None] = None) -> Iterator[FileUniqueId]:
+        """
+        :param count: How many to generate, or `None` to generate them endlessly.
+        :return: Iterator of the `FileUniqueId`s of new random file_ids, so they follow the same mix.
+        """
+        for file_id in self.file_ids(count):
+            yield FileUniqueId.from_file_id(file_id)
+        # end for
+    # end def
+
+    def strings(self, count: Union[int, None] = None, *, unique: bool = False, chunk_size: int = 1000) -> Iterator[str]:
+        """
+        The encoded ids, as strings.
+        The file_ids are encoded with `FileId.encode_many`, `chunk_size` at a time.
+
+        :param count: How many to generate, or `None` to generate them endlessly.
+        :param unique: If it should be file_unique_ids instead of file_ids.
+        :param chunk_size: How many to encode at once.
+        """
+        if unique:
+            for unique_id in self.unique_ids(count):
+                yield unique_id.to_unique_id()
+            # end for
+            return
+        # end if
+        file_ids = self.file_ids(count)
+        while True:
+            chunk = list(islice(file_ids, chunk_size))
+            if not chunk:
+                return
+            # end if
+            yield from FileId.encode_many(chunk)
+        # end while
+    # end def
+
+    def write(self, file: TextIO, count: int, *, unique: bool = False) -> int:
+        """
+        Writes `count` encoded ids to a text file, one per line.
+
+        :param file: The opened file to write to.
+        :param count: How many to generate.
+        :param unique: If it should be file_unique_ids instead of file_ids.
+        :return: How many were written.
+        """
+        written = 0
+        for string in self.strings(count, unique=unique):
+            file.write(string + '\n')
+            written += 1
+        # end for
+        return written
+    # end def
+# end class FileIdGenerator
+
+
+class _Mix(object):
+    """ Weighted random choice out of fixed values, with the cumulative weights calculated once. """
+    __slots__ = ('values', 'cum_weights')
+
+    def __init__(self, weights: Dict[VALUE, float], name: str):
+        weights = {value: weight for value, weight in weights.items() if weight > 0}
+        if not weights:
+            raise ValueError(f'{name} needs at least one value with a positive weight.')
+        # end if
+        self.values: Sequence[VALUE] = tuple(weights)
+        self.cum_weights: List[float] = list(accumulate(weights.values()))
+    # end def __init__
+
+    def pick(self, rng: random.Random) -> VALUE:
+        if len(self.values) == 1:
+            return self.values[0]
+        # end if
+        return rng.choices(self.values, cum_weights=self.cum_weights)[0]
+    # end def
+# end class _Mix
+
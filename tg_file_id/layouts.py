@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+The binary layouts of file_ids, declared as data.
+
+`tg_file_id.file_id` generates its decode and encode functions from those, and `tg_file_id.batch` its numpy dtypes.
+A new tdlib sub_version with an already known layout only needs an entry in `VERSIONS`,
+a changed layout a new layout version in `LAYOUTS` as well.
+"""
+from typing import Dict, Tuple, Union
+
+__author__ = 'luckydonald'
+
+
+VERSIONS: Dict[Tuple[int, int], int] = {
+    # (version, sub_version): layout version
+    (2, 0): 2,
+    (4, 22): 4,
+    (4, 27): 4,
+    (4, 30): 4,
+}
+""" The supported (version, sub_version)s, and which layout version of `LAYOUTS` they use. """
+
+
+_PHOTO = (('id', 'q'), ('access_hash', 'q'), ('volume_id', 'q'))
+
+LAYOUTS: Dict[Tuple[int, str, Union[int, None]], Tuple[Tuple[str, str], ...]] = {
+    # (layout version, type family, photosize source): the fields following the header and file reference
+    (2, 'document', None): (('id', 'q'), ('access_hash', 'q')),
+    (4, 'document', None): (('id', 'q'), ('access_hash', 'q')),
+    (2, 'photo', 0): _PHOTO + (  # legacy
+        ('secret', 'q'), ('location_local_id', 'l'),
+    ),
+    (4, 'photo', 0): _PHOTO + (  # legacy
+        ('photosize_source', 'L'), ('secret', 'q'), ('location_local_id', 'l'),
+    ),
+    (4, 'photo', 1): _PHOTO + (  # thumbnail
+        ('photosize_source', 'L'), ('file_type', 'L'), ('thumbnail_type', '4s'), ('location_local_id', 'l'),
+    ),
+    (4, 'photo', 2): _PHOTO + (  # dialog photo small
+        ('photosize_source', 'L'), ('dialog_id', 'q'), ('dialog_access_hash', 'q'), ('location_local_id', 'l'),
+    ),
+    (4, 'photo', 3): _PHOTO + (  # dialog photo big
+        ('photosize_source', 'L'), ('dialog_id', 'q'), ('dialog_access_hash', 'q'), ('location_local_id', 'l'),
+    ),
+    (4, 'photo', 4): _PHOTO + (  # sticker set thumbnail
+        ('photosize_source', 'L'), ('sticker_set_id', 'q'), ('sticker_set_access_hash', 'q'), ('location_local_id', 'l'),
+    ),
+}
+"""
+The fields as (name, little endian `struct` format), keyed by (layout version, type family, photosize source).
+The names are the ones of the `FileId` attributes, or, for photos, of the `PhotoFileId.PhotosizeSource` attributes,
+with `photosize_source` being the constant of the key.
+`s` fields are null padded, the padding isn't part of the value.
+"""
+
+
+def layout_version_of(version: int, sub_version: int) -> int:
+    """
+    The layout version of a (version, sub_version).
+    Unknown ones use the layout of the newest known version not after them.
+    """
+    known = VERSIONS.get((version, sub_version))
+    if known is not None:
+        return known
+    # end if
+    return 4 if version >= 4 else 2
+# end def
+
+
+def photosize_field_names(fields: Tuple[Tuple[str, str], ...]) -> Tuple[str, ...]:
+    """
+    The names of a photo layout's fields belonging to the `PhotoFileId.PhotosizeSource`.
+
+    :param fields: A value of `LAYOUTS`.
+    """
+    return tuple(name for name, _ in fields if name not in ('id', 'access_hash', 'photosize_source'))
+# end def
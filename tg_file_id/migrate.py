@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Re-encodes stored file_ids to a single (version, sub_version), e.g. to normalize ids from several tdlib eras.
+
+    stats = MigrationStats()
+    for new_file_id in migrate(old_file_ids, stats=stats):
+        ...
+
+Or from the command line, see `python -m tg_file_id reencode --help`.
+"""
+import logging
+from collections import Counter
+from typing import Iterable, Iterator, Tuple, Union
+
+from tg_file_id.file_id import FileId, WebLocationFileId
+from tg_file_id.policy import DecodePolicy, get_default_policy
+from tg_file_id.utils import base64url_decode, base64url_encode, rle_decode, rle_encode
+
+__author__ = 'luckydonald'
+
+logger = logging.getLogger(__name__)
+
+
+class MigrationStats(object):
+    """
+    Counters of a `migrate` run, updated while the results are consumed.
+    """
+
+    def __init__(self):
+        self.sources: 'Counter[Tuple[int, int]]' = Counter()
+        """ how many file_ids there were per source (version, sub_version), of the ones not failing """
+        self.migrated = 0
+        """ re-encoded to the target version """
+        self.unchanged = 0
+        """ already in the target version, passed through as they are """
+        self.failed = 0
+        """ could not be decoded or re-encoded """
+    # end def __init__
+
+    @property
+    def total(self) -> int:
+        return self.migrated + self.unchanged + self.failed
+    # end def
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"total={self.total!r}, migrated={self.migrated!r}, unchanged={self.unchanged!r}, failed={self.failed!r}, "
+            f"sources={dict(sorted(self.sources.items()))!r}"
+            f")"
+        )
+    # end def __repr__
+# end class MigrationStats
+
+
+def migrate(
+    file_ids: Iterable[str],
+    *,
+    version: Union[int, None] = None, sub_version: Union[int, None] = None,
+    on_error: str = 'raise',
+    stats: Union[MigrationStats, None] = None,
+    policy: Union[DecodePolicy, None] = None,
+) -> Iterator[Union[str, None, Tuple[Union[str, None], Union[Exception, None]]]]:
+    """
+    Re-encodes the file_ids to the given version, one at a time, in order.
+    The target is checked right away, the file_ids are migrated lazily while the results are consumed,
+    so arbitrarily many file_ids can be streamed through it without keeping them in memory.
+    file_ids already in the target version are checked like a decode would, and passed through unchanged, without building objects.
+    Web location file_ids can only be passed through like that, they can't be re-encoded.
+
+    :param file_ids: The file_ids to migrate.
+    :param version: The target version. Default is the one of `FileId.MAX_VERSION`.
+    :param sub_version: The target sub_version. Default is the newest one of the target version in `FileId.SUPPORTED_VERSIONS`.
+    :param on_error: What to do with a file_id failing to migrate.
+                     `'raise'` raises the error, aborting the run (default),
+                     `'none'` yields a `None` in place of the result,
+                     `'keep'` yields the original file_id,
+                     `'pair'` yields a `(result, None)` or `(None, exception)` tuple for every file_id.
+    :param stats: Optional `MigrationStats` to count into.
+    :param policy: What to do about unsupported source versions and leftover data, see `DecodePolicy`.
+                   With a `'strict'` one, those are failures handled according to `on_error`.
+    :except ValueError: The target (version, sub_version) isn't one of `FileId.SUPPORTED_VERSIONS`.
+    :return: The migrated file_ids.
+    """
+    if on_error not in ('raise', 'none', 'keep', 'pair'):
+        raise ValueError(f'Unknown on_error mode: {on_error!r}')
+    # end if
+    if version is None:
+        version = FileId.MAX_VERSION[0]
+    # end if
+    if sub_version is None:
+        sub_version = max((sub for major, sub in FileId.SUPPORTED_VERSIONS if major == version), default=0)
+    # end if
+    target = (version, sub_version)
+    if target not in FileId.SUPPORTED_VERSIONS:
+        raise ValueError(f'Unsupported target file_id (sub_)version: {target}')
+    # end if
+    if stats is None:
+        stats = MigrationStats()
+    # end if
+    if policy is None:
+        policy = get_default_policy()
+    # end if
+    return _migrate(file_ids, target, on_error, stats, policy)
+# end def
+
+
+def _migrate(
+    file_ids: Iterable[str], target: Tuple[int, int], on_error: str, stats: MigrationStats, policy: DecodePolicy,
+) -> Iterator[Union[str, None, Tuple[Union[str, None], Union[Exception, None]]]]:
+    """ The generator doing the work of `migrate`, with the arguments already checked. """
+    version, sub_version = target
+    supported_versions = set(FileId.SUPPORTED_VERSIONS)
+    sources = stats.sources
+    with_pairs = on_error == 'pair'
+
+    from_decoded = FileId._from_decoded
+    split_version = FileId._split_version
+    unpack_fields = FileId._unpack_fields
+
+    for file_id in file_ids:
+        try:
+            decoded = rle_decode(base64url_decode(file_id))
+            source_version, source_sub_version, end = split_version(decoded)
+            source = (source_version, source_sub_version)
+            if source not in supported_versions:
+                policy.unsupported_version(*source)
+            # end if
+            if source == target:
+                # checks the header, type and size like a decode would, without building the object.
+                unpack_fields(decoded, source_version, source_sub_version, end, policy)
+                migrated = None
+            else:
+                decoded_file_id = from_decoded(file_id, decoded, source_version, source_sub_version, end, policy)
+                if isinstance(decoded_file_id, WebLocationFileId):
+                    raise ValueError(f'Web location file_ids can not be re-encoded: {file_id!r}')
+                # end if
+                migrated = base64url_encode(rle_encode(decoded_file_id._pack(version, sub_version)))
+            # end if
+        except Exception as e:
+            if on_error == 'raise':
+                raise
+            # end if
+            logger.debug(f'Failed to migrate {file_id!r}: {e!r}')
+            stats.failed += 1
+            if with_pairs:
+                yield None, e
+            else:
+                yield None if on_error == 'none' else file_id
+            # end if
+            continue
+        # end try
+        sources[source] += 1
+        if migrated is None:
+            stats.unchanged += 1
+            migrated = file_id
+        else:
+            stats.migrated += 1
+        # end if
+        yield (migrated, None) if with_pairs else migrated
+    # end for
+# end def
+
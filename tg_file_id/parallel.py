@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Decodes lots of file_ids on several cores, with a process pool, as decoding is pure python and holds the GIL.
+
+    with open('records.rec', 'wb') as f:
+        f.write(MAGIC)
+        for chunk in parallel_decode(file_ids, workers=8):
+            f.write(chunk)
+
+The file_ids are sent to the workers in chunks, each a single newline joined string,
+and the results come back per chunk as well: the concatenated `FileId.to_record` records (`output='records'`),
+or a `tg_file_id.batch.FileIdBatch` (`output='batch'`, needs numpy). No `FileId` objects are pickled either way.
+Chunks are yielded in the order of the input, and only a few of them are in flight at once,
+so any number of file_ids can be streamed through.
+"""
+import os
+from collections import Counter, deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import islice
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Tuple, Union
+
+from tg_file_id.file_id import FileId, WebLocationFileId
+from tg_file_id.policy import DecodePolicy, get_default_policy
+
+if TYPE_CHECKING:  # needs numpy, only imported by the workers when used
+    from tg_file_id.batch import FileIdBatch
+# end if
+
+__author__ = 'luckydonald'
+
+
+OUTPUTS = ('records', 'batch')
+""" What `parallel_decode` can yield per chunk """
+
+
+def _decode_chunk(chunk: str, output: str, strict: bool) -> Tuple[object, 'Counter[Tuple[int, int]]', int, int]:
+    """
+    Decodes one chunk of newline joined file_ids, in a worker.
+
+    :return: The records or batch, and the counters of the policy used (unsupported versions, leftover count and bytes).
+    """
+    policy = DecodePolicy(DecodePolicy.STRICT if strict else DecodePolicy.SILENT)
+    file_ids = chunk.split('\n')
+    if output == 'batch':
+        from tg_file_id.batch import FileIdBatch
+        result = FileIdBatch.from_file_ids(file_ids, policy=policy)
+    else:
+        records = []
+        for file_id in FileId.decode_many(file_ids, policy=policy):
+            if isinstance(file_id, WebLocationFileId):
+                raise ValueError(f'Web location file_ids can not be stored as record: {file_id.file_id!r}')
+            # end if
+            records.append(file_id.to_record())
+        # end for
+        result = b''.join(records)
+    # end if
+    return result, policy.unsupported_versions, policy.leftover_count, policy.leftover_bytes
+# end def
+
+
+def iter_chunks(file_ids: Iterable[str], chunksize: int) -> Iterator[str]:
+    """
+    The file_ids in newline joined chunks of `chunksize`, the form they are passed to the worker processes in,
+    as a single string pickles a lot faster than a list of them.
+    """
+    iterator = iter(file_ids)
+    while True:
+        chunk = list(islice(iterator, chunksize))
+        if not chunk:
+            return
+        # end if
+        yield '\n'.join(chunk)
+    # end while
+# end def
+
+
+def ordered_map(function: Callable, arguments: Iterable[tuple], *, workers: Union[int, None] = None, executor: Union[Executor, None] = None) -> Iterator:
+    """
+    Calls `function(*args)` for every `args` of `arguments` in worker processes, yielding the results in order.
+    At most twice `workers` calls are in flight at once, `arguments` is consumed only as far as needed for that.
+    This is what `parallel_decode` runs on, for other per chunk work, e.g. that of the command line tool.
+
+    :param function: The function, which has to be picklable, i.e. defined at the top level of a module.
+    :param arguments: The positional arguments of every call.
+    :param workers: How many processes to use. Default is the number of cores. `1` calls it in this process, without a pool.
+    :param executor: An already running executor to use instead of starting a `ProcessPoolExecutor`.
+    :return: The results. A failing call raises its error once the results reach it.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 and executor is None:
+        for args in arguments:
+            yield function(*args)
+        # end for
+        return
+    # end if
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    # end if
+    in_flight = deque()
+    try:
+        for args in arguments:
+            # two calls per worker, one running and one waiting, is enough to keep them all busy.
+            if len(in_flight) >= workers * 2:
+                yield in_flight.popleft().result()
+            # end if
+            in_flight.append(executor.submit(function, *args))
+        # end for
+        while in_flight:
+            yield in_flight.popleft().result()
+        # end while
+    finally:
+        for future in in_flight:
+            future.cancel()
+        # end for
+        if own_executor:
+            executor.shutdown(wait=True)
+        # end if
+    # end try
+# end def
+
+
+def parallel_decode(
+    file_ids: Iterable[str],
+    *,
+    workers: Union[int, None] = None,
+    chunksize: int = 10000,
+    output: str = 'records',
+    policy: Union[DecodePolicy, None] = None,
+    executor: Union[Executor, None] = None,
+) -> Iterator[Union[bytes, 'FileIdBatch']]:
+    """
+    Decodes the file_ids in worker processes, chunk by chunk, yielding the results in the input's order.
+
+    :param file_ids: The file_ids to decode, any iterable, it's consumed lazily. Web location file_ids are not supported.
+    :param workers: How many processes to use. Default is the number of cores. `1` decodes in this process, without a pool.
+    :param chunksize: How many file_ids to send to a worker at once. Bigger chunks mean less overhead per id.
+    :param output: `'records'` yields the records of every chunk as one `bytes`, read them with `tg_file_id.records.iter_records`.
+                   `'batch'` yields a `tg_file_id.batch.FileIdBatch` per chunk.
+    :param policy: What to do about unsupported versions and leftover data, see `DecodePolicy`.
+                   The workers count into their own, and those counters are added to this one as the chunks come back.
+                   A `'strict'` one fails the chunk, a `'warn-once'` one only counts, there are no warnings from the workers.
+    :param executor: An already running executor to use instead of starting a `ProcessPoolExecutor`.
+                     At most twice `workers` chunks are submitted to it at once.
+    :except ValueError: Unknown `output`, or a chunksize below 1.
+    :return: The records or batches, one per chunk. A file_id failing to decode (or a web location one) raises its `ValueError`
+             once the results reach its chunk.
+    """
+    if output not in OUTPUTS:
+        raise ValueError(f'Unknown output: {output!r}')
+    # end if
+    if chunksize < 1:
+        raise ValueError(f'chunksize must be positive: {chunksize!r}')
+    # end if
+    if policy is None:
+        policy = get_default_policy()
+    # end if
+    strict = policy.mode == DecodePolicy.STRICT
+
+    def collect(result) -> Union[bytes, 'FileIdBatch']:
+        decoded, unsupported_versions, leftover_count, leftover_bytes = result
+        policy.unsupported_versions.update(unsupported_versions)
+        policy.leftover_count += leftover_count
+        policy.leftover_bytes += leftover_bytes
+        return decoded
+    # end def
+
+    for result in ordered_map(_decode_chunk, ((chunk, output, strict) for chunk in iter_chunks(file_ids, chunksize)), workers=workers, executor=executor):
+        yield collect(result)
+    # end for
+# end def
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import logging
+from collections import Counter
+from typing import Tuple, Union
+
+__author__ = 'luckydonald'
+
+logger = logging.getLogger(__name__)
+
+
+class DecodePolicy(object):
+    """
+    What decoding does about file_ids it can read, but which aren't quite as expected:
+    potentially unsupported (version, sub_version)s, and leftover data after the known fields.
+    Those are counted in any case, the `mode` says what happens on top of that:
+
+    - `'strict'` raises a `ValueError`, so the file_id fails to decode.
+    - `'warn-once'` warns (`warnings.warn`) the first time a version is seen, and logs the first leftover data. This is the default.
+    - `'silent'` only counts.
+
+    Pass one as `policy=...` to the decode functions, or set it for all of them with `set_default_policy`.
+
+        policy = DecodePolicy('silent')
+        results = FileId.decode_many(file_ids, policy=policy)
+        print(policy.unsupported_versions, policy.leftover_count)
+    """
+    STRICT = 'strict'
+    WARN_ONCE = 'warn-once'
+    SILENT = 'silent'
+    MODES = (STRICT, WARN_ONCE, SILENT)
+
+    def __init__(self, mode: str = WARN_ONCE):
+        """
+        :param mode: `'strict'`, `'warn-once'` or `'silent'`, see above.
+        :type  mode: str
+        """
+        if mode not in self.MODES:
+            raise ValueError(f'Unknown decode policy mode: {mode!r}')
+        # end if
+        self.mode = mode
+        self.unsupported_versions: 'Counter[Tuple[int, int]]' = Counter()
+        """ how many file_ids there were per potentially unsupported (version, sub_version) """
+        self.leftover_count = 0
+        """ how many ids had leftover data """
+        self.leftover_bytes = 0
+        """ how much leftover data there was, summed up """
+        self._warned_versions = set()
+        self._logged_leftover = False
+    # end def __init__
+
+    def unsupported_version(self, version: int, sub_version: int):
+        """
+        Called by the decoders for every id with a version not in `FileId.SUPPORTED_VERSIONS`, and by the encoders for every id encoded to one.
+
+        :except ValueError: In `'strict'` mode.
+        """
+        key = (version, sub_version)
+        self.unsupported_versions[key] += 1
+        if self.mode == DecodePolicy.SILENT:
+            return
+        # end if
+        if self.mode == DecodePolicy.STRICT:
+            raise ValueError(f'Unsupported file_id (sub_)version: {key}')
+        # end if
+        if key not in self._warned_versions:
+            self._warned_versions.add(key)
+            from warnings import warn
+            warn(f'Potentially unsupported file_id (sub_)version: {key}')
+        # end if
+    # end def
+
+    def leftover(self, count: int):
+        """
+        Called by the decoders for every id with data left after the known fields.
+
+        :param count: How many bytes are left.
+        :except ValueError: In `'strict'` mode.
+        """
+        self.leftover_count += 1
+        self.leftover_bytes += count
+        if self.mode == DecodePolicy.SILENT:
+            return
+        # end if
+        if self.mode == DecodePolicy.STRICT:
+            raise ValueError(f'Found {count} leftover data.')
+        # end if
+        if not self._logged_leftover:
+            self._logged_leftover = True
+            logger.warning(f'Found {count} leftover data. Further leftover data is only counted.')
+        # end if
+    # end def
+
+    def reset(self):
+        """ Sets the counters back to zero, and warns again for everything. """
+        self.unsupported_versions.clear()
+        self.leftover_count = 0
+        self.leftover_bytes = 0
+        self._warned_versions.clear()
+        self._logged_leftover = False
+    # end def
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"mode={self.mode!r}, unsupported_versions={dict(sorted(self.unsupported_versions.items()))!r}, "
+            f"leftover_count={self.leftover_count!r}, leftover_bytes={self.leftover_bytes!r}"
+            f")"
+        )
+    # end def __repr__
+# end class DecodePolicy
+
+
+_default_policy = DecodePolicy()
+
+
+def get_default_policy() -> DecodePolicy:
+    """ The policy used when none is given to a decode function. """
+    return _default_policy
+# end def
+
+
+def set_default_policy(policy: Union[DecodePolicy, str]) -> DecodePolicy:
+    """
+    Sets the policy used when none is given to a decode function.
+
+    :param policy: The new policy, or just its mode for a fresh one.
+    :return: The previous default policy, e.g. to restore it later.
+    """
+    global _default_policy
+    if isinstance(policy, str):
+        policy = DecodePolicy(policy)
+    # end if
+    if not isinstance(policy, DecodePolicy):
+        raise TypeError(f'policy must be a DecodePolicy or a mode string, not {type(policy).__name__}')
+    # end if
+    previous, _default_policy = _default_policy, policy
+    return previous
+# end def
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Files of binary records (see `FileId.to_record` and `FileUniqueId.to_record`), for storing lots of ids compactly,
+and reading them back without any RLE or base64 decoding.
+
+A file starts with `MAGIC`, followed by the records back to back.
+Every record starts with its format byte, so file_ids and file_unique_ids can be mixed in one file.
+
+    with open('file_ids.rec', 'wb') as f:
+        write_records(f, FileId.decode_many(file_ids))
+    with open('file_ids.rec', 'rb') as f:
+        for file_id in read_records(f):
+            ...
+"""
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, Tuple, Union
+
+from tg_file_id.file_id import FileId, DocumentFileId, PhotoFileId, WebLocationFileId
+from tg_file_id.file_unique_id import FileUniqueId
+
+__author__ = 'luckydonald'
+
+
+MAGIC = b'TGFIDREC'
+""" The start of every record file """
+
+_MAX_RECORD_SIZE = 1 << 17
+""" More than any record can be long, their only variable length part has a 2 byte length. """
+
+_DECODERS: Dict[int, Callable[[Union[bytes, bytearray, memoryview], int], Tuple[Union[DocumentFileId, PhotoFileId, FileUniqueId], int]]] = {
+    FileId.RECORD_FORMAT: FileId._from_record_from,
+    FileUniqueId.RECORD_FORMAT: FileUniqueId._from_record_from,
+}
+""" The decode function of every record format, by its first byte """
+
+
+def decode_record_from(data: Union[bytes, bytearray, memoryview], offset: int = 0) -> Tuple[Union[DocumentFileId, PhotoFileId, FileUniqueId], int]:
+    """
+    Decodes the record starting at `offset` of `data`, whichever kind it is.
+
+    :except ValueError: Unknown record format, or the record is invalid or truncated.
+    :return: The decoded object, and the offset after the record.
+    """
+    if len(data) <= offset:
+        raise ValueError('Truncated record.')
+    # end if
+    decode = _DECODERS.get(data[offset])
+    if decode is None:
+        raise ValueError(f'Unknown record format: {data[offset]}')
+    # end if
+    return decode(data, offset)
+# end def
+
+
+def iter_records(data: Union[bytes, bytearray, memoryview], offset: int = 0) -> Iterator[Union[DocumentFileId, PhotoFileId, FileUniqueId]]:
+    """
+    Decodes the records back to back in `data`, starting at `offset`, until the end of it.
+    That's without the `MAGIC` of files, use `offset=len(MAGIC)` for the complete content of one.
+
+    :except ValueError: Unknown record format, or a record is invalid or truncated.
+    """
+    end = len(data)
+    decoders = _DECODERS
+    while offset < end:
+        decode = decoders.get(data[offset])
+        if decode is None:
+            raise ValueError(f'Unknown record format at offset {offset}: {data[offset]}')
+        # end if
+        record, offset = decode(data, offset)
+        yield record
+    # end while
+# end def
+
+
+def write_records(file: BinaryIO, objects: Iterable[Union[FileId, FileUniqueId]], *, magic: bool = True, buffer_size: int = 1 << 16) -> int:
+    """
+    Writes the records of file_id and file_unique_id objects to a binary file.
+
+    :param file: The file opened for writing in binary mode.
+    :param objects: The `FileId`s and `FileUniqueId`s to write, in any mix.
+    :param magic: If the `MAGIC` should be written first. Leave it out when appending to an existing record file.
+    :param buffer_size: About how many bytes to collect before writing them at once.
+    :except ValueError: An object can't be represented as record.
+    :return: How many records were written.
+    """
+    if magic:
+        file.write(MAGIC)
+    # end if
+    count = 0
+    size = 0
+    chunk = []
+    append = chunk.append
+    for obj in objects:
+        if isinstance(obj, WebLocationFileId):
+            raise ValueError(f'Web location file_ids can not be stored as record: {obj.file_id!r}')
+        # end if
+        record = obj.to_record()
+        append(record)
+        size += len(record)
+        count += 1
+        if size >= buffer_size:
+            file.write(b''.join(chunk))
+            chunk.clear()
+            size = 0
+        # end if
+    # end for
+    if chunk:
+        file.write(b''.join(chunk))
+    # end if
+    return count
+# end def
+
+
+def read_records(file: BinaryIO, *, chunk_size: int = 1 << 20) -> Iterator[Union[DocumentFileId, PhotoFileId, FileUniqueId]]:
+    """
+    Reads the records of a file written by `write_records`, streaming: only about `chunk_size` bytes are in memory at once.
+
+    :param file: The file opened for reading in binary mode, at its start.
+    :param chunk_size: How many bytes to read at once.
+    :except ValueError: Not a record file, unknown record format, or a record is invalid or truncated.
+    """
+    magic = file.read(len(MAGIC))
+    if magic != MAGIC:
+        raise ValueError(f'Not a record file, it starts with {magic!r}')
+    # end if
+    chunk_size = max(chunk_size, _MAX_RECORD_SIZE)
+    decoders = _DECODERS
+    data = b''
+    offset = 0
+    at_eof = False
+    while True:
+        if not at_eof and len(data) - offset < _MAX_RECORD_SIZE:
+            # keep at least one complete record ahead, so only the very end of the file can cut one off.
+            more = file.read(chunk_size)
+            at_eof = not more
+            data = data[offset:] + more
+            offset = 0
+            continue
+        # end if
+        if offset >= len(data):
+            return
+        # end if
+        decode = decoders.get(data[offset])
+        if decode is None:
+            raise ValueError(f'Unknown record format: {data[offset]}')
+        # end if
+        record, offset = decode(data, offset)
+        yield record
+    # end while
+# end def
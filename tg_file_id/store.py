@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+A `FileId` store on disk, keyed by file_unique_id, memory mapped so the operating system's page cache holds it,
+and not the python heap.
+
+    with FileIdStore('media') as store:  # media.data and media.index
+        store.put(file_id)
+        latest = store.get(file_unique_id)
+
+It consists of two files:
+
+- `.data`, append-only: a header (`_DATA_MAGIC`, the used length, the number of entries),
+  and the entries, each the `FileUniqueId.to_record` record followed by the `FileId.to_record` record.
+  Putting a file_id for a known file_unique_id again appends a new entry, the old one stays as garbage until `compact`.
+- `.index`, an open addressing hash table with linear probing: a header (`_INDEX_MAGIC`, the capacity, the number of keys),
+  and the slots, each the 64 bit blake2b hash of the packed `FileUniqueId`, and the offset of its latest entry in `.data`.
+  An offset of 0 marks an empty slot. It doubles in size when it's half full.
+
+Both files grow by doubling, so appending stays cheap. There's no locking, use a store from one thread and process only.
+"""
+import hashlib
+import mmap
+import os
+import struct
+from typing import Iterator, Tuple, Union
+
+from tg_file_id.file_id import FileId, DocumentFileId, PhotoFileId, WebLocationFileId
+from tg_file_id.file_unique_id import FileUniqueId
+
+__author__ = 'luckydonald'
+
+
+_DATA_MAGIC = b'TGFIDDAT'
+_DATA_HEADER = struct.Struct('<8sQQ')  # magic, used length, entries
+_INDEX_MAGIC = b'TGFIDIDX'
+_INDEX_HEADER = struct.Struct('<8sQQ')  # magic, capacity, keys
+_SLOT = struct.Struct('<QQ')  # key hash, entry offset
+_INITIAL_DATA_SIZE = 1 << 16
+_INITIAL_CAPACITY = 1 << 10
+
+
+def _key_hash(key: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'little')
+# end def
+
+
+class FileIdStore(object):
+    """
+    Append-only store of the latest `FileId` per file_unique_id, on disk and memory mapped. See the module for the format.
+    Lookups are O(1): one hash, usually a single probe of the index, and decoding one record.
+    """
+
+    def __init__(self, path: str):
+        """
+        Opens the store, creating its files if they don't exist.
+
+        :param path: The path of the files, without the `.data` and `.index` suffixes.
+        :type  path: str
+
+        :except ValueError: The files exist, but aren't a store.
+        """
+        self.path = path
+        self._load()
+    # end def __init__
+
+    def _load(self):
+        """ Opens and maps the files, and reads their headers. """
+        self._data_file, self._data = self._open(self.path + '.data', _DATA_HEADER, _DATA_MAGIC, _INITIAL_DATA_SIZE, (_DATA_HEADER.size, 0))
+        self._index_file, self._index = self._open(self.path + '.index', _INDEX_HEADER, _INDEX_MAGIC, _INDEX_HEADER.size + _INITIAL_CAPACITY * _SLOT.size, (_INITIAL_CAPACITY, 0))
+        _, self._data_end, self._entries = _DATA_HEADER.unpack_from(self._data, 0)
+        _, self._capacity, self._keys = _INDEX_HEADER.unpack_from(self._index, 0)
+    # end def
+
+    @staticmethod
+    def _open(filename: str, header: struct.Struct, magic: bytes, initial_size: int, initial_values: tuple) -> Tuple[object, mmap.mmap]:
+        """ Opens and maps one of the files, writing the header of a new one. """
+        exists = os.path.exists(filename) and os.path.getsize(filename) > 0
+        file = open(filename, 'r+b' if exists else 'w+b')
+        if not exists:
+            file.truncate(initial_size)
+            file.write(header.pack(magic, *initial_values))
+            file.flush()
+        # end if
+        mapped = mmap.mmap(file.fileno(), 0)
+        if mapped[:len(magic)] != magic:
+            mapped.close()
+            file.close()
+            raise ValueError(f'Not a file_id store file: {filename}')
+        # end if
+        return file, mapped
+    # end def
+
+    def __len__(self) -> int:
+        """ How many file_unique_ids are stored """
+        return self._keys
+    # end def
+
+    @property
+    def garbage(self) -> int:
+        """ How many entries were replaced by newer ones, which `compact` would remove """
+        return self._entries - self._keys
+    # end def
+
+    def put(self, file_id: Union[str, FileId]) -> FileUniqueId:
+        """
+        Stores the file_id as the latest one for its file_unique_id.
+
+        :param file_id: The file_id, as string or decoded.
+        :except ValueError: The file_id can't be stored as record.
+        :return: Its file_unique_id.
+        """
+        if isinstance(file_id, str):
+            file_id = FileId.from_file_id(file_id)
+        # end if
+        if isinstance(file_id, WebLocationFileId):
+            raise ValueError(f'Web location file_ids can not be stored as record: {file_id.file_id!r}')
+        # end if
+        unique_id = FileUniqueId.from_file_id(file_id)
+        key = unique_id.to_record()
+        self._append(key + file_id.to_record(), key)
+        return unique_id
+    # end def
+
+    def get(self, unique_id: Union[str, FileUniqueId], default=None) -> Union[DocumentFileId, PhotoFileId, None]:
+        """
+        The latest file_id stored for a file_unique_id.
+
+        :param unique_id: The file_unique_id, as string or decoded.
+        :param default: What to return if there is none.
+        :return: The file_id, without the `file_id` string set (`to_file_id` calculates it), or the default.
+        """
+        key = self._key(unique_id)
+        _, offset = self._find(_key_hash(key), key)
+        if not offset:
+            return default
+        # end if
+        return FileId._from_record_from(self._data, offset + len(key))[0]
+    # end def
+
+    def __contains__(self, unique_id: Union[str, FileUniqueId]) -> bool:
+        key = self._key(unique_id)
+        return bool(self._find(_key_hash(key), key)[1])
+    # end def
+
+    def __getitem__(self, unique_id: Union[str, FileUniqueId]) -> Union[DocumentFileId, PhotoFileId]:
+        file_id = self.get(unique_id)
+        if file_id is None:
+            raise KeyError(unique_id)
+        # end if
+        return file_id
+    # end def
+
+    def items(self) -> Iterator[Tuple[FileUniqueId, Union[DocumentFileId, PhotoFileId]]]:
+        """ All the file_unique_ids with their latest file_id, in no particular order. """
+        for offset in self._offsets():
+            unique_id, file_id_offset = FileUniqueId._from_record_from(self._data, offset)
+            yield unique_id, FileId._from_record_from(self._data, file_id_offset)[0]
+        # end for
+    # end def
+
+    def compact(self):
+        """
+        Rewrites the data file with only the latest entry of every file_unique_id, and rebuilds the index for it.
+        The new files replace the old ones only when complete.
+        """
+        compact_path = self.path + '.compact'
+        for suffix in ('.data', '.index'):  # left over by an interrupted compaction
+            if os.path.exists(compact_path + suffix):
+                os.remove(compact_path + suffix)
+            # end if
+        # end for
+        with FileIdStore(compact_path) as compacted:
+            compacted._resize_index(max(_INITIAL_CAPACITY, 1 << (self._keys * 2).bit_length()))
+            for offset in self._offsets():
+                _, file_id_offset = FileUniqueId._from_record_from(self._data, offset)
+                end = FileId._from_record_from(self._data, file_id_offset)[1]
+                compacted._append(self._data[offset:end], self._data[offset:file_id_offset])
+            # end for
+        # end with
+        self.close()
+        os.replace(compact_path + '.data', self.path + '.data')
+        os.replace(compact_path + '.index', self.path + '.index')
+        self._load()
+    # end def
+
+    def flush(self):
+        """ Writes the changes to disk now, instead of whenever the operating system does. """
+        self._data.flush()
+        self._index.flush()
+    # end def
+
+    def close(self):
+        """ Flushes and closes the files. """
+        if self._data.closed:
+            return
+        # end if
+        self.flush()
+        for mapped, file in ((self._data, self._data_file), (self._index, self._index_file)):
+            mapped.close()
+            file.close()
+        # end for
+    # end def
+
+    def __enter__(self) -> 'FileIdStore':
+        return self
+    # end def
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    # end def
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={self.path!r}, keys={self._keys!r}, garbage={self.garbage!r})"
+    # end def __repr__
+
+    @staticmethod
+    def _key(unique_id: Union[str, FileUniqueId]) -> bytes:
+        """ The packed `FileUniqueId` the index is keyed by """
+        if isinstance(unique_id, str):
+            unique_id = FileUniqueId.from_unique_id(unique_id)
+        # end if
+        return unique_id.to_record()
+    # end def
+
+    def _find(self, key_hash: int, key: bytes) -> Tuple[int, int]:
+        """
+        Probes the index for a key.
+
+        :return: The slot of the key and the offset of its entry, or the empty slot to put it in and 0.
+        """
+        index = self._index
+        data = self._data
+        mask = self._capacity - 1
+        slot = key_hash & mask
+        unpack_from = _SLOT.unpack_from
+        while True:
+            slot_hash, offset = unpack_from(index, _INDEX_HEADER.size + slot * _SLOT.size)
+            if not offset:
+                return slot, 0
+            # end if
+            # records carry their own length, so the key being a prefix of the entry means it is the key.
+            if slot_hash == key_hash and data[offset:offset + len(key)] == key:
+                return slot, offset
+            # end if
+            slot = (slot + 1) & mask
+        # end while
+    # end def
+
+    def _offsets(self) -> Iterator[int]:
+        """ The entry offsets of all the keys in the index """
+        for slot in range(self._capacity):
+            offset = _SLOT.unpack_from(self._index, _INDEX_HEADER.size + slot * _SLOT.size)[1]
+            if offset:
+                yield offset
+            # end if
+        # end for
+    # end def
+
+    def _append(self, entry: bytes, key: bytes):
+        """ Appends an entry to the data file, and points the index to it. """
+        offset = self._data_end
+        self._reserve_data(offset + len(entry))
+        self._data[offset:offset + len(entry)] = entry
+        self._data_end = offset + len(entry)
+        self._entries += 1
+        _DATA_HEADER.pack_into(self._data, 0, _DATA_MAGIC, self._data_end, self._entries)
+
+        key_hash = _key_hash(key)
+        slot, old_offset = self._find(key_hash, key)
+        _SLOT.pack_into(self._index, _INDEX_HEADER.size + slot * _SLOT.size, key_hash, offset)
+        if not old_offset:
+            self._keys += 1
+            if self._keys * 2 > self._capacity:
+                self._resize_index(self._capacity * 2)
+            # end if
+            _INDEX_HEADER.pack_into(self._index, 0, _INDEX_MAGIC, self._capacity, self._keys)
+        # end if
+    # end def
+
+    def _reserve_data(self, size: int):
+        """ Grows the data file (doubling it) until it has room for `size` bytes. """
+        if size <= len(self._data):
+            return
+        # end if
+        new_size = len(self._data)
+        while new_size < size:
+            new_size *= 2
+        # end while
+        self._data.close()
+        self._data_file.truncate(new_size)
+        self._data = mmap.mmap(self._data_file.fileno(), 0)
+    # end def
+
+    def _resize_index(self, capacity: int):
+        """ Rehashes the index into `capacity` slots, a power of two. The stored hashes are reused, no entry is read. """
+        slots = [
+            _SLOT.unpack_from(self._index, _INDEX_HEADER.size + slot * _SLOT.size)
+            for slot in range(self._capacity)
+        ]
+        self._index.close()
+        self._index_file.truncate(_INDEX_HEADER.size + capacity * _SLOT.size)
+        self._index = mmap.mmap(self._index_file.fileno(), 0)
+        self._index[_INDEX_HEADER.size:] = bytes(capacity * _SLOT.size)
+        mask = capacity - 1
+        for key_hash, offset in slots:
+            if not offset:
+                continue
+            # end if
+            slot = key_hash & mask
+            while _SLOT.unpack_from(self._index, _INDEX_HEADER.size + slot * _SLOT.size)[1]:
+                slot = (slot + 1) & mask
+            # end while
+            _SLOT.pack_into(self._index, _INDEX_HEADER.size + slot * _SLOT.size, key_hash, offset)
+        # end for
+        self._capacity = capacity
+        _INDEX_HEADER.pack_into(self._index, 0, _INDEX_MAGIC, self._capacity, self._keys)
+    # end def
+# end class FileIdStore
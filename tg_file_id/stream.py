@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reading newline delimited file_ids from files or stdin, plain or compressed, block by block with constant memory.
+
+    for file_id in iter_decode('file_ids.txt.xz'):
+        ...
+    for file_unique_id in iter_unique_ids('updates.jsonl.gz', key='file_id'):
+        ...
+
+Or just the lines:
+
+    with open_input('file_ids.txt.gz') as f:
+        for file_id in iter_lines(f):
+            ...
+"""
+import bz2
+import gzip
+import io
+import json
+import lzma
+import sys
+from contextlib import contextmanager
+from itertools import repeat
+from typing import BinaryIO, Iterator, List, Tuple, Union
+
+from tg_file_id.file_id import FileId, DocumentFileId, PhotoFileId, WebLocationFileId
+from tg_file_id.file_unique_id import file_id_to_unique_id
+from tg_file_id.policy import DecodePolicy
+
+__author__ = 'luckydonald'
+
+
+BLOCK_SIZE = 1 << 20
+""" How many bytes are read at once """
+
+MAX_LINE_LENGTH = 1 << 20
+""" The longest line read. A file_id is a few hundred bytes, a whole Bot API update some kB, so anything longer is garbage. """
+
+_COMPRESSIONS = (
+    (b'\x1f\x8b', gzip.open),
+    (b'BZh', bz2.open),
+    (b'\xfd7zXZ\x00', lzma.open),
+)
+""" The magic bytes each compressed format starts with, and how to open it for reading """
+
+
+@contextmanager
+def open_input(source: Union[str, BinaryIO]) -> Iterator[BinaryIO]:
+    """
+    Opens a file for reading in binary mode, decompressing it if it's gzip, bz2 or xz compressed.
+    The compression is detected from the content, not the file name, so it works for stdin too.
+    Closes what it opened when the `with` block ends, but not a passed in file.
+
+    :param source: A path, `'-'` for stdin, or a file opened in binary mode.
+    """
+    if isinstance(source, str):
+        file = sys.stdin.buffer if source == '-' else open(source, 'rb')
+        close = source != '-'
+    else:
+        file = source
+        close = False
+    # end if
+    try:
+        if not hasattr(file, 'peek'):
+            file = io.BufferedReader(file)
+        # end if
+        start = file.peek(6)
+        for magic, reader in _COMPRESSIONS:
+            if start.startswith(magic):
+                with reader(file) as decompressed:
+                    yield decompressed
+                # end with
+                return
+            # end if
+        # end for
+        yield file
+    finally:
+        if close:
+            file.close()
+        # end if
+    # end try
+# end def
+
+
+def iter_lines(file: BinaryIO, *, block_size: int = BLOCK_SIZE) -> Iterator[str]:
+    """
+    The non-empty lines of a binary file, stripped, read `block_size` bytes at a time.
+    Each block is decoded at once, not every line on its own.
+
+    :param file: The file, opened in binary mode, e.g. by `open_input`.
+    :param block_size: How many bytes to read at once.
+    :except UnicodeDecodeError: The file isn't UTF-8 text.
+    :except ValueError: A line is longer than `MAX_LINE_LENGTH`.
+    """
+    for text in _text_blocks(file, block_size):
+        for line in text.split('\n'):
+            line = line.strip()
+            if line:
+                yield line
+            # end if
+        # end for
+    # end for
+# end def
+
+
+def iter_file_ids(file: BinaryIO, *, key: Union[str, None] = None, block_size: int = BLOCK_SIZE) -> Iterator[str]:
+    """
+    The file_ids of a binary file, one per line. Either plain, or JSON lines with the file_id in the `key` field.
+
+    :param file: The file, opened in binary mode, e.g. by `open_input`.
+    :param key: For JSON lines, the field of each object holding the file_id. Lines without it, or with `null`, are skipped.
+                `None` for plain lines of file_ids.
+    :param block_size: How many bytes to read at once.
+    :except ValueError: A line isn't valid JSON, or not an object, or is longer than `MAX_LINE_LENGTH`.
+    """
+    for file_ids in _file_id_blocks(file, key, block_size):
+        yield from file_ids
+    # end for
+# end def
+
+
+def iter_decode(
+    source: Union[str, BinaryIO],
+    *,
+    key: Union[str, None] = None,
+    batch_size: int = 1000,
+    on_error: str = 'raise',
+    policy: Union[DecodePolicy, None] = None,
+    block_size: int = BLOCK_SIZE,
+) -> Iterator[Union[DocumentFileId, PhotoFileId, WebLocationFileId, None, Tuple[Union[FileId, WebLocationFileId, None], Union[Exception, None]]]]:
+    """
+    Decodes the file_ids of a file, one per line, plain or compressed (see `open_input`), yielding them in order.
+    They are read in blocks of `block_size` bytes and decoded `batch_size` at a time with `FileId.decode_many`,
+    so memory stays constant for any size of file.
+
+    :param source: A path, `'-'` for stdin, or a file opened in binary mode.
+    :param key: For JSON lines, the field holding the file_id, see `iter_file_ids`.
+    :param batch_size: How many file_ids to decode at once.
+    :param on_error: See `FileId.decode_many`. With `'none'` or `'pair'` every line still yields exactly one result.
+    :param policy: What to do about unsupported versions and leftover data, see `DecodePolicy`.
+    :param block_size: How many bytes to read at once.
+    """
+    decode_many = FileId.decode_many
+    with open_input(source) as file:
+        for batch in _batches(_file_id_blocks(file, key, block_size), batch_size):
+            yield from decode_many(batch, on_error=on_error, policy=policy)
+        # end for
+    # end with
+# end def
+
+
+def iter_unique_ids(
+    source: Union[str, BinaryIO],
+    *,
+    key: Union[str, None] = None,
+    batch_size: int = 1000,
+    on_error: str = 'raise',
+    block_size: int = BLOCK_SIZE,
+) -> Iterator[Union[str, None, Tuple[Union[str, None], Union[Exception, None]]]]:
+    """
+    Calculates the file_unique_ids of the file_ids of a file, like `iter_decode`,
+    but with `file_id_to_unique_id`, which builds no objects.
+
+    :param source: A path, `'-'` for stdin, or a file opened in binary mode.
+    :param key: For JSON lines, the field holding the file_id, see `iter_file_ids`.
+    :param batch_size: How many file_ids to convert at once.
+    :param on_error: `'raise'` (default), `'none'` or `'pair'`, like for `FileId.decode_many`.
+    :param block_size: How many bytes to read at once.
+    """
+    if on_error not in ('raise', 'none', 'pair'):
+        raise ValueError(f'Unknown on_error mode: {on_error!r}')
+    # end if
+    with_pairs = on_error == 'pair'
+    to_unique_id = file_id_to_unique_id
+    with open_input(source) as file:
+        for batch in _batches(_file_id_blocks(file, key, block_size), batch_size):
+            try:
+                unique_ids = [to_unique_id(file_id) for file_id in batch]
+            except Exception:
+                if on_error == 'raise':
+                    raise
+                # end if
+                unique_ids = None  # redo this batch one by one, to find which ones fail.
+            # end try
+            if unique_ids is not None:
+                yield from (zip(unique_ids, repeat(None)) if with_pairs else unique_ids)
+                continue
+            # end if
+            for file_id in batch:
+                try:
+                    unique_id = to_unique_id(file_id)
+                except Exception as e:
+                    yield (None, e) if with_pairs else None
+                    continue
+                # end try
+                yield (unique_id, None) if with_pairs else unique_id
+            # end for
+        # end for
+    # end with
+# end def
+
+
+def _text_blocks(file: BinaryIO, block_size: int) -> Iterator[str]:
+    """
+    The file read `block_size` bytes at a time, decoded, each ending at the end of a line (except for the last).
+
+    :except ValueError: A line is longer than `MAX_LINE_LENGTH`.
+    """
+    rest = []  # the start of a line continuing in the next block, in pieces, so they are joined only once.
+    rest_size = 0
+    while True:
+        block = file.read(block_size)
+        if not block:
+            break
+        # end if
+        end = block.rfind(b'\n')
+        if end == -1:
+            rest.append(block)
+            rest_size += len(block)
+            if rest_size > MAX_LINE_LENGTH:
+                raise ValueError(f'Line longer than {MAX_LINE_LENGTH} bytes: {b"".join(rest)[:100]!r}')
+            # end if
+            continue
+        # end if
+        if rest_size:
+            if rest_size + block.find(b'\n') > MAX_LINE_LENGTH:
+                raise ValueError(f'Line longer than {MAX_LINE_LENGTH} bytes: {b"".join(rest)[:100]!r}')
+            # end if
+            rest.append(block[:end])
+            yield b''.join(rest).decode('utf-8')
+        else:
+            yield block[:end].decode('utf-8')
+        # end if
+        rest = [block[end + 1:]]
+        rest_size = len(block) - end - 1
+    # end while
+    if rest_size:
+        yield b''.join(rest).decode('utf-8')
+    # end if
+# end def
+
+
+def _file_id_blocks(file: BinaryIO, key: Union[str, None], block_size: int) -> Iterator[List[str]]:
+    """ The file_ids of each `_text_blocks` block, see `iter_file_ids` """
+    loads = json.loads
+    for text in _text_blocks(file, block_size):
+        if key is None:
+            if ' ' in text or '\r' in text or '\t' in text:
+                yield [line for line in map(str.strip, text.split('\n')) if line]
+            else:  # the usual case, no stripping needed.
+                yield [line for line in text.split('\n') if line]
+            # end if
+            continue
+        # end if
+        file_ids = []
+        for line in text.split('\n'):
+            if not line or line.isspace():
+                continue
+            # end if
+            row = loads(line)
+            if not isinstance(row, dict):
+                raise ValueError(f'Not a JSON object: {line[:100]!r}')
+            # end if
+            file_id = row.get(key)
+            if file_id is not None:
+                file_ids.append(file_id)
+            # end if
+        # end for
+        yield file_ids
+    # end for
+# end def
+
+
+def _batches(blocks: Iterator[List[str]], size: int) -> Iterator[List[str]]:
+    """ The items of the blocks in lists of at most `size`, without joining across blocks """
+    for block in blocks:
+        if len(block) <= size:
+            if block:
+                yield block
+            # end if
+            continue
+        # end if
+        for start in range(0, len(block), size):
+            yield block[start:start + size]
+        # end for
+    # end for
+# end def
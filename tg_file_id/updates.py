@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Finds and decodes every file_id in raw Bot API `Update` JSON, and checks the file_unique_id sent along with it
+against the one calculated from the file_id. For auditing an archive of updates in bulk:
+
+    stats = AuditStats()
+    for found in extract(iter_updates('updates.jsonl.gz'), stats=stats):
+        if found.matches is False:
+            print(found.index, found.path, found.sent_unique_id, found.file_unique_id.unique_id)
+    print(stats)
+
+Or from the command line, writing the mismatches and failures as JSON lines:
+
+    python -m tg_file_id audit updates.jsonl.gz > problems.jsonl
+
+Every field ending in `file_id` holding a string is a file_id (`photo[].file_id`, `document.file_id`,
+`chat.photo.small_file_id`, ...), and the field of the same name ending in `file_unique_id` instead is the one sent with it.
+"""
+import json
+import logging
+from typing import Iterable, Iterator, List, Tuple, Union
+
+from tg_file_id.file_id import FileId, DocumentFileId, PhotoFileId, WebLocationFileId
+from tg_file_id.file_unique_id import FileUniqueId
+from tg_file_id.policy import DecodePolicy
+from tg_file_id.stream import BLOCK_SIZE, open_input, iter_lines
+
+__author__ = 'luckydonald'
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractedFileId(object):
+    """
+    A file_id found in an update, decoded.
+    """
+    __slots__ = ('index', 'path', 'raw', 'file_id', 'file_unique_id', 'sent_unique_id', 'error')
+
+    def __init__(
+        self,
+        index: int, path: str, raw: str,
+        file_id: Union[DocumentFileId, PhotoFileId, WebLocationFileId, None],
+        file_unique_id: Union[FileUniqueId, None],
+        sent_unique_id: Union[str, None],
+        error: Union[Exception, None],
+    ):
+        self.index = index
+        """ the position of the update in the input """
+        self.path = path
+        """ where in the update the file_id is, e.g. `$.message.photo[2].file_id` """
+        self.raw = raw
+        """ the file_id string """
+        self.file_id = file_id
+        """ the decoded file_id, `None` if it failed """
+        self.file_unique_id = file_unique_id
+        """ the file_unique_id calculated from it, with its `unique_id` string set, `None` if that failed """
+        self.sent_unique_id = sent_unique_id
+        """ the file_unique_id sent in the update, `None` if there was none """
+        self.error = error
+        """ why decoding or calculating the file_unique_id failed """
+    # end def __init__
+
+    @property
+    def matches(self) -> Union[bool, None]:
+        """ If the calculated file_unique_id is the sent one, `None` if there is nothing to compare """
+        if self.file_unique_id is None or self.sent_unique_id is None:
+            return None
+        # end if
+        return self.file_unique_id.unique_id == self.sent_unique_id
+    # end def
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"index={self.index!r}, path={self.path!r}, raw={self.raw!r}, "
+            f"sent_unique_id={self.sent_unique_id!r}, matches={self.matches!r}, error={self.error!r}"
+            f")"
+        )
+    # end def __repr__
+# end class ExtractedFileId
+
+
+class AuditStats(object):
+    """
+    Counters of an `extract` run, updated while the results are consumed.
+    """
+
+    def __init__(self):
+        self.updates = 0
+        """ how many updates were walked """
+        self.file_ids = 0
+        """ how many file_ids were found """
+        self.failed = 0
+        """ could not be decoded, or no file_unique_id could be calculated """
+        self.matched = 0
+        """ the calculated file_unique_id is the sent one """
+        self.mismatched = 0
+        """ the calculated file_unique_id is not the sent one """
+        self.unchecked = 0
+        """ decoded, but no file_unique_id was sent along to compare with """
+    # end def __init__
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"updates={self.updates!r}, file_ids={self.file_ids!r}, failed={self.failed!r}, "
+            f"matched={self.matched!r}, mismatched={self.mismatched!r}, unchecked={self.unchecked!r}"
+            f")"
+        )
+    # end def __repr__
+# end class AuditStats
+
+
+def iter_file_id_fields(update: Union[dict, list], path: str = '$') -> Iterator[Tuple[str, str, Union[str, None]]]:
+    """
+    Walks the JSON of an update, finding every field ending in `file_id` with a string in it.
+
+    :param update: The parsed JSON.
+    :param path: The path of `update` itself, the paths found start with it.
+    :return: The path of each file_id field, the file_id, and the file_unique_id sent with it (or `None`).
+    """
+    stack = [(path, update)]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        path, value = pop()
+        if isinstance(value, dict):
+            found = []
+            for key, item in value.items():
+                if isinstance(item, (dict, list)):
+                    found.append((f'{path}.{key}', item))
+                elif key.endswith('file_id') and isinstance(item, str):
+                    sent = value.get(key[:-len('file_id')] + 'file_unique_id')
+                    yield f'{path}.{key}', item, sent if isinstance(sent, str) else None
+                # end if
+            # end for
+            # reversed, so they are popped in document order.
+            stack.extend(reversed(found))
+        elif isinstance(value, list):
+            for position in range(len(value) - 1, -1, -1):
+                item = value[position]
+                if isinstance(item, (dict, list)):
+                    push((f'{path}[{position}]', item))
+                # end if
+            # end for
+        # end if
+    # end while
+# end def
+
+
+def extract(
+    updates: Iterable[Union[dict, str, bytes]],
+    *,
+    batch_size: int = 1000,
+    stats: Union[AuditStats, None] = None,
+    policy: Union[DecodePolicy, None] = None,
+) -> Iterator[ExtractedFileId]:
+    """
+    Finds every file_id in the updates, decodes them in batches, and calculates their file_unique_ids.
+    Failures don't abort the run, they are in the results' `error`.
+
+    :param updates: The updates, parsed or as JSON text. Any iterable, it's consumed lazily.
+    :param batch_size: About how many file_ids to decode at once.
+    :param stats: Optional `AuditStats` to count into.
+    :param policy: What to do about unsupported versions and leftover data, see `DecodePolicy`.
+                   With a `'strict'` one, those are failures.
+    :return: The file_ids found, in the order of the updates, and within those in document order.
+    """
+    if stats is None:
+        stats = AuditStats()
+    # end if
+    found: List[Tuple[int, str, str, Union[str, None]]] = []
+    for index, update in enumerate(updates):
+        if isinstance(update, (str, bytes)):
+            update = json.loads(update)
+        # end if
+        stats.updates += 1
+        for path, raw, sent in iter_file_id_fields(update):
+            found.append((index, path, raw, sent))
+        # end for
+        if len(found) >= batch_size:
+            yield from _decode_found(found, stats, policy)
+            found = []
+        # end if
+    # end for
+    yield from _decode_found(found, stats, policy)
+# end def
+
+
+def _decode_found(found: List[Tuple[int, str, str, Union[str, None]]], stats: AuditStats, policy: Union[DecodePolicy, None]) -> List[ExtractedFileId]:
+    """ Decodes the batch of file_ids `extract` collected """
+    results = []
+    decoded = FileId.decode_many([raw for _, _, raw, _ in found], on_error='pair', policy=policy)
+    for (index, path, raw, sent), (file_id, error) in zip(found, decoded):
+        unique_id = None
+        if error is None:
+            try:
+                unique_id = FileUniqueId.from_file_id(file_id)
+                unique_id.unique_id = unique_id.to_unique_id()  # keep it, for comparing and printing.
+            except Exception as e:
+                unique_id = None
+                error = e
+            # end try
+        # end if
+        result = ExtractedFileId(index, path, raw, file_id, unique_id, sent, error)
+        stats.file_ids += 1
+        if error is not None:
+            stats.failed += 1
+            logger.debug(f'Failed to decode {raw!r} at {path} of update {index}: {error!r}')
+        elif sent is None:
+            stats.unchecked += 1
+        elif result.matches:
+            stats.matched += 1
+        else:
+            stats.mismatched += 1
+        # end if
+        results.append(result)
+    # end for
+    return results
+# end def
+
+
+def iter_updates(source, *, block_size: int = BLOCK_SIZE) -> Iterator[dict]:
+    """
+    The updates of a file of JSON lines, one update per line, plain or compressed (see `tg_file_id.stream.open_input`).
+
+    :param source: A path, `'-'` for stdin, or a file opened in binary mode.
+    :param block_size: How many bytes to read at once.
+    :except ValueError: A line isn't valid JSON, or is longer than `tg_file_id.stream.MAX_LINE_LENGTH`.
+    """
+    with open_input(source) as file:
+        for line in iter_lines(file, block_size=block_size):
+            yield json.loads(line)
+        # end for
+    # end with
+# end def
+
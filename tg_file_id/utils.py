@@ -1,31 +1,75 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 import base64
+import binascii
 import struct
-from io import BytesIO, SEEK_CUR
-from typing import Union
-
-from luckydonaldUtils.encoding import to_unicode
-from luckydonaldUtils.logger import logging
+from io import BytesIO, SEEK_CUR, SEEK_END
+import logging
+from typing import BinaryIO, Union, Tuple, Iterable, List
 
 __author__ = 'luckydonald'
 
 logger = logging.getLogger(__name__)
 if __name__ == '__main__':
-    logging.add_colored_handler(level=logging.DEBUG)
+    # only for running this file directly, the library itself needs nothing outside the stdlib.
+    from luckydonaldUtils.logger import logging as colored_logging
+    colored_logging.add_colored_handler(level=logging.DEBUG)
 # end if
 
 
+_BASE64URL_TO_BASE64 = bytes.maketrans(b'-_', b'+/')
+
+
 def base64url_decode(string: str) -> bytes:
-    # add missing padding # http://stackoverflow.com/a/9807138
-    return base64.urlsafe_b64decode(string + '='*(4 - len(string)%4))
+    # Same as `base64.urlsafe_b64decode`, without the wrapper layers around `binascii`.
+    # Excess padding is ignored, so we can always add the maximum padding needed. # http://stackoverflow.com/a/9807138
+    return binascii.a2b_base64(string.encode('ascii').translate(_BASE64URL_TO_BASE64) + b'==')
 # end def
 
 
+_BASE64_TO_BASE64URL = bytes.maketrans(b'+/', b'-_')
+
+
 def base64url_encode(string: bytes) -> str:
-    return to_unicode(base64.urlsafe_b64encode(string)).rstrip("=")
+    # Same as `base64.urlsafe_b64encode`, without the wrapper layers around `binascii`, and without padding.
+    return binascii.b2a_base64(string, newline=False).translate(_BASE64_TO_BASE64URL).rstrip(b'=').decode('ascii')
 # end def
 
+_BASE64_GROUP_FILL = (b'', b'\x00\x00', b'\x00')  # by length % 3
+
+
+def base64url_encode_many(strings: Iterable[bytes]) -> List[str]:
+    """
+    Same as calling `base64url_encode` on each of the strings, but encodes them all in a single call.
+
+    Every string gets filled with \0s up to the next full 3 byte group, so they don't share any base64 characters.
+    As the missing bits of a last incomplete group are encoded as 0 bits anyway,
+    the characters for the string are the same, we just have to cut off the ones encoding the added \0s.
+    """
+    joined = bytearray()
+    lengths = []
+    for string in strings:
+        joined += string
+        joined += _BASE64_GROUP_FILL[len(string) % 3]
+        lengths.append(len(string))
+    # end for
+    encoded = binascii.b2a_base64(joined, newline=False).translate(_BASE64_TO_BASE64URL).decode('ascii')
+    results = []
+    position = 0
+    for length in lengths:
+        results.append(encoded[position:position + (length * 4 + 2) // 3])
+        position += (length + 2) // 3 * 4
+    # end for
+    return results
+# end def
+
+
+_ZERO_RUNS = [bytes(count) for count in range(256)]
+""" The decoded zero runs, by their run length """
+
+_ZERO_RUN_CODES = [b'\x00' + bytes((count,)) for count in range(256)]
+""" The encoded zero runs, by their run length """
+
 
 def rle_decode(binary: bytes) -> bytearray:
     """
@@ -37,48 +81,76 @@ def rle_decode(binary: bytes) -> bytearray:
     # https://github.com/LonamiWebs/Telethon/blob/c4cbead25b01663e73cc0cdcb35c26f1f053ae2d/telethon/utils.py#L1032-L1049
     # https://github.com/danog/MadelineProto/blob/38d6ee07b3a7785bcc77ed4ba3ef9ddd8e915975/pwrtelegram_debug_bot.php#L28-L42
     # https://github.com/danog/MadelineProto/blob/1485d3879296a997d47f54469b0dd518b9230b06/src/danog/MadelineProto/TL/Files.php#L66
-    base256 = bytearray()
-    last = None
-    for cur in binary:
-        if last == 0:
-            for i in range(cur):
-                base256.append(0)
-            # end for
-            last = None
-        else:
-            if last is not None:
-                base256.append(last)
-            # end if
-            last = cur
-        # end if
-    # end for
-    if last is not None:
-        base256.append(last)
+    #
+    # Every \0 is followed by the count of \0s it stands for, so after splitting at the \0s
+    # each part but the first starts with such a count, followed by literal data.
+    parts = binary.split(b'\x00')
+    if len(parts) == 1:
+        return bytearray(binary)
+    # end if
+    if b'' in parts:
+        # either a run of zero length (\0\0) or a trailing \0 without count, which the split can't tell apart.
+        return _rle_decode_stepwise(binary)
     # end if
+    zero_runs = _ZERO_RUNS
+    base256 = bytearray(parts[0])
+    for part in parts[1:]:
+        base256 += zero_runs[part[0]]
+        base256 += part[1:]
+    # end for
     return base256
 # end def
 
 
+def _rle_decode_stepwise(binary: bytes) -> bytearray:
+    """
+    Same as `rle_decode`, but jumps from \0 to \0, instead of splitting at all of them at once.
+    This handles all the edge cases, like a count of zero, or a last \0 without a count (which is kept as is).
+    """
+    base256 = bytearray()
+    find = binary.find
+    length = len(binary)
+    position = 0
+    while True:
+        zero = find(b'\x00', position)
+        if zero == -1 or zero + 1 == length:
+            base256 += binary[position:]
+            return base256
+        # end if
+        base256 += binary[position:zero]
+        base256 += _ZERO_RUNS[binary[zero + 1]]
+        position = zero + 2
+    # end while
+# end def
+
+
 def rle_encode(binary: bytes) -> bytearray:
     # https://github.com/LonamiWebs/Telethon/blob/c4cbead25b01663e73cc0cdcb35c26f1f053ae2d/telethon/utils.py#L1052-L1064
     # https://github.com/danog/MadelineProto/blob/1485d3879296a997d47f54469b0dd518b9230b06/src/danog/MadelineProto/TL/Files.php#L85
-    new = bytearray()
+    #
+    # After splitting at the \0s, every empty part is another \0 of the current run.
+    parts = binary.split(b'\x00')
+    new = bytearray(parts[0])
+    run_codes = _ZERO_RUN_CODES
     count = 0
-    for cur in binary:
-        if cur == 0:
-            count += 1
-        else:  # not 0 (any more)
-            if count > 0:
-                new.append(0)
-                new.append(count)
-                count = 0
-            # end if
-            new.append(cur)
+    for part in parts[1:]:
+        count += 1
+        if part:  # not 0 (any more)
+            while count > 255:  # a single count byte can't hold more.
+                new += run_codes[255]
+                count -= 255
+            # end while
+            new += run_codes[count]
+            new += part
+            count = 0
         # end if
     # end for
     if count > 0:
-        new.append(0)
-        new.append(count)
+        while count > 255:
+            new += run_codes[255]
+            count -= 255
+        # end while
+        new += run_codes[count]
     # end if
     return new
 # end def
@@ -103,10 +175,10 @@ def pack_tl_string(string: Union[str, bytes]) -> bytes:
     length = len(string)
     concat = b''
     if length <= 253:
-        concat += chr(length).encode()
+        concat += bytes((length,))
         fill = pos_mod(-length - 1, 4)
     else:
-        concat += chr(254).encode()
+        concat += b'\xfe'
         concat += struct.pack('<L', length)[0:3]
         fill = pos_mod(-length, 4)
     # end if
@@ -118,28 +190,73 @@ def pack_tl_string(string: Union[str, bytes]) -> bytes:
 # pack_tl_string('test')
 
 
+def tl_string_size(length: int) -> int:
+    """
+    The size of a packed tl_string, see `pack_tl_string`.
+    :param length: The length of the string (in bytes).
+    :return: The size including the length prefix and the padding.
+    """
+    if length <= 253:
+        return (length + 1 + 3) & ~3
+    # end if
+    return (length + 4 + 3) & ~3
+# end def
+
+
+def pack_tl_string_into(buffer: bytearray, offset: int, string: bytes) -> int:
+    """
+    Same as `pack_tl_string`, but writes into the given buffer instead of creating a new one.
+    The padding isn't written, as the buffer is expected to be zero filled already.
+    :param buffer: Output buffer, with at least `tl_string_size(len(string))` bytes space at the offset.
+    :param offset: Position to write the length byte of the tl_string to.
+    :param string: The string to write.
+    :return: The offset directly after the tl_string (including the padding).
+    """
+    length = len(string)
+    if length <= 253:
+        buffer[offset] = length
+        buffer[offset + 1:offset + 1 + length] = string
+    else:
+        buffer[offset:offset + 4] = (length << 8 | 0xfe).to_bytes(4, 'little')
+        buffer[offset + 4:offset + 4 + length] = string
+    # end if
+    return offset + tl_string_size(length)
+# end def
+
+
 def unpack_tl_string(buffer: BytesIO, as_string: bool = False) -> Union[str, bytes]:
     """
     Unpack a tl_string.
-    :param buffer: Input buffer. Needs support for `.read(1)` and `.seek(SEEK_CUR)`.
+    :param buffer: Input buffer. Needs support for `.read(n)` and `.seek(SEEK_CUR)`.
     :param as_string: if we should return it as utf-8 decoded `str` instead of `bytes`.
+    :except ValueError: The buffer ends before the tl_string does.
     :return: The unpacked string.
     """
     # https://github.com/danog/tg-file-decoder/blob/afcdb9a4a7239e36e8ab3b9a02db72eaa95db66e/src/type.php#L395
-    length: int = ord(buffer.read(1))
+    length_byte = buffer.read(1)
+    if not length_byte:
+        raise ValueError('Truncated tl_string: no length byte.')
+    # end if
+    length: int = length_byte[0]
 
     if length > 254:
         raise ValueError('length too big for a single field.')
     # end if
 
     if length == 254:
-        # untested
-        length = int(struct.unpack('<L', (buffer.read(3) + b'\x00'))[0])
+        length_bytes = buffer.read(3)
+        if len(length_bytes) != 3:
+            raise ValueError('Truncated tl_string: the length is cut off.')
+        # end if
+        length = int.from_bytes(length_bytes, 'little')
         fill = pos_mod(-1 * length, 4)
     else:
         fill = pos_mod(-(length + 1), 4)
     # end if
     string = buffer.read(length)
+    if len(string) != length:
+        raise ValueError(f'Truncated tl_string: {length} bytes long, but only {len(string)} left.')
+    # end if
     buffer.seek(fill, SEEK_CUR)
     if as_string:
         string = string.decode('utf-8')
@@ -148,23 +265,122 @@ def unpack_tl_string(buffer: BytesIO, as_string: bool = False) -> Union[str, byt
 # end def
 
 
-def unpack_null_terminated_string(buffer: Union[BytesIO, bytes, bytearray], as_string: bool = False) -> Union[str, bytes]:
+def unpack_tl_string_from(buffer: Union[bytes, bytearray, memoryview], offset: int = 0, as_string: bool = False, end: Union[int, None] = None) -> Tuple[Union[str, bytes], int]:
     """
-    Unpack a null terminated (\0) string.
-    :param buffer: Input buffer. Needs support for `.read(1)`.
+    Unpack a tl_string at the given offset, without copying anything but the string itself.
+    :param buffer: Input buffer. Anything indexable and sliceable, preferably a `memoryview`.
+    :param offset: Position of the length byte of the tl_string.
     :param as_string: if we should return it as utf-8 decoded `str` instead of `bytes`.
-    :return: The unpacked string.
+    :param end: Where the data the string has to fit in ends, if that's before the end of the buffer.
+    :except ValueError: The buffer (or `end`) ends before the string does. The padding after it may be missing.
+    :return: The unpacked string, and the offset directly after it (including the padding).
+    """
+    size = len(buffer) if end is None else end
+    if offset >= size:
+        raise ValueError('Truncated tl_string: no length byte.')
+    # end if
+    length: int = buffer[offset]
+
+    if length > 254:
+        raise ValueError('length too big for a single field.')
+    # end if
+
+    if length == 254:
+        if offset + 4 > size:
+            raise ValueError('Truncated tl_string: the length is cut off.')
+        # end if
+        length = buffer[offset + 1] | buffer[offset + 2] << 8 | buffer[offset + 3] << 16
+        start = offset + 4
+        fill = pos_mod(-1 * length, 4)
+    else:
+        start = offset + 1
+        fill = pos_mod(-(length + 1), 4)
+    # end if
+    stop = start + length
+    if stop > size:
+        raise ValueError(f'Truncated tl_string: {length} bytes long, but only {size - start} left.')
+    # end if
+    string = bytes(buffer[start:stop])
+    if as_string:
+        string = string.decode('utf-8')
+    # end if
+    return string, stop + fill
+# end def
+
+
+def skip_tl_string_from(buffer: Union[bytes, bytearray, memoryview], offset: int = 0, end: Union[int, None] = None) -> int:
     """
-    if isinstance(buffer, (bytes, bytearray)):
-        buffer = BytesIO(buffer)
+    Skips over a tl_string at the given offset, without copying it.
+    :param buffer: Input buffer. Anything indexable.
+    :param offset: Position of the length byte of the tl_string.
+    :param end: Where the data the string has to fit in ends, like for `unpack_tl_string_from`.
+    :except ValueError: The buffer (or `end`) ends before the string does, like for `unpack_tl_string_from`.
+    :return: The offset directly after the tl_string (including the padding).
+    """
+    size = len(buffer) if end is None else end
+    if offset >= size:
+        raise ValueError('Truncated tl_string: no length byte.')
+    # end if
+    length: int = buffer[offset]
+    if length > 254:
+        raise ValueError('length too big for a single field.')
+    # end if
+    if length == 254:
+        if offset + 4 > size:
+            raise ValueError('Truncated tl_string: the length is cut off.')
+        # end if
+        length = buffer[offset + 1] | buffer[offset + 2] << 8 | buffer[offset + 3] << 16
+        start = offset + 4
+        fill = pos_mod(-1 * length, 4)
+    else:
+        start = offset + 1
+        fill = pos_mod(-(length + 1), 4)
+    # end if
+    if start + length > size:
+        raise ValueError(f'Truncated tl_string: {length} bytes long, but only {size - start} left.')
     # end if
+    return start + length + fill
+# end def
 
-    char = buffer.read(1)
-    new_buff = b''
-    while char != b'\00':
-        new_buff += char
+
+def unpack_null_terminated_string(buffer: Union[BytesIO, BinaryIO, bytes, bytearray, memoryview], as_string: bool = False) -> Union[str, bytes]:
+    """
+    Unpack a null terminated (\0) string.
+    Takes linear time in the length of the string, and stops at the end of the buffer.
+    :param buffer: Input buffer. Either the data itself, or a file with `.read(1)`, which is left after the \0.
+    :param as_string: if we should return it as utf-8 decoded `str` instead of `bytes`.
+    :except ValueError: The buffer ends without a \0.
+    :return: The unpacked string.
+    """
+    if isinstance(buffer, (bytes, bytearray, memoryview)):
+        data = bytes(buffer)
+        end = data.find(b'\x00')
+        if end == -1:
+            raise ValueError(f'Truncated null terminated string: no \\0 in the {len(data)} bytes.')
+        # end if
+        new_buff = data[:end]
+    elif isinstance(buffer, BytesIO):
+        # search the whole rest at once, instead of reading byte by byte.
+        start = buffer.tell()
+        end = buffer.getvalue().find(b'\x00', start)
+        if end == -1:
+            buffer.seek(0, SEEK_END)
+            raise ValueError('Truncated null terminated string: no \\0 before the end.')
+        # end if
+        new_buff = buffer.read(end - start)
+        buffer.seek(1, SEEK_CUR)
+    else:
+        new_buff = bytearray()
         char = buffer.read(1)
-    # end while
+        while char != b'\x00':
+            if not char:
+                raise ValueError('Truncated null terminated string: no \\0 before the end.')
+            # end if
+            new_buff += char
+            char = buffer.read(1)
+        # end while
+        new_buff = bytes(new_buff)
+    # end if
     if as_string:
         new_buff = new_buff.decode('utf-8')
     # end if